@@ -1,12 +1,38 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from routes import accounts, contacts, emails, calls, transcripts, relationships
+from fastapi.responses import JSONResponse, Response
+from routes import accounts, contacts, emails, calls, transcripts, relationships, timeline, search, export, bulk, batch, lookup, analytics, stream, admin
+from database import db_manager
+from async_database import async_db_manager
+from cache import entity_cache
+from change_feed import change_feed
+from lifecycle import readiness, start as start_lifecycle
+from metrics import METRICS_ENABLED, PROMETHEUS_CONTENT_TYPE, Counter, Gauge, MetricsMiddleware, registry
+from pool import PoolTimeoutError
+from prepared import PreparedStatementStats, prepared_stats
+from responses import FastJSONResponse
+from replicas import ReadYourWritesMiddleware
+from slow_queries import QueryContextMiddleware
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Pools are opened and routes warmed before /ready reports ready
+    await start_lifecycle(app, async_db_manager.open)
+    yield
+    # End open change streams and release pooled connections on shutdown
+    readiness.mark_stopping()
+    change_feed.close()
+    await async_db_manager.close()
+    db_manager.close()
 
 # Create FastAPI app
 app = FastAPI(
     title="CRM API", 
     description="A modular CRM API for managing accounts, contacts, emails, calls, and transcripts",
-    version="2.0.0"
+    version="2.0.0",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse
 )
 
 # Add CORS middleware
@@ -18,6 +44,20 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Sends a client's reads to the primary while it may not see its own writes on a replica
+app.add_middleware(ReadYourWritesMiddleware, active=lambda: bool(db_manager.replicas))
+
+# Lets the slow-query log label statements with the route that issued them
+app.add_middleware(QueryContextMiddleware)
+
+# Outermost, so latency covers every other middleware
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+@app.exception_handler(PoolTimeoutError)
+async def pool_timeout_handler(request: Request, exc: PoolTimeoutError):
+    return JSONResponse(status_code=503, content={"detail": "Database connection pool exhausted"})
+
 # Include all routers
 app.include_router(accounts.router)
 app.include_router(contacts.router)
@@ -25,6 +65,15 @@ app.include_router(emails.router)
 app.include_router(calls.router)
 app.include_router(transcripts.router)
 app.include_router(relationships.router)
+app.include_router(timeline.router)
+app.include_router(search.router)
+app.include_router(export.router)
+app.include_router(bulk.router)
+app.include_router(batch.router)
+app.include_router(lookup.router)
+app.include_router(analytics.router)
+app.include_router(stream.router)
+app.include_router(admin.router)
 
 @app.get("/")
 def root():
@@ -42,7 +91,50 @@ def root():
 
 @app.get("/health")
 def health_check():
-    return {"status": "healthy", "version": "2.0.0"}
+    return {
+        "status": "healthy",
+        "version": "2.0.0",
+        "db_driver": async_db_manager.driver,
+        "db_pool": async_db_manager.pool_stats(),
+        "db_prepared_statements": prepared_stats.snapshot(),
+        "db_replicas": db_manager.replica_stats(),
+        "cache": entity_cache.stats(),
+        "change_feed": change_feed.stats(),
+        "readiness": readiness.snapshot()
+    }
+
+@app.get("/ready")
+def readiness_check():
+    """Readiness probe: 200 once this worker is warmed up, 503 while it drains after SIGTERM"""
+    return JSONResponse(status_code=200 if readiness.ready else 503, content=readiness.snapshot())
+
+def _pool_sizes():
+    stats = async_db_manager.pool_stats() or {}
+    if async_db_manager.native:
+        return {("size",): stats.get("pool_size", 0), ("idle",): stats.get("pool_available", 0)}
+    return {(state,): stats[state] for state in ("size", "idle", "in_use") if state in stats}
+
+def _cache_counters():
+    stats = entity_cache.stats()
+    return {(name,): stats[name] for name in ("hits", "misses", "evictions", "expirations", "invalidations")}
+
+def _prepared_counters():
+    stats = prepared_stats.snapshot()
+    return {(name,): stats[name] for name in PreparedStatementStats.EVENTS}
+
+registry.register(Gauge("db_pool_connections", "Connections in the database pool by state", ("state",), collect=_pool_sizes))
+registry.register(Counter("entity_cache_events_total", "Entity cache hits, misses and removals", ("event",), collect=_cache_counters))
+registry.register(Counter(
+    "db_prepared_statements_total", "Prepared statement cache hits, misses, prepares, evictions and failures",
+    ("event",), collect=_prepared_counters
+))
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus text exposition of this worker process's HTTP, database, pool and cache metrics"""
+    if not METRICS_ENABLED:
+        return JSONResponse(status_code=404, content={"detail": "Metrics are disabled"})
+    return Response(registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,214 @@
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import Dict, Any, Optional
+import os
+import time
+
+from starlette.concurrency import run_in_threadpool
+
+from database import DatabaseManager, db_manager
+from metrics import DB_LATENCY, DB_ROWS, METRICS_ENABLED
+from pool import PoolTimeoutError
+from prepared import PREPARE_THRESHOLD, PREPARED_MAX, PREPARED_STATEMENTS_ENABLED
+from slow_queries import slow_query_log
+
+# "threadpool" runs the blocking psycopg2 manager in AnyIO worker threads;
+# "native" uses a psycopg 3 async pool so no thread is held per query.
+DB_DRIVER = os.getenv("DB_DRIVER", "threadpool")
+DB_DRIVERS = ("threadpool", "native")
+
+@lru_cache(maxsize=1)
+def timed_async_cursor():
+    """psycopg 3 cursor class recording the same metrics and slow statements as database.TimedCursor"""
+    from psycopg import AsyncCursor
+
+    class TimedAsyncCursor(AsyncCursor):
+        async def execute(self, query, params=None, **kwargs):
+            started = time.perf_counter()
+            try:
+                return await super().execute(query, params, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - started
+                if METRICS_ENABLED:
+                    DB_LATENCY.observe(elapsed, "psycopg", "execute")
+                slow_query_log.observe(query, params, elapsed, "psycopg")
+
+        def _fetched(self, started: float, rows: int):
+            if METRICS_ENABLED:
+                DB_LATENCY.observe(time.perf_counter() - started, "psycopg", "fetch")
+                DB_ROWS.observe(rows, "psycopg")
+
+        async def fetchone(self):
+            started = time.perf_counter()
+            row = await super().fetchone()
+            self._fetched(started, 0 if row is None else 1)
+            return row
+
+        async def fetchmany(self, size: int = 0):
+            started = time.perf_counter()
+            rows = await super().fetchmany(size)
+            self._fetched(started, len(rows))
+            return rows
+
+        async def fetchall(self):
+            started = time.perf_counter()
+            rows = await super().fetchall()
+            self._fetched(started, len(rows))
+            return rows
+
+    return TimedAsyncCursor
+
+async def _configure_connection(conn):
+    conn.prepared_max = PREPARED_MAX
+
+class AsyncDatabaseManager:
+    """Awaitable counterpart of DatabaseManager used by the route handlers.
+
+    Both drivers expose the same ``execute_*`` API and return the same
+    ``(rows, cursor)`` shapes, so the routers do not care which one is active
+    and the two can be benchmarked against each other by flipping
+    ``DB_DRIVER``.
+    """
+
+    def __init__(self, sync_manager: DatabaseManager, driver: str = DB_DRIVER):
+        self.sync_manager = sync_manager
+        self.driver = driver
+        self._pool = None
+
+    @property
+    def driver(self) -> str:
+        return self._driver
+
+    @driver.setter
+    def driver(self, value: str):
+        if value not in DB_DRIVERS:
+            raise ValueError(f"Unknown DB_DRIVER {value!r}, expected one of {DB_DRIVERS}")
+        self._driver = value
+
+    @property
+    def native(self) -> bool:
+        return self._driver == "native"
+
+    @property
+    def config(self) -> Dict[str, Any]:
+        """Connection settings, shared with the sync manager"""
+        return self.sync_manager.config
+
+    async def open(self):
+        """Open (and warm) the pool for the active driver"""
+        if not self.native:
+            await run_in_threadpool(self.sync_manager.open)
+            return
+        if self._pool is not None:
+            return
+        from psycopg_pool import AsyncConnectionPool
+        from psycopg.conninfo import make_conninfo
+
+        pool_config = self.sync_manager.pool_config
+        pool = AsyncConnectionPool(
+            make_conninfo(**self.config),
+            min_size=max(pool_config.get("min_size", 1), 1),
+            max_size=pool_config.get("max_size", 20),
+            timeout=pool_config.get("timeout", 10.0),
+            max_idle=pool_config.get("max_idle", 300.0),
+            check=AsyncConnectionPool.check_connection,
+            # psycopg 3 prepares hot statements itself; give it the same settings
+            kwargs={
+                "autocommit": True,
+                "cursor_factory": timed_async_cursor(),
+                "prepare_threshold": PREPARE_THRESHOLD if PREPARED_STATEMENTS_ENABLED else None,
+            },
+            configure=_configure_connection,
+            open=False,
+        )
+        await pool.open(wait=True)
+        self._pool = pool
+
+    async def close(self):
+        """Close the native pool, if one is open"""
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            await pool.close()
+
+    def pool_stats(self) -> Optional[Dict[str, Any]]:
+        """Statistics for the active driver's pool"""
+        if not self.native:
+            return self.sync_manager.pool_stats()
+        if self._pool is None:
+            return None
+        return self._pool.get_stats()
+
+    @asynccontextmanager
+    async def get_cursor(self):
+        """Async context manager for a native database cursor"""
+        if self._pool is None:
+            await self.open()
+        from psycopg_pool import PoolTimeout
+
+        started = time.perf_counter()
+        try:
+            async with self._pool.connection() as conn:
+                if METRICS_ENABLED:
+                    DB_LATENCY.observe(time.perf_counter() - started, "psycopg", "connect")
+                yield conn.cursor()
+        except PoolTimeout as e:
+            raise PoolTimeoutError(str(e)) from e
+
+    def row_to_dict(self, row, cursor):
+        """Convert database row to dictionary"""
+        return self.sync_manager.row_to_dict(row, cursor)
+
+    def rows_to_dicts(self, rows, cursor):
+        """Convert database rows to dictionaries"""
+        return self.sync_manager.rows_to_dicts(rows, cursor)
+
+    def rows_to_versioned_dicts(self, rows, cursor):
+        """Split rows selected with ROW_VERSION_COLUMN last into (dicts, versions)"""
+        return self.sync_manager.rows_to_versioned_dicts(rows, cursor)
+
+    async def execute_query(self, query: str, params: tuple = None, primary: bool = False):
+        """Execute a query and return results.
+
+        The threadpool driver reads from a replica unless ``primary``; the
+        native driver has no replica routing and always reads the primary.
+        """
+        if not self.native:
+            return await run_in_threadpool(self.sync_manager.execute_query, query, params, primary)
+        async with self.get_cursor() as cur:
+            await cur.execute(query, params)
+            return await cur.fetchall(), cur
+
+    async def execute_single(self, query: str, params: tuple = None, primary: bool = False):
+        """Execute a query and return single result (see ``execute_query`` for ``primary``)"""
+        if not self.native:
+            return await run_in_threadpool(self.sync_manager.execute_single, query, params, primary)
+        async with self.get_cursor() as cur:
+            await cur.execute(query, params)
+            return await cur.fetchone(), cur
+
+    async def execute_insert(self, query: str, params: tuple = None):
+        """Execute an insert query and return the inserted record"""
+        if not self.native:
+            return await run_in_threadpool(self.sync_manager.execute_insert, query, params)
+        async with self.get_cursor() as cur:
+            await cur.execute(query, params)
+            return await cur.fetchone(), cur
+
+    async def execute_update(self, query: str, params: tuple = None):
+        """Execute an update query and return the updated record"""
+        if not self.native:
+            return await run_in_threadpool(self.sync_manager.execute_update, query, params)
+        async with self.get_cursor() as cur:
+            await cur.execute(query, params)
+            return await cur.fetchone(), cur
+
+    async def execute_delete(self, query: str, params: tuple = None):
+        """Execute a delete query and return row count"""
+        if not self.native:
+            return await run_in_threadpool(self.sync_manager.execute_delete, query, params)
+        async with self.get_cursor() as cur:
+            await cur.execute(query, params)
+            return cur.rowcount
+
+# Global async database manager, wrapping the global sync manager
+async_db_manager = AsyncDatabaseManager(db_manager)
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Account analytics from the rollup tables vs aggregating calls and emails on the fly.
+
+Runs the /analytics queries and their equivalent GROUP BY over the base
+tables for random accounts in the database in DB_CONFIG (seed it first),
+checks that both give the same figures and reports median latencies, for
+random accounts and for the accounts with the most emails.
+
+    DB_NAME=crm_bench python benchmarks/bench_analytics.py --accounts 200
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import db_manager
+from routes.analytics import CALL_STATS_QUERY, EMAIL_STATS_QUERY
+
+DIRECT_CALLS = """
+    SELECT GROUPING(l.call_type, l.outcome), l.call_type, l.outcome, count(*) AS calls,
+           count(l.duration), coalesce(sum(l.duration), 0) AS total_duration
+    FROM calls l JOIN contacts c ON c.id = l.contact_id
+    WHERE c.account_id = %s
+    GROUP BY GROUPING SETS ((l.call_type), (l.outcome), ())
+"""
+
+DIRECT_EMAILS = """
+    SELECT date_trunc('week', e.sent_at)::date AS week, count(*) AS emails
+    FROM emails e JOIN contacts c ON c.id = e.contact_id
+    WHERE c.account_id = %s
+    GROUP BY 1
+"""
+
+def timed(query, params):
+    started = time.perf_counter()
+    rows, _ = db_manager.execute_query(query, params)
+    return time.perf_counter() - started, rows
+
+def compare(account_ids):
+    timings = {name: [] for name in ("rollup calls", "direct calls", "rollup emails", "direct emails")}
+    for account_id in account_ids:
+        elapsed, rollup = timed(CALL_STATS_QUERY, (account_id,))
+        timings["rollup calls"].append(elapsed)
+        elapsed, direct = timed(DIRECT_CALLS, (account_id,))
+        timings["direct calls"].append(elapsed)
+        groups = {(row[0], row[1], row[2]): (row[4], row[6]) for row in rollup if row[4]}
+        assert groups == {(row[0], row[1], row[2]): (row[3], row[5]) for row in direct if row[3]}, account_id
+
+        elapsed, rollup = timed(EMAIL_STATS_QUERY, (None, None, account_id))
+        timings["rollup emails"].append(elapsed)
+        elapsed, direct = timed(DIRECT_EMAILS, (account_id,))
+        timings["direct emails"].append(elapsed)
+        assert {row[0]: row[1] for row in rollup if row[0]} == {row[0]: row[1] for row in direct}, account_id
+    return {name: statistics.median(values) * 1e6 for name, values in timings.items()}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--accounts", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    (max_account,), _ = db_manager.execute_single("SELECT max(id) FROM accounts")
+    heaviest, _ = db_manager.execute_query(
+        "SELECT c.account_id, count(*) FROM emails e JOIN contacts c ON c.id = e.contact_id "
+        "GROUP BY 1 ORDER BY 2 DESC LIMIT 20"
+    )
+    samples = {
+        "random": [random.randint(1, max_account) for _ in range(args.accounts)],
+        f"top 20 (~{heaviest[-1][1]}+ emails)": [row[0] for row in heaviest] * 5,
+    }
+    results = {label: compare(ids) for label, ids in samples.items()}
+    print(f"{'query':<16}" + "".join(f"{label + ' µs':>28}" for label in results))
+    for name in next(iter(results.values())):
+        print(f"{name:<16}" + "".join(f"{timings[name]:>28.1f}" for timings in results.values()))
+
+if __name__ == "__main__":
+    main()
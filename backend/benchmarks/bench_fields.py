@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Payload size and latency of list pages with and without a sparse fieldset.
+
+Runs the app in-process against the database in DB_CONFIG (seed it first),
+with the entity cache disabled so every request reaches Postgres.
+
+    DB_NAME=crm_bench python benchmarks/bench_fields.py --limit 500
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient
+
+from api import app
+from cache import entity_cache
+
+CASES = [
+    ("/emails/", None),
+    ("/emails/", "subject"),
+    ("/call-transcripts/", None),
+    ("/call-transcripts/", "call_id"),
+]
+
+def measure(client, url, params, repeat):
+    best, size = float("inf"), 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        response = client.get(url, params=params)
+        best = min(best, time.perf_counter() - started)
+        size = len(response.content)
+    return best, size
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--limit", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    entity_cache.enabled = False
+    with TestClient(app) as client:
+        print(f"{'endpoint':<40} {'bytes':>10} {'ms':>8}")
+        for url, fields in CASES:
+            params = {"limit": args.limit}
+            if fields:
+                params["fields"] = fields
+            elapsed, size = measure(client, url, params, args.repeat)
+            label = url + (f"?fields={fields}" if fields else "")
+            print(f"{label:<40} {size:>10,} {elapsed * 1000:>8.1f}")
+
+if __name__ == "__main__":
+    main()
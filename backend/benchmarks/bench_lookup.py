@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Fetching N contacts (or any entity) one request per id vs one batch lookup.
+
+Runs the app in-process against the database in DB_CONFIG (seed it first),
+with the entity cache disabled so every variant reaches Postgres.
+
+    DB_NAME=crm_bench python benchmarks/bench_lookup.py --entity contacts --ids 200
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient
+
+from api import app
+from cache import entity_cache
+from database import db_manager
+from entities import ENTITIES
+
+def one_by_one(client, entity, ids):
+    for row_id in ids:
+        assert client.get(f"/{entity}/{row_id}").status_code == 200
+
+def query_lookup(client, entity, ids):
+    response = client.get(f"/{entity}/", params={"ids": ",".join(map(str, ids))})
+    assert len(response.json()["items"]) == len(ids)
+
+def post_lookup(client, entity, ids):
+    response = client.post(f"/{entity}/lookup", json={"ids": ids})
+    assert len(response.json()["items"]) == len(ids)
+
+def measure(fn, *args, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--entity", choices=sorted(ENTITIES), default="contacts")
+    parser.add_argument("--ids", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    entity_cache.enabled = False
+    table = ENTITIES[args.entity].table
+    rows, _ = db_manager.execute_query(f"SELECT id FROM {table} ORDER BY random() LIMIT %s", (args.ids,))
+    ids = [row_id for (row_id,) in rows]
+    random.shuffle(ids)
+    if len(ids) < args.ids:
+        raise SystemExit(f"Only {len(ids)} {table} rows; seed the database first")
+
+    with TestClient(app) as client:
+        results = {
+            "one by one": measure(one_by_one, client, args.entity, ids, repeat=args.repeat),
+            "GET ?ids=": measure(query_lookup, client, args.entity, ids, repeat=args.repeat),
+            "POST /lookup": measure(post_lookup, client, args.entity, ids, repeat=args.repeat),
+        }
+    baseline = results["one by one"]
+    print(f"{args.entity}: {len(ids)} ids")
+    for name, elapsed in results.items():
+        print(f"{name:<13} {elapsed * 1000:8.1f} ms  {baseline / elapsed:6.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Overhead of the metrics middleware and timed cursors.
+
+Times by-id reads (entity cache disabled, so each one queries Postgres) in
+child processes with METRICS_ENABLED on and off, and the cost of a single
+histogram observation. Uses the database in DB_CONFIG (seed it first).
+
+    DB_NAME=crm_bench python benchmarks/bench_metrics.py --requests 2000
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+CHILD = """
+import statistics, sys, time
+sys.path.insert(0, {path!r})
+from fastapi.testclient import TestClient
+from api import app
+from cache import entity_cache
+entity_cache.enabled = False
+timings = []
+with TestClient(app) as client:
+    for i in range({requests}):
+        started = time.perf_counter()
+        client.get(f"/accounts/{{i % 1000 + 1}}")
+        timings.append(time.perf_counter() - started)
+print(statistics.median(timings[{requests} // 10:]) * 1e6)
+"""
+
+def request_median_us(enabled: bool, requests: int) -> float:
+    env = {**os.environ, "METRICS_ENABLED": "true" if enabled else "false"}
+    code = CHILD.format(path=os.path.dirname(os.path.dirname(os.path.abspath(__file__))), requests=requests)
+    output = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True)
+    return float(output.stdout.strip().splitlines()[-1])
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    from metrics import Histogram
+    histogram = Histogram("bench_seconds", "", ("route",))
+    per_observe = min(timeit.repeat(lambda: histogram.observe(0.003, "/accounts/{account_id}"), number=100000, repeat=5)) / 100000
+    print(f"histogram observe: {per_observe * 1e9:.0f} ns")
+
+    for enabled in (False, True):
+        medians = [request_median_us(enabled, args.requests) for _ in range(args.rounds)]
+        print(f"GET /accounts/{{id}} metrics {'on ' if enabled else 'off'}: median {min(medians):.0f} us")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Statement latency with and without the prepared statement cache.
+
+Runs the by-id read, insert and timeline-style join statements the
+routers issue, each on a single pooled psycopg2 connection, against the
+database in DB_CONFIG (seed it first). The inserted accounts are deleted
+afterwards.
+
+    DB_NAME=crm_bench python benchmarks/bench_prepared.py --repeat 5000
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import DB_CONFIG, ROW_VERSION_COLUMN, DatabaseManager
+from entities import ENTITIES
+from prepared import prepared_stats
+
+BY_ID = f"SELECT {ENTITIES['emails'].select_list}, {ROW_VERSION_COLUMN} FROM emails WHERE id = %s LIMIT 1"
+INSERT = "INSERT INTO accounts (name, industry, plan, status) VALUES (%s, %s, %s, %s) RETURNING *"
+JOIN = (
+    "SELECT e.id, e.subject, e.sent_at, c.first_name || ' ' || c.last_name AS contact_name, a.name AS account_name "
+    "FROM emails e JOIN contacts c ON c.id = e.contact_id JOIN accounts a ON a.id = c.account_id "
+    "WHERE c.account_id = %s ORDER BY e.sent_at DESC, e.id DESC LIMIT 20"
+)
+
+def measure(manager, query, make_params, repeat):
+    timings = []
+    for _ in range(repeat):
+        params = make_params()
+        started = time.perf_counter()
+        manager.execute_single(query, params)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1e6
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3000)
+    args = parser.parse_args(argv)
+
+    pool_config = {"enabled": True, "min_size": 1, "max_size": 1}
+    managers = {
+        "unprepared": DatabaseManager(DB_CONFIG, pool_config, prepared_statements=False),
+        "prepared": DatabaseManager(DB_CONFIG, pool_config, prepared_statements=True),
+    }
+    (max_email,), _ = managers["unprepared"].execute_single("SELECT max(id) FROM emails")
+    (max_account,), _ = managers["unprepared"].execute_single("SELECT max(id) FROM accounts")
+    (first_new,), _ = managers["unprepared"].execute_single("SELECT nextval('accounts_id_seq')")
+
+    cases = [
+        ("by-id read", BY_ID, lambda: (random.randint(1, max_email),)),
+        ("insert", INSERT, lambda: ("Bench account", "Software", "Pro", "Active")),
+        ("join page", JOIN, lambda: (random.randint(1, max_account),)),
+    ]
+    print(f"{'statement':<14} {'unprepared µs':>14} {'prepared µs':>12} {'saved':>7}")
+    for label, query, make_params in cases:
+        results = {name: measure(manager, query, make_params, args.repeat) for name, manager in managers.items()}
+        saved = 1 - results["prepared"] / results["unprepared"]
+        print(f"{label:<14} {results['unprepared']:>14.1f} {results['prepared']:>12.1f} {saved:>7.0%}")
+
+    managers["unprepared"].execute_delete("DELETE FROM accounts WHERE id >= %s", (first_new,))
+    print(f"prepared statement cache: {prepared_stats.snapshot()}")
+    for manager in managers.values():
+        manager.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Per-row CPU cost of serializing a list response, old path vs fast path.
+
+Old path: row_to_dict per row (rebuilding the column list each time), a
+Pydantic model per row, then FastAPI's response_model validation and JSON
+rendering. Fast path: one compiled row mapper and FastJSONResponse.
+
+    python benchmarks/bench_serialization.py --rows 100000
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from database import DatabaseManager
+from models import Email
+from responses import FastJSONResponse
+
+EMAIL_LIST = TypeAdapter(List[Email])
+
+class FakeCursor:
+    description = [("id",), ("contact_id",), ("subject",), ("body",), ("sent_at",)]
+
+def make_rows(count: int):
+    start = datetime(2024, 1, 1)
+    return [
+        (i, i % 500 + 1, f"Subject line number {i}", "Lorem ipsum dolor sit amet. " * 8, start + timedelta(seconds=i))
+        for i in range(count)
+    ]
+
+def old_path(manager, rows, cur):
+    emails = []
+    for row in rows:
+        email = dict(zip([desc[0] for desc in cur.description], row))
+        emails.append(Email(**email))
+    # What FastAPI does with response_model=List[Email] and the default JSONResponse
+    validated = EMAIL_LIST.validate_python(emails, from_attributes=True)
+    return JSONResponse(EMAIL_LIST.dump_python(validated, mode="json")).body
+
+def fast_path(manager, rows, cur):
+    return FastJSONResponse(manager.rows_to_dicts(rows, cur)).body
+
+def measure(fn, *args, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    manager = DatabaseManager(pool_config={"enabled": False})
+    rows, cur = make_rows(args.rows), FakeCursor()
+    assert len(old_path(manager, rows[:10], cur)) > 0
+
+    old = measure(old_path, manager, rows, cur, repeat=args.repeat)
+    fast = measure(fast_path, manager, rows, cur, repeat=args.repeat)
+    print(f"rows: {args.rows:,}")
+    print(f"old path:  {old * 1000:8.1f} ms  {old / args.rows * 1e6:6.2f} us/row")
+    print(f"fast path: {fast * 1000:8.1f} ms  {fast / args.rows * 1e6:6.2f} us/row")
+    print(f"speedup:   {old / fast:8.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Peak memory and time for a large transcript: JSON create vs streamed storage.
+
+Runs against the database in DB_CONFIG (seed it first) and measures the
+server-side work directly, so the numbers aren't inflated by an in-process
+client buffering bodies: parsing and inserting a JSON payload vs
+``store_transcript`` / ``content_chunks`` over a chunked body. Python heap
+peaks come from tracemalloc. The transcripts it creates are deleted
+afterwards.
+
+    DB_NAME=crm_bench python benchmarks/bench_transcripts.py --megabytes 20
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import db_manager
+from models import CallTranscriptCreate
+from transcript_storage import Compression, content_chunks, open_transcript_content, store_transcript
+
+LINE = "Agent: Thanks for joining today, let's walk through the renewal pricing and the rollout plan.\n"
+
+def body_chunks(megabytes: int, chunk_size: int = 64 * 1024):
+    chunk = (LINE * (chunk_size // len(LINE) + 1))[:chunk_size].encode()
+    for _ in range(megabytes * 1024 * 1024 // chunk_size):
+        yield chunk
+
+def traced(fn, *args):
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = fn(*args)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+def json_create(payload: bytes):
+    transcript = CallTranscriptCreate.model_validate_json(payload)
+    row, cur = db_manager.execute_insert(
+        "INSERT INTO call_transcripts (call_id, transcript) VALUES (%s, %s) RETURNING id, byte_length",
+        (transcript.call_id, transcript.transcript)
+    )
+    return db_manager.row_to_dict(row, cur)
+
+def download(transcript_id: int) -> int:
+    return sum(len(chunk) for chunk in content_chunks(*open_transcript_content(transcript_id)))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--megabytes", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    rows, _ = db_manager.execute_query("SELECT id FROM calls ORDER BY id LIMIT 1")
+    call_id = rows[0][0]
+    created = []
+    print(f"{'variant':<16} {'stored bytes':>14} {'seconds':>8} {'peak MB':>8}")
+
+    payload = json.dumps({"call_id": call_id, "transcript": b"".join(body_chunks(args.megabytes)).decode()}).encode()
+    row, elapsed, peak = traced(json_create, payload)
+    del payload
+    created.append(row["id"])
+    print(f"{'JSON create':<16} {row['byte_length']:>14,} {elapsed:>8.2f} {peak / 2**20:>8.1f}")
+    size, elapsed, peak = traced(download, row["id"])
+    print(f"{'  download':<16} {size:>14,} {elapsed:>8.2f} {peak / 2**20:>8.1f}")
+
+    for compression in Compression:
+        row, elapsed, peak = traced(store_transcript, body_chunks(args.megabytes), compression, call_id)
+        created.append(row["id"])
+        print(f"{'upload ' + compression.value:<16} {row['stored_length']:>14,} {elapsed:>8.2f} {peak / 2**20:>8.1f}")
+        size, elapsed, peak = traced(download, row["id"])
+        print(f"{'  download':<16} {size:>14,} {elapsed:>8.2f} {peak / 2**20:>8.1f}")
+
+    db_manager.execute_update("DELETE FROM call_transcripts WHERE id = ANY(%s) RETURNING id", (created,))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,392 @@
+import os
+import pickle
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from async_database import async_db_manager
+from database import ROW_VERSION_COLUMN, db_manager
+from entities import ENTITIES, Entity, select_columns
+from responses import make_etag
+
+# Cache configuration
+CACHE_CONFIG = {
+    "enabled": os.getenv("CACHE_ENABLED", "true").lower() in ("1", "true", "yes"),
+    # "local" (in-process only), "memory" (in-process stand-in for a shared
+    # backend) or "redis"
+    "backend": os.getenv("CACHE_BACKEND", "local"),
+    "max_entries": int(os.getenv("CACHE_MAX_ENTRIES", "10000")),
+    "ttl": float(os.getenv("CACHE_TTL", "30")),
+    # With a shared backend, other instances may invalidate entries we hold
+    # locally, so the local copy is kept only briefly
+    "local_ttl": float(os.getenv("CACHE_LOCAL_TTL", "2")),
+    "redis_url": os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0"),
+}
+
+MISSING = object()
+
+class LRUCache:
+    """Thread-safe in-process LRU cache with per-entry expiry"""
+
+    def __init__(self, max_entries: int = 10000, ttl: float = 30.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISSING
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                return MISSING
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, *keys: str):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+class MemorySharedCache:
+    """In-process stand-in for a shared cache backend such as Redis.
+
+    Implements the same small interface as RedisCache so tests and local
+    development exercise the two-tier code path without a Redis server.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISSING
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return MISSING
+            return pickle.loads(value)
+
+    def set(self, key: str, value: Any, ttl: float):
+        with self._lock:
+            self._entries[key] = (pickle.dumps(value), time.monotonic() + ttl)
+
+    def delete(self, *keys: str):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+class RedisCache:
+    """Shared cache backend on Redis (requires the optional ``redis`` package)"""
+
+    def __init__(self, url: str, prefix: str = "crm:"):
+        import redis
+
+        self._client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key: str) -> Any:
+        value = self._client.get(self.prefix + key)
+        return MISSING if value is None else pickle.loads(value)
+
+    def set(self, key: str, value: Any, ttl: float):
+        self._client.set(self.prefix + key, pickle.dumps(value), px=max(int(ttl * 1000), 1))
+
+    def delete(self, *keys: str):
+        if keys:
+            self._client.delete(*(self.prefix + key for key in keys))
+
+    def clear(self):
+        keys = list(self._client.scan_iter(match=self.prefix + "*"))
+        if keys:
+            self._client.delete(*keys)
+
+def entity_key(table: str, row_id: Any) -> str:
+    """Cache key for one row read by id"""
+    return f"{table}:{row_id}"
+
+def rows_tag(table: str) -> str:
+    """Tag moved to a new generation whenever a row of ``table`` is invalidated"""
+    return f"rows:{table}"
+
+def list_tag(table: str, column: str, value: Any) -> str:
+    """Invalidation tag for the cached pages of ``table WHERE column = value``"""
+    return f"{table}:{column}={value}"
+
+class EntityCache:
+    """Read-through cache for by-id and relationship reads.
+
+    Rows are cached under ``entity_key`` and are deleted by the write
+    handlers. Relationship pages are cached under their list tag's current
+    *generation*; invalidating the tag moves it to a fresh generation so
+    every cached page of that list is orphaned at once. A generation lives
+    as long as the entries keyed by it (``ttl``), so an expired generation
+    can never resurrect an orphaned page. Invalidating rows also moves their
+    table's ``rows_tag``; a row read that started before that is not cached,
+    since it may predate the write.
+    """
+
+    def __init__(self, config: Dict[str, Any] = None):
+        self.config = config or CACHE_CONFIG
+        self.enabled = self.config.get("enabled", True)
+        self.ttl = self.config.get("ttl", 30.0)
+        backend = self.config.get("backend", "local")
+        if backend == "redis":
+            self.shared = RedisCache(self.config["redis_url"])
+        elif backend == "memory":
+            self.shared = MemorySharedCache()
+        elif backend == "local":
+            self.shared = None
+        else:
+            raise ValueError(f"Unknown CACHE_BACKEND {backend!r}")
+        local_ttl = self.ttl if self.shared is None else min(self.ttl, self.config.get("local_ttl", 2.0))
+        self.local = LRUCache(self.config.get("max_entries", 10000), local_ttl)
+        self._generations: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, key: str) -> Any:
+        """Cached value for ``key``, or MISSING"""
+        if not self.enabled:
+            return MISSING
+        value = self.local.get(key)
+        if value is MISSING and self.shared is not None:
+            value = self.shared.get(key)
+            if value is not MISSING:
+                self.local.set(key, value)
+        if value is MISSING:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any, guard: Optional[Tuple[str, Any]] = None):
+        """Cache ``value``, unless ``guard``'s tag moved on from the given generation meanwhile"""
+        if not self.enabled:
+            return
+        if guard is not None and self.generation(guard[0]) != guard[1]:
+            return
+        self.local.set(key, value)
+        if self.shared is not None:
+            self.shared.set(key, value, self.ttl)
+
+    async def get_or_load(self, key: str, loader, tag: Optional[str] = None) -> Any:
+        """Return the cached value or await ``loader()`` and cache its result.
+
+        ``None`` results (row not found) are not cached, and neither is a
+        result loaded while ``tag`` was invalidated.
+        """
+        value = self.get(key)
+        if value is not MISSING:
+            return value
+        guard = (tag, self.generation(tag)) if tag is not None else None
+        value = await loader()
+        if value is not None:
+            self.set(key, value, guard)
+        return value
+
+    def generation(self, tag: str) -> Any:
+        """Current generation of a list tag"""
+        if self.shared is not None:
+            generation = self.shared.get(f"gen:{tag}")
+            return 0 if generation is MISSING else generation
+        with self._lock:
+            entry = self._generations.get(tag)
+            if entry is None or entry[1] <= time.monotonic():
+                return 0
+            return entry[0]
+
+    def page_key(self, tag: str, *parts: Any) -> str:
+        """Cache key for one page of a tagged list at its current generation"""
+        return ":".join([f"page:{tag}", f"g{self.generation(tag)}", *map(str, parts)])
+
+    def invalidate(self, keys: Iterable[str] = (), tags: Iterable[str] = ()):
+        """Drop cached rows and orphan every cached page of the given tags"""
+        if not self.enabled:
+            return
+        keys = [key for key in keys if key is not None]
+        tags = [tag for tag in tags if tag is not None]
+        self.invalidations += len(keys) + len(tags)
+        tags += {rows_tag(key.split(":", 1)[0]) for key in keys}
+        if keys:
+            self.local.delete(*keys)
+            if self.shared is not None:
+                self.shared.delete(*keys)
+        now = time.monotonic()
+        for tag in tags:
+            generation = uuid.uuid4().hex[:12]
+            if self.shared is not None:
+                self.shared.set(f"gen:{tag}", generation, self.ttl)
+            else:
+                with self._lock:
+                    self._generations[tag] = (generation, now + self.ttl)
+        if tags and self.shared is None:
+            with self._lock:
+                if len(self._generations) > self.local.max_entries:
+                    self._generations = {
+                        tag: entry for tag, entry in self._generations.items() if entry[1] > now
+                    }
+
+    def clear(self):
+        self.local.clear()
+        if self.shared is not None:
+            self.shared.clear()
+        with self._lock:
+            self._generations.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "backend": self.config.get("backend", "local"),
+            "entries": len(self.local),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.local.evictions,
+            "expirations": self.local.expirations,
+            "invalidations": self.invalidations,
+        }
+
+# Global entity cache
+entity_cache = EntityCache()
+
+class CachedRow(NamedTuple):
+    row: Dict[str, Any]
+    etag: str
+    version: str
+
+def versioned_row(entity: Entity, row: Dict[str, Any], version: str) -> CachedRow:
+    """Wrap a row with the ETag of its column set and version"""
+    return CachedRow(row, make_etag(entity.table, tuple(row), row["id"], version), version)
+
+async def fetch_cached_row(
+    key: str,
+    entity: Entity,
+    column: str,
+    value: Any,
+    fields: Optional[str] = None,
+) -> Optional[CachedRow]:
+    """Read the row ``WHERE column = value`` and its ETag through the cache.
+
+    Full rows are cached, so they are read from the primary: a lagging
+    replica's row would outlive the request. A ``fields`` projection is cut
+    from the cached row when there is one, and otherwise reads only the
+    requested columns.
+    """
+    columns = select_columns(entity, fields)
+    cacheable = columns == entity.columns
+
+    async def load():
+        rows, cur = await async_db_manager.execute_query(
+            f"SELECT {entity.select_sql(columns)}, {ROW_VERSION_COLUMN} FROM {entity.table} WHERE {column} = %s LIMIT 1",
+            (value,), primary=cacheable
+        )
+        if not rows:
+            return None
+        (row,), (version,) = async_db_manager.rows_to_versioned_dicts(rows, cur)
+        return versioned_row(entity, row, version)
+
+    if cacheable:
+        return await entity_cache.get_or_load(key, load, rows_tag(entity.table))
+    cached = entity_cache.get(key)
+    if cached is MISSING:
+        return await load()
+    return versioned_row(entity, {name: cached.row[name] for name in columns}, cached.version)
+
+def invalidate_rows(entity: Entity, rows: Iterable[Dict[str, Any]], previous_parents: Iterable[Any] = ()):
+    """Invalidate written rows and the parent lists they appear (or appeared) in"""
+    keys, tags = [], []
+    for row in rows:
+        keys.append(entity_key(entity.table, row["id"]))
+        if entity.parent_column:
+            tags.append(list_tag(entity.table, entity.parent_column, row[entity.parent_column]))
+    if entity.parent_column:
+        tags.extend(list_tag(entity.table, entity.parent_column, parent) for parent in previous_parents)
+    entity_cache.invalidate(keys, set(tags))
+
+def _children(entity: Entity) -> List[Entity]:
+    return [child for child in ENTITIES.values() if child.parent_table == entity.table]
+
+def delete_row_cascading(cur, entity: Entity, row_id: int) -> Optional[Tuple[List[str], List[str]]]:
+    """Delete one row in ``cur``'s transaction; returns the cache keys and
+    list tags it and every row ON DELETE CASCADE removes, or None when the
+    row does not exist.
+
+    The row is locked before its descendants are listed, so no child can be
+    inserted under it between the listing and the delete.
+    """
+    parent_column = entity.parent_column or "NULL"
+    keys, tags = [entity_key(entity.table, row_id)], []
+    if not _children(entity):
+        cur.execute(f"DELETE FROM {entity.table} WHERE id = %s RETURNING {parent_column}", (row_id,))
+        row = cur.fetchone()
+    else:
+        cur.execute(f"SELECT {parent_column} FROM {entity.table} WHERE id = %s FOR UPDATE", (row_id,))
+        row = cur.fetchone()
+        level = [(entity, [row_id])] if row is not None else []
+        while level:
+            next_level = []
+            for parent, ids in level:
+                for child in _children(parent):
+                    tags.extend(list_tag(child.table, child.parent_column, parent_id) for parent_id in ids)
+                    cur.execute(
+                        f"SELECT id FROM {child.table} WHERE {child.parent_column} = ANY(%s)", (ids,)
+                    )
+                    child_ids = [child_id for (child_id,) in cur.fetchall()]
+                    keys.extend(entity_key(child.table, child_id) for child_id in child_ids)
+                    if child_ids:
+                        next_level.append((child, child_ids))
+            level = next_level
+        if row is not None:
+            cur.execute(f"DELETE FROM {entity.table} WHERE id = %s", (row_id,))
+    if row is None:
+        return None
+    if entity.parent_column:
+        tags.append(list_tag(entity.table, entity.parent_column, row[0]))
+    return keys, tags
+
+def delete_cascading(entity: Entity, row_id: int) -> bool:
+    """Delete one row and invalidate it plus every row ON DELETE CASCADE removes.
+
+    Returns False when the row does not exist.
+    """
+    with db_manager.transaction() as cur:
+        deleted = delete_row_cascading(cur, entity, row_id)
+    if deleted is None:
+        return False
+    entity_cache.invalidate(*deleted)
+    return True
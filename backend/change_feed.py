@@ -0,0 +1,232 @@
+import asyncio
+import json
+import logging
+import os
+import select
+import threading
+from collections import deque
+from typing import Any, Callable, Dict, FrozenSet, List, Optional
+
+import psycopg2
+
+from database import db_manager
+
+# Recent events kept for clients resuming with Last-Event-ID
+CHANGE_FEED_LOG_SIZE = int(os.getenv("CHANGE_FEED_LOG_SIZE", "10000"))
+# Events a subscriber may fall behind by before it is sent a reset and dropped
+CHANGE_FEED_QUEUE_SIZE = int(os.getenv("CHANGE_FEED_QUEUE_SIZE", "1000"))
+# Seconds between SSE keepalive comments on an idle stream
+CHANGE_FEED_KEEPALIVE_SECONDS = float(os.getenv("CHANGE_FEED_KEEPALIVE_SECONDS", "15"))
+# Seconds the listener waits before reconnecting after losing its connection
+CHANGE_FEED_RETRY_SECONDS = float(os.getenv("CHANGE_FEED_RETRY_SECONDS", "2"))
+
+# NOTIFY channel of the migration 0006 triggers
+CHANNEL = "crm_changes"
+# Seconds a first subscriber waits for the listener to be LISTENing
+START_TIMEOUT_SECONDS = 5
+
+logger = logging.getLogger("crm.change_feed")
+
+# Queued for a subscriber that must resynchronise: it fell behind, or the
+# listener reconnected and may have missed events
+RESET = object()
+# Queued when the feed closes
+CLOSED = object()
+
+class Subscription:
+    """One SSE client: its filters and the queue its events are delivered to"""
+
+    def __init__(self, entities: Optional[FrozenSet[str]], account_id: Optional[int], max_queued: int):
+        self.entities = entities
+        self.account_id = account_id
+        self.max_queued = max_queued
+        self.loop = asyncio.get_running_loop()
+        self.queue: asyncio.Queue = asyncio.Queue()
+        # Events logged after the client's Last-Event-ID, and whether it was found
+        self.backlog: List[Dict[str, Any]] = []
+        self.resumed = True
+        self._stopped = False
+
+    def matches(self, event: Dict[str, Any]) -> bool:
+        return ((self.entities is None or event["entity"] in self.entities)
+                and (self.account_id is None or event["account_id"] == self.account_id))
+
+    def _deliver(self, items):
+        # Runs on the subscriber's event loop
+        for item in items:
+            if self._stopped:
+                return
+            if item is RESET or item is CLOSED or self.queue.qsize() >= self.max_queued:
+                self._stopped = True
+                item = CLOSED if item is CLOSED else RESET
+            self.queue.put_nowait(item)
+
+    def offer(self, items: List[Any]) -> bool:
+        """Hand the matching ``items`` to the subscriber's loop; False once that loop is gone"""
+        items = [item for item in items if not isinstance(item, dict) or self.matches(item)]
+        if not items:
+            return True
+        try:
+            self.loop.call_soon_threadsafe(self._deliver, items)
+        except RuntimeError:
+            return False
+        return True
+
+class ChangeFeed:
+    """Fans database change notifications out to SSE subscribers.
+
+    One background thread holds a dedicated connection LISTENing on
+    ``crm_changes``, started by the first subscriber. Each notification
+    is appended to a bounded in-memory log and offered to every matching
+    subscriber. Subscribing and publishing share a lock, so a resuming
+    client gets the logged events after its Last-Event-ID and then the live
+    ones, without gaps or repeats. The log is in delivery (commit) order,
+    which every listener sees the same way, so ids stay valid across
+    workers. When the listener has to reconnect, events may have been
+    missed: the log is cleared and subscribers are sent a reset. The same
+    happens on a ``{"reset": reason}`` notification, which bulk loads send
+    instead of per-row events.
+    """
+
+    def __init__(
+        self,
+        config: Callable[[], Dict[str, Any]],
+        log_size: int = CHANGE_FEED_LOG_SIZE,
+        max_queued: int = CHANGE_FEED_QUEUE_SIZE,
+    ):
+        self.config = config
+        self.max_queued = max_queued
+        self._log = deque(maxlen=log_size)
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._listening = threading.Event()
+        self._wakeup = None
+        self.events = 0
+        self.reconnects = 0
+
+    def start(self):
+        """Start the listener thread if it isn't running and wait until it is listening"""
+        with self._lock:
+            if self._thread is None:
+                self._stop.clear()
+                self._wakeup = os.pipe()
+                self._thread = threading.Thread(target=self._run, name="change-feed", daemon=True)
+                self._thread.start()
+        if not self._listening.wait(START_TIMEOUT_SECONDS):
+            logger.warning("Change feed listener is not connected yet")
+
+    def close(self):
+        """Stop the listener and end every open stream"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+            if thread is None:
+                return
+            self._stop.set()
+            os.write(self._wakeup[1], b"x")
+            subscribers, self._subscribers = self._subscribers, set()
+            self._log.clear()
+        thread.join()
+        for fd in self._wakeup:
+            os.close(fd)
+        for subscriber in subscribers:
+            subscriber.offer([CLOSED])
+
+    def subscribe(
+        self,
+        entities: Optional[FrozenSet[str]] = None,
+        account_id: Optional[int] = None,
+        last_event_id: Optional[int] = None,
+    ) -> Subscription:
+        """Register a subscriber, with the logged events after ``last_event_id`` as its backlog.
+
+        Call ``start()`` first (it blocks until the listener is connected)."""
+        subscription = Subscription(entities, account_id, self.max_queued)
+        with self._lock:
+            if last_event_id is not None:
+                ids = [event["id"] for event in self._log]
+                if last_event_id in ids:
+                    events = list(self._log)[ids.index(last_event_id) + 1:]
+                    subscription.backlog = [event for event in events if subscription.matches(event)]
+                else:
+                    subscription.resumed = False
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def publish(self, events: List[Dict[str, Any]]):
+        """Log ``events`` and offer them to the subscribers"""
+        with self._lock:
+            self._log.extend(events)
+            self.events += len(events)
+            gone = [subscriber for subscriber in self._subscribers if not subscriber.offer(events)]
+            self._subscribers.difference_update(gone)
+
+    def _reset(self):
+        with self._lock:
+            self._log.clear()
+            subscribers, self._subscribers = self._subscribers, set()
+        for subscriber in subscribers:
+            subscriber.offer([RESET])
+
+    def _listen(self):
+        conn = psycopg2.connect(**self.config())
+        try:
+            conn.autocommit = True
+            with conn.cursor() as cur:
+                cur.execute(f"LISTEN {CHANNEL}")
+            self._listening.set()
+            while not self._stop.is_set():
+                ready, _, _ = select.select([conn, self._wakeup[0]], [], [])
+                if conn in ready:
+                    conn.poll()
+                    while conn.notifies:
+                        notify = conn.notifies.pop(0)
+                        try:
+                            payload = json.loads(notify.payload)
+                            if isinstance(payload, dict) and "reset" in payload:
+                                logger.info("Change feed reset: %s", payload["reset"])
+                                self._reset()
+                            else:
+                                self.publish(payload)
+                        except (ValueError, TypeError, KeyError):
+                            logger.warning("Ignoring malformed change notification %r", notify.payload[:200])
+        finally:
+            self._listening.clear()
+            conn.close()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self._listen()
+            except (psycopg2.Error, OSError) as error:
+                if self._stop.is_set():
+                    break
+                logger.warning("Change feed listener lost its connection: %s", error)
+                self.reconnects += 1
+                self._reset()
+                self._stop.wait(CHANGE_FEED_RETRY_SECONDS)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "listening": self._listening.is_set(),
+            "subscribers": len(self._subscribers),
+            "events": self.events,
+            "logged": len(self._log),
+            "reconnects": self.reconnects,
+        }
+
+def format_event(event: Dict[str, Any]) -> str:
+    """One SSE message for a change event"""
+    return f"id: {event['id']}\nevent: change\ndata: {json.dumps(event, separators=(',', ':'))}\n\n"
+
+def format_reset(reason: str) -> str:
+    """SSE message telling the client to refetch what it shows; the empty id
+    makes its next reconnect start from the live feed"""
+    return f"id:\nevent: reset\ndata: {json.dumps({'reason': reason})}\n\n"
+
+change_feed = ChangeFeed(config=lambda: db_manager.config)
@@ -1,9 +1,20 @@
+import hashlib
+import os
+import time
+
 import pytest
 import psycopg2
 from fastapi.testclient import TestClient
 from api import app
-from database import DatabaseManager
-import os
+from cache import entity_cache
+from database import DatabaseManager, db_manager
+from migrate import apply_migrations, discover_migrations
+
+# Under pytest-xdist each worker ("gw0", "gw1", ...) gets its own database,
+# cloned from a template that is migrated once
+WORKER = os.getenv("PYTEST_XDIST_WORKER", "")
+TEST_DB_NAME = os.getenv("TEST_DB_NAME", "crm_test")
+TEMPLATE_DB_NAME = f"{TEST_DB_NAME}_template"
 
 # Test database configuration
 TEST_DB_CONFIG = {
@@ -11,115 +22,111 @@ TEST_DB_CONFIG = {
     "port": int(os.getenv("TEST_DB_PORT", "5432")),
     "user": os.getenv("TEST_DB_USER", "crmuser"),
     "password": os.getenv("TEST_DB_PASSWORD", "crmsecret"),
-    "dbname": os.getenv("TEST_DB_NAME", "crm_test")
+    "dbname": f"{TEST_DB_NAME}_{WORKER}" if WORKER else TEST_DB_NAME
 }
 
+# Tables whose ids restart at 1 for every test, and that committed tests empty afterwards
+TABLES = ("call_transcripts", "calls", "emails", "contacts", "accounts")
+
+SESSION_STARTED = time.perf_counter()
+TEST_SECONDS = []
+
+def migrations_fingerprint() -> str:
+    """Hash of every migration script, stored on the template to tell when it is stale"""
+    digest = hashlib.sha256()
+    for migration in discover_migrations():
+        for path in filter(None, (migration.up_path, migration.down_path)):
+            with open(path, "rb") as f:
+                digest.update(f.read())
+    return digest.hexdigest()
+
+def _clone_template(cur):
+    """(Re)build the template if the migrations changed, then clone this worker's database from it"""
+    fingerprint = migrations_fingerprint()
+    cur.execute("SELECT shobj_description(oid, 'pg_database') FROM pg_database WHERE datname = %s", (TEMPLATE_DB_NAME,))
+    row = cur.fetchone()
+    if row is None or row[0] != fingerprint:
+        cur.execute(f"DROP DATABASE IF EXISTS {TEMPLATE_DB_NAME}")
+        cur.execute(f"CREATE DATABASE {TEMPLATE_DB_NAME}")
+        # Create the schema through the migrations, exactly as in production
+        apply_migrations({**TEST_DB_CONFIG, "dbname": TEMPLATE_DB_NAME})
+        cur.execute(f"COMMENT ON DATABASE {TEMPLATE_DB_NAME} IS %s", (fingerprint,))
+    cur.execute(f"DROP DATABASE IF EXISTS {TEST_DB_CONFIG['dbname']} WITH (FORCE)")
+    cur.execute(f"CREATE DATABASE {TEST_DB_CONFIG['dbname']} TEMPLATE {TEMPLATE_DB_NAME}")
+
 @pytest.fixture(scope="session")
 def test_db():
-    """Create test database and tables"""
-    # Create test database if it doesn't exist
+    """Create this worker's test database from the migrated template"""
     admin_config = TEST_DB_CONFIG.copy()
     admin_config["dbname"] = "postgres"
     
     conn = psycopg2.connect(**admin_config)
     conn.autocommit = True
-    cur = conn.cursor()
-    
-    # Drop and create test database
-    cur.execute(f"DROP DATABASE IF EXISTS {TEST_DB_CONFIG['dbname']}")
-    cur.execute(f"CREATE DATABASE {TEST_DB_CONFIG['dbname']}")
-    
+    with conn.cursor() as cur:
+        # Workers start together; one builds the template while the others wait
+        cur.execute("SELECT pg_advisory_lock(hashtext(%s))", (TEMPLATE_DB_NAME,))
+        try:
+            _clone_template(cur)
+        finally:
+            cur.execute("SELECT pg_advisory_unlock(hashtext(%s))", (TEMPLATE_DB_NAME,))
     conn.close()
     
-    # Connect to test database and create tables
-    test_conn = psycopg2.connect(**TEST_DB_CONFIG)
-    test_conn.autocommit = True
-    test_cur = test_conn.cursor()
-    
-    # Create tables
-    test_cur.execute("""
-        CREATE TABLE accounts (
-            id SERIAL PRIMARY KEY,
-            name VARCHAR(255) NOT NULL,
-            industry VARCHAR(100),
-            plan VARCHAR(50),
-            status VARCHAR(50),
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
-    
-    test_cur.execute("""
-        CREATE TABLE contacts (
-            id SERIAL PRIMARY KEY,
-            account_id INTEGER REFERENCES accounts(id) ON DELETE CASCADE,
-            first_name VARCHAR(100) NOT NULL,
-            last_name VARCHAR(100) NOT NULL,
-            email VARCHAR(255) UNIQUE NOT NULL,
-            phone VARCHAR(50),
-            title VARCHAR(100),
-            role VARCHAR(100),
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
-    
-    test_cur.execute("""
-        CREATE TABLE emails (
-            id SERIAL PRIMARY KEY,
-            contact_id INTEGER REFERENCES contacts(id) ON DELETE CASCADE,
-            subject VARCHAR(255) NOT NULL,
-            body TEXT,
-            sent_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
-    
-    test_cur.execute("""
-        CREATE TABLE calls (
-            id SERIAL PRIMARY KEY,
-            contact_id INTEGER REFERENCES contacts(id) ON DELETE CASCADE,
-            call_type VARCHAR(50) NOT NULL,
-            duration INTEGER,
-            outcome VARCHAR(255),
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
-    
-    test_cur.execute("""
-        CREATE TABLE call_transcripts (
-            id SERIAL PRIMARY KEY,
-            call_id INTEGER REFERENCES calls(id) ON DELETE CASCADE,
-            transcript TEXT NOT NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
-    
-    test_conn.close()
-    
     yield TEST_DB_CONFIG
     
-    # Cleanup: drop test database
+    # Cleanup: drop this worker's database (the template is kept for the next run)
     conn = psycopg2.connect(**admin_config)
     conn.autocommit = True
-    cur = conn.cursor()
-    cur.execute(f"DROP DATABASE IF EXISTS {TEST_DB_CONFIG['dbname']}")
+    with conn.cursor() as cur:
+        cur.execute(f"DROP DATABASE IF EXISTS {TEST_DB_CONFIG['dbname']} WITH (FORCE)")
     conn.close()
 
 @pytest.fixture
 def test_db_manager(test_db):
     """Create a test database manager"""
-    return DatabaseManager(test_db)
+    manager = DatabaseManager(test_db)
+    yield manager
+    manager.close()
+
+@pytest.fixture(autouse=True)
+def db_transaction(request, test_db, test_db_manager):
+    """Run each test in a transaction that is rolled back afterwards.
+
+    Both the test's manager and the app's are pinned to one connection, so
+    the app's own transactions become savepoints and nothing is committed.
+    Tests marked ``committed`` (they need other connections to see their
+    writes, or NOTIFY) run normally and the tables are truncated afterwards.
+    """
+    restart_ids = "SELECT setval(pg_get_serial_sequence(name, 'id'), 1, false) FROM unnest(%s::text[]) AS name"
+    if request.node.get_closest_marker("committed"):
+        with test_db_manager.get_cursor() as cur:
+            cur.execute(restart_ids, (list(TABLES),))
+        yield None
+        with test_db_manager.get_cursor() as cur:
+            cur.execute(f"TRUNCATE {', '.join(TABLES)} CASCADE")
+    else:
+        conn = psycopg2.connect(**test_db)
+        try:
+            with conn.cursor() as cur:
+                cur.execute(restart_ids, (list(TABLES),))
+            with test_db_manager.pinned(conn), db_manager.pinned(conn):
+                yield conn
+        finally:
+            conn.rollback()
+            conn.close()
+    # Ids restart, so cached rows from this test would leak into the next one
+    entity_cache.clear()
 
 @pytest.fixture
 def client(test_db_manager):
     """Create test client with test database"""
     # Override the database manager in the app
-    from database import db_manager
     original_config = db_manager.config
     db_manager.config = test_db_manager.config
     
     with TestClient(app) as test_client:
         yield test_client
     
-    # Restore original config
+    # Restore original config (this also closes the pooled test connections)
     db_manager.config = original_config
 
 @pytest.fixture
@@ -172,10 +179,16 @@ def sample_transcript_data():
         "transcript": "This is a sample call transcript"
     }
 
-@pytest.fixture(autouse=True)
-def clean_db(test_db_manager):
-    """Clean database before each test"""
-    yield
-    # Clean up after each test
-    with test_db_manager.get_cursor() as cur:
-        cur.execute("TRUNCATE call_transcripts, calls, emails, contacts, accounts RESTART IDENTITY CASCADE") 
\ No newline at end of file
+def pytest_runtest_logreport(report):
+    TEST_SECONDS.append(report.duration)
+
+def pytest_terminal_summary(terminalreporter, config):
+    """Report wall-clock time next to the summed test time, to keep an eye on both"""
+    workers = getattr(config.option, "numprocesses", None) or 1
+    wall = time.perf_counter() - SESSION_STARTED
+    terminalreporter.write_sep(
+        "-", f"wall clock {wall:.1f}s for {sum(TEST_SECONDS):.1f}s of test time on {workers} worker(s)"
+    )
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "committed: run without the per-test rollback; tables are truncated afterwards")
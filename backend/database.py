@@ -1,8 +1,18 @@
 import psycopg2
+import psycopg2.errors
 import psycopg2.extras
-from contextlib import contextmanager
-from typing import Dict, Any, Optional
+from contextlib import ExitStack, contextmanager
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Tuple
 import os
+import threading
+import time
+import uuid
+from metrics import DB_LATENCY, DB_ROWS, METRICS_ENABLED
+from pool import ConnectionPool, PoolTimeoutError
+from prepared import PREPARED_STATEMENTS_ENABLED, PreparingConnection
+from replicas import DB_REPLICAS, ReplicaSet, parse_replicas, reads_need_primary
+from slow_queries import SLOW_QUERY_EXPLAIN_TIMEOUT_MS, slow_query_log
 
 # Database configuration
 DB_CONFIG = {
@@ -13,43 +23,348 @@ DB_CONFIG = {
     "dbname": os.getenv("DB_NAME", "crm")
 }
 
+# Connection pool configuration
+POOL_CONFIG = {
+    "enabled": os.getenv("DB_POOL_ENABLED", "true").lower() in ("1", "true", "yes"),
+    "min_size": int(os.getenv("DB_POOL_MIN_SIZE", "1")),
+    "max_size": int(os.getenv("DB_POOL_MAX_SIZE", "20")),
+    "timeout": float(os.getenv("DB_POOL_TIMEOUT", "10")),
+    "health_check_interval": float(os.getenv("DB_POOL_HEALTH_CHECK_INTERVAL", "30")),
+    "max_idle": float(os.getenv("DB_POOL_MAX_IDLE", "300")),
+}
+
+# Read replicas for execute_query/execute_single/iter_query (see replicas.py)
+REPLICA_CONFIGS = parse_replicas(DB_REPLICAS, DB_CONFIG)
+
+# Appended to a SELECT list to read each row's version for ETags: the id of
+# the transaction that last wrote the row, which changes on every UPDATE
+ROW_VERSION_COLUMN = "xmin::text AS row_version"
+
+@lru_cache(maxsize=512)
+def compile_row_mapper(columns: Tuple[str, ...]):
+    """Build a function that turns a row tuple into a dict for these columns.
+
+    Mappers are cached per query shape, and the generated dict literal is
+    about three times faster than ``dict(zip(columns, row))``.
+    """
+    items = ", ".join(f"{name!r}: row[{index}]" for index, name in enumerate(columns))
+    namespace = {}
+    exec(f"def row_mapper(row):\n    return {{{items}}}", namespace)
+    return namespace["row_mapper"]
+
+class TimedCursor(psycopg2.extensions.cursor):
+    """Cursor that records execute/fetch latency and fetched row counts,
+    and reports slow statements to the slow-query log.
+
+    On a PreparingConnection, autocommit statements go through the
+    connection's prepared statement cache.
+    """
+
+    def execute(self, query, vars=None):
+        started = time.perf_counter()
+        try:
+            execute_prepared = getattr(self.connection, "execute_prepared", None)
+            if execute_prepared is not None and self.name is None and self.connection.autocommit:
+                return execute_prepared(super().execute, query, vars)
+            return super().execute(query, vars)
+        finally:
+            elapsed = time.perf_counter() - started
+            if METRICS_ENABLED:
+                DB_LATENCY.observe(elapsed, "psycopg2", "execute")
+            slow_query_log.observe(query, vars, elapsed, "psycopg2")
+
+    def _fetched(self, started: float, rows: int):
+        if METRICS_ENABLED:
+            DB_LATENCY.observe(time.perf_counter() - started, "psycopg2", "fetch")
+            DB_ROWS.observe(rows, "psycopg2")
+
+    def fetchone(self):
+        started = time.perf_counter()
+        row = super().fetchone()
+        self._fetched(started, 0 if row is None else 1)
+        return row
+
+    def fetchmany(self, size=None):
+        started = time.perf_counter()
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self._fetched(started, len(rows))
+        return rows
+
+    def fetchall(self):
+        started = time.perf_counter()
+        rows = super().fetchall()
+        self._fetched(started, len(rows))
+        return rows
+
+def is_connection_failure(error: psycopg2.Error) -> bool:
+    """Whether ``error`` means the server is unreachable or going away, rather than a failed statement"""
+    return error.pgcode is None or error.pgcode.startswith(("08", "57P"))
+
+# Cursor class for the manager's cursors. Always timed, so the slow-query
+# log can be switched on at runtime even with metrics off.
+CURSOR_FACTORY = TimedCursor
+
 class DatabaseManager:
-    def __init__(self, config: Dict[str, Any] = None):
-        self.config = config or DB_CONFIG
+    def __init__(self, config: Dict[str, Any] = None, pool_config: Dict[str, Any] = None,
+                 prepared_statements: bool = PREPARED_STATEMENTS_ENABLED,
+                 replicas: Optional[List[Dict[str, Any]]] = None):
+        self._config = config or DB_CONFIG
+        self.pool_config = pool_config or POOL_CONFIG
+        # Prepare hot statements on pooled (long-lived) connections
+        self.prepared_statements = prepared_statements
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        # Connection every checkout uses instead of the pool (see ``pinned``)
+        self._pinned = None
+        self.set_replicas(REPLICA_CONFIGS if replicas is None else replicas)
+    
+    @property
+    def config(self) -> Dict[str, Any]:
+        return self._config
+    
+    @config.setter
+    def config(self, value: Dict[str, Any]):
+        """Point the manager at another database, dropping pooled connections"""
+        self._config = value
+        self.close()
+    
+    @property
+    def pooled(self) -> bool:
+        return self.pool_config.get("enabled", False)
+    
+    @property
+    def pool(self) -> Optional[ConnectionPool]:
+        """The connection pool, created on first use"""
+        if not self.pooled:
+            return None
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = ConnectionPool(self._config, **self._pool_options())
+        return self._pool
+    
+    def _pool_options(self) -> Dict[str, Any]:
+        options = {k: v for k, v in self.pool_config.items() if k != "enabled"}
+        if self.prepared_statements:
+            options["connection_factory"] = PreparingConnection
+        return options
+    
+    def set_replicas(self, configs: List[Dict[str, Any]]):
+        """Route reads to these replicas (an empty list sends everything to the primary)"""
+        previous = getattr(self, "replicas", None)
+        self.replicas = ReplicaSet(configs, self._pool_options() if self.pooled else None)
+        if previous is not None:
+            previous.close()
+    
+    def replica_stats(self) -> Optional[Dict[str, Any]]:
+        """Read routing statistics, or None without replicas"""
+        return self.replicas.stats() if self.replicas else None
+    
+    def open(self):
+        """Warm the pool up to its minimum size"""
+        if self.pooled:
+            self.pool.open()
+    
+    def close(self):
+        """Close all pooled connections"""
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.close()
+        self.replicas.close()
+    
+    def pool_stats(self) -> Optional[Dict[str, Any]]:
+        """Pool statistics, or None when pooling is disabled"""
+        if not self.pooled:
+            return None
+        return self.pool.stats()
     
     def get_connection(self):
-        """Get a database connection"""
+        """Get a dedicated (unpooled) database connection"""
         conn = psycopg2.connect(**self.config)
         conn.autocommit = True
         return conn
     
+    @staticmethod
+    def _observe_connect(started: float):
+        if METRICS_ENABLED:
+            DB_LATENCY.observe(time.perf_counter() - started, "psycopg2", "connect")
+    
     @contextmanager
-    def get_cursor(self):
-        """Context manager for database cursor"""
+    def connection(self):
+        """Context manager for a pooled (or dedicated) database connection.
+
+        The time to check out (or open) the connection is recorded as the
+        ``connect`` operation.
+        """
+        started = time.perf_counter()
+        if self._pinned is not None:
+            # Each checkout behaves like an autocommit unit of work: a failed
+            # statement is undone without aborting the enclosing transaction
+            self._observe_connect(started)
+            with self._savepoint(self._pinned):
+                yield self._pinned
+            return
+        if self.pooled:
+            with self.pool.connection() as conn:
+                self._observe_connect(started)
+                yield conn
+            return
         conn = self.get_connection()
+        self._observe_connect(started)
         try:
-            cur = conn.cursor()
-            yield cur
+            yield conn
         finally:
             conn.close()
     
+    @contextmanager
+    def pinned(self, conn):
+        """Serve every checkout from ``conn``, which is inside a transaction the caller owns.
+
+        Transactions become savepoints, so everything done meanwhile can be
+        undone by rolling ``conn`` back. The test suite runs each test this way.
+        """
+        previous, self._pinned = self._pinned, conn
+        try:
+            yield conn
+        finally:
+            self._pinned = previous
+    
+    @contextmanager
+    def _savepoint(self, conn, rollback: bool = False):
+        name = f"sp_{uuid.uuid4().hex}"
+        with conn.cursor() as cur:
+            cur.execute(f"SAVEPOINT {name}")
+        try:
+            yield
+        except BaseException:
+            if not conn.closed:
+                with conn.cursor() as cur:
+                    cur.execute(f"ROLLBACK TO SAVEPOINT {name}")
+            raise
+        failed = conn.info.transaction_status == psycopg2.extensions.TRANSACTION_STATUS_INERROR
+        with conn.cursor() as cur:
+            cur.execute(f"{'ROLLBACK TO' if rollback or failed else 'RELEASE'} SAVEPOINT {name}")
+    
+    @contextmanager
+    def _atomic(self, conn, rollback: bool = False):
+        """Run a block in one transaction on ``conn``, committed at the end
+        (or, with ``rollback``, always rolled back); a savepoint on a pinned connection"""
+        if conn is self._pinned:
+            with self._savepoint(conn, rollback):
+                yield
+            return
+        conn.autocommit = False
+        try:
+            yield
+            if rollback:
+                conn.rollback()
+            else:
+                conn.commit()
+        except BaseException:
+            if not conn.closed:
+                conn.rollback()
+            raise
+        finally:
+            if not conn.closed:
+                conn.autocommit = True
+    
+    @contextmanager
+    def read_connection(self):
+        """Context manager for a connection to read from, as ``(connection, replica)``.
+
+        A healthy replica is used, in round-robin order, unless the current
+        request must read its own writes. Replicas that can't be reached
+        are ejected. Without replicas, or when none is available, this is
+        the primary and ``replica`` is None.
+        """
+        if self.replicas and not reads_need_primary():
+            for replica in self.replicas.candidates():
+                with ExitStack() as stack:
+                    try:
+                        conn = stack.enter_context(replica.connection())
+                    except PoolTimeoutError:
+                        continue
+                    except psycopg2.OperationalError:
+                        replica.eject()
+                        continue
+                    replica.reads += 1
+                    yield conn, replica
+                    return
+        if self.replicas:
+            self.replicas.primary_reads += 1
+        with self.connection() as conn:
+            yield conn, None
+    
+    def _read(self, query: str, params, fetch, primary: bool = False):
+        """Run a read on a replica when possible, retrying it on the primary if the replica fails.
+
+        Hot standbys may also cancel a query that conflicts with recovery,
+        and replica sessions run under ``DB_REPLICA_STATEMENT_TIMEOUT_MS``;
+        those cancels are retried on the primary without ejecting the
+        replica. With ``primary`` the read skips the replicas.
+        """
+        replica = None
+        if primary:
+            with self.get_cursor() as cur:
+                cur.execute(query, params)
+                return fetch(cur), cur
+        try:
+            with self.read_connection() as (conn, replica):
+                cur = conn.cursor(cursor_factory=CURSOR_FACTORY)
+                cur.execute(query, params)
+                return fetch(cur), cur
+        except (psycopg2.OperationalError, psycopg2.InterfaceError, psycopg2.errors.SerializationFailure) as e:
+            if replica is None:
+                raise
+            if not isinstance(e, (psycopg2.errors.SerializationFailure, psycopg2.errors.QueryCanceled)):
+                if not is_connection_failure(e):
+                    raise
+                replica.eject()
+        with self.get_cursor() as cur:
+            cur.execute(query, params)
+            return fetch(cur), cur
+    
+    @contextmanager
+    def get_cursor(self):
+        """Context manager for database cursor"""
+        with self.connection() as conn:
+            yield conn.cursor(cursor_factory=CURSOR_FACTORY)
+    
+    def row_mapper(self, cursor):
+        """Compiled tuple-to-dict function for the cursor's result shape"""
+        return compile_row_mapper(tuple(desc[0] for desc in cursor.description))
+    
     def row_to_dict(self, row, cursor):
         """Convert database row to dictionary"""
         if row is None:
             return None
-        return dict(zip([desc[0] for desc in cursor.description], row))
+        return self.row_mapper(cursor)(row)
     
-    def execute_query(self, query: str, params: tuple = None):
-        """Execute a query and return results"""
-        with self.get_cursor() as cur:
-            cur.execute(query, params)
-            return cur.fetchall(), cur
+    def rows_to_dicts(self, rows, cursor):
+        """Convert database rows to dictionaries with one mapper lookup"""
+        if not rows:
+            return []
+        mapper = self.row_mapper(cursor)
+        return [mapper(row) for row in rows]
     
-    def execute_single(self, query: str, params: tuple = None):
-        """Execute a query and return single result"""
-        with self.get_cursor() as cur:
-            cur.execute(query, params)
-            return cur.fetchone(), cur
+    def rows_to_versioned_dicts(self, rows, cursor):
+        """Split rows selected with ROW_VERSION_COLUMN last into (dicts, versions)"""
+        mapper = compile_row_mapper(tuple(desc[0] for desc in cursor.description[:-1]))
+        return [mapper(row) for row in rows], [row[-1] for row in rows]
+    
+    def execute_query(self, query: str, params: tuple = None, primary: bool = False):
+        """Execute a read query and return results (on a replica when there are any, unless ``primary``).
+
+        Reads whose results outlive the request, such as cache fills, or that
+        must see the latest commits, such as validation before a write, pass
+        ``primary=True``.
+        """
+        return self._read(query, params, lambda cur: cur.fetchall(), primary)
+    
+    def execute_single(self, query: str, params: tuple = None, primary: bool = False):
+        """Execute a read query and return single result (on a replica when there are any, unless ``primary``)"""
+        return self._read(query, params, lambda cur: cur.fetchone(), primary)
     
     def execute_insert(self, query: str, params: tuple = None):
         """Execute an insert query and return the inserted record"""
@@ -68,9 +383,62 @@ class DatabaseManager:
         with self.get_cursor() as cur:
             cur.execute(query, params)
             return cur.rowcount
+    
+    @contextmanager
+    def transaction(self):
+        """Context manager for a cursor whose statements commit or roll back together"""
+        with self.connection() as conn, self._atomic(conn):
+            with conn.cursor(cursor_factory=CURSOR_FACTORY) as cur:
+                yield cur
+    
+    def execute_values(self, query: str, rows: list, page_size: int = 1000):
+        """Insert many rows with multi-row VALUES lists in one transaction.
+
+        ``query`` must contain a single ``VALUES %s`` placeholder; any
+        ``RETURNING`` rows are returned in input order.
+        """
+        with self.transaction() as cur:
+            return psycopg2.extras.execute_values(cur, query, rows, page_size=page_size, fetch=True)
+    
+    def explain(self, query, params=None, analyze: bool = True) -> str:
+        """``EXPLAIN (ANALYZE, BUFFERS)`` plan of a statement, or just ``EXPLAIN`` without ``analyze``.
+
+        With ``analyze`` the statement really runs, so only pass it for
+        statements that merely read. Either way this happens in a transaction
+        that is always rolled back, under ``SLOW_QUERY_EXPLAIN_TIMEOUT_MS``.
+        """
+        if isinstance(query, bytes):
+            query = query.decode("utf-8")
+        with self.connection() as conn, self._atomic(conn, rollback=True):
+            with conn.cursor() as cur:
+                cur.execute("SET LOCAL statement_timeout = %s", (SLOW_QUERY_EXPLAIN_TIMEOUT_MS,))
+                cur.execute(("EXPLAIN (ANALYZE, BUFFERS) " if analyze else "EXPLAIN ") + query, params)
+                return "\n".join(row[0] for row in cur.fetchall())
+    
+    def iter_query(self, query: str, params: tuple = None, batch_size: int = 1000):
+        """Stream query results as dicts through a server-side cursor.
+
+        Rows are pulled ``batch_size`` at a time with ``fetchmany`` so memory
+        stays flat regardless of the result size. Named cursors only live
+        inside a transaction, so the connection leaves autocommit for the
+        duration of the iteration. Reads from a replica when there are any.
+        """
+        with self.read_connection() as (conn, _), self._atomic(conn, rollback=True):
+            with conn.cursor(name=f"iter_{uuid.uuid4().hex}", cursor_factory=CURSOR_FACTORY) as cur:
+                cur.itersize = batch_size
+                cur.execute(query, params)
+                mapper = None
+                while True:
+                    rows = cur.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    mapper = mapper or self.row_mapper(cur)
+                    for row in rows:
+                        yield mapper(row)
 
 # Global database manager instance
 db_manager = DatabaseManager()
+slow_query_log.explainer = db_manager.explain
 
 # Helper functions for common database operations
 def get_db():
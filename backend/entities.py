@@ -0,0 +1,130 @@
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple, Type
+
+from fastapi import HTTPException, Query
+from pydantic import BaseModel
+
+from models import (
+    Account, AccountCreate, AccountUpdate,
+    Contact, ContactCreate, ContactUpdate,
+    Email, EmailCreate, EmailUpdate,
+    Call, CallCreate, CallUpdate,
+    CallTranscript, CallTranscriptCreate, CallTranscriptUpdate, CallTranscriptSummary,
+)
+
+@dataclass(frozen=True)
+class Entity:
+    """Table-level metadata for one CRM entity, keyed by its URL name"""
+    name: str
+    table: str
+    label: str
+    model: Type[BaseModel]
+    create_model: Type[BaseModel]
+    update_model: Type[BaseModel]
+    sort_column: str = "created_at"
+    parent_column: Optional[str] = None
+    parent_table: Optional[str] = None
+    unique_columns: Tuple[str, ...] = ()
+    # Model for list pages when they return less than the full row
+    list_model: Optional[Type[BaseModel]] = None
+    # Computed columns as (name, SQL expression) pairs; expressions name
+    # columns with the table prefix so they also work in UPDATE ... FROM
+    expressions: Tuple[Tuple[str, str], ...] = ()
+
+    @property
+    def insert_columns(self) -> Tuple[str, ...]:
+        """Client-writable columns, in create-model field order"""
+        return tuple(self.create_model.model_fields)
+
+    @property
+    def columns(self) -> Tuple[str, ...]:
+        """Columns of the response model, in table order.
+
+        Reads select these instead of ``*`` so internal columns (such as
+        search vectors) never reach responses.
+        """
+        server_columns = [name for name in self.model.model_fields if name != "id" and name not in self.insert_columns]
+        return ("id", *self.insert_columns, *server_columns)
+
+    @property
+    def list_columns(self) -> Tuple[str, ...]:
+        """Columns of list pages: the list model's fields, or every column"""
+        if self.list_model is None:
+            return self.columns
+        return ("id", *(name for name in self.list_model.model_fields if name != "id"))
+
+    @property
+    def select_list(self) -> str:
+        return self.select_sql(self.columns)
+
+    def select_sql(self, columns: Tuple[str, ...], qualified: bool = False) -> str:
+        """SELECT list for ``columns``, expanding computed columns"""
+        expressions = dict(self.expressions)
+        prefix = f"{self.table}." if qualified else ""
+        return ", ".join(
+            f"{expressions[name]} AS {name}" if name in expressions else f"{prefix}{name}" for name in columns
+        )
+
+# A streamed transcript keeps only its leading characters in the transcript
+# column; byte_length is the size of the whole text
+TRANSCRIPT_TRUNCATED = (
+    "coalesce(call_transcripts.byte_length > octet_length(call_transcripts.transcript), false)"
+)
+
+ENTITIES: Dict[str, Entity] = {
+    entity.name: entity for entity in (
+        Entity("accounts", "accounts", "Account", Account, AccountCreate, AccountUpdate),
+        Entity("contacts", "contacts", "Contact", Contact, ContactCreate, ContactUpdate,
+               parent_column="account_id", parent_table="accounts", unique_columns=("email",)),
+        Entity("emails", "emails", "Email", Email, EmailCreate, EmailUpdate,
+               sort_column="sent_at", parent_column="contact_id", parent_table="contacts"),
+        Entity("calls", "calls", "Call", Call, CallCreate, CallUpdate,
+               parent_column="contact_id", parent_table="contacts"),
+        Entity("call-transcripts", "call_transcripts", "Call transcript",
+               CallTranscript, CallTranscriptCreate, CallTranscriptUpdate,
+               parent_column="call_id", parent_table="calls",
+               list_model=CallTranscriptSummary, expressions=(
+                   ("preview", "left(call_transcripts.transcript, 200)"),
+                   ("truncated", TRANSCRIPT_TRUNCATED),
+                   ("content_url", f"CASE WHEN {TRANSCRIPT_TRUNCATED} THEN '/call-transcripts/' || call_transcripts.id || '/content' END"),
+               )),
+    )
+}
+
+def get_entity(name: str) -> Entity:
+    """Look up an entity by URL name, or 404"""
+    try:
+        return ENTITIES[name]
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown entity '{name}'")
+
+def fields_query(
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (id is always included)"),
+) -> Optional[str]:
+    """The ``fields=`` sparse fieldset parameter shared by the read endpoints"""
+    return fields
+
+def select_columns(
+    entity: Entity,
+    fields: Optional[str],
+    required: Tuple[str, ...] = ("id",),
+    listing: bool = False,
+) -> Tuple[str, ...]:
+    """Columns to SELECT for a ``fields=a,b`` projection, in table order.
+
+    Unrequested columns are never read, so large TEXT values stay on disk
+    (and in TOAST). Without ``fields`` every column is returned; ``listing``
+    selects from the list page columns instead.
+    """
+    available = entity.list_columns if listing else entity.columns
+    if fields is None:
+        return available
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested - set(available)
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown field(s) for {entity.name}: {', '.join(sorted(unknown))}"
+        )
+    return tuple(column for column in available if column in requested or column in required)
+
@@ -0,0 +1,121 @@
+import asyncio
+import logging
+import os
+import signal
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+# GETs sent to the app in-process during startup, before it reports ready
+SERVER_WARMUP_PATHS = [
+    path.strip()
+    for path in os.getenv("SERVER_WARMUP_PATHS", "/accounts/?limit=1,/contacts/?limit=1,/accounts/0,/health").split(",")
+    if path.strip()
+]
+
+# Seconds a worker keeps serving after SIGTERM/SIGINT while /ready answers
+# 503, so load balancers stop routing to it before uvicorn stops accepting
+SERVER_DRAIN_SECONDS = float(os.getenv("SERVER_DRAIN_SECONDS", "0"))
+
+logger = logging.getLogger("crm.lifecycle")
+
+class Readiness:
+    """Where this process is in its lifecycle, as reported by ``/ready``.
+
+    ``starting`` until the pools are open and warm-up finished, then
+    ``ready``, then ``stopping`` from the shutdown signal on. uvicorn only
+    accepts connections after startup, so probes never see ``starting``;
+    ``stopping`` is visible for ``SERVER_DRAIN_SECONDS`` (see ``drain_on_signal``).
+    """
+
+    def __init__(self):
+        self.state = "starting"
+        self.warmup_ms: Optional[float] = None
+        self.warmup_failures: List[str] = []
+
+    @property
+    def ready(self) -> bool:
+        return self.state == "ready"
+
+    def mark_ready(self, warmup_ms: float, failures: List[str]):
+        self.warmup_ms = warmup_ms
+        self.warmup_failures = failures
+        self.state = "ready"
+
+    def mark_stopping(self):
+        self.state = "stopping"
+
+    def reset(self):
+        self.__init__()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "status": self.state,
+            "pid": os.getpid(),
+            "warmup_ms": self.warmup_ms,
+            "warmup_failures": self.warmup_failures,
+        }
+
+readiness = Readiness()
+
+async def warm_up(app, paths: List[str] = SERVER_WARMUP_PATHS) -> List[str]:
+    """Send ``paths`` through the whole ASGI app once; returns the ones that failed.
+
+    The first request on a route builds its dependency and response
+    machinery, row mappers and middleware stack, and the first statements
+    on each pooled connection are parsed and planned; doing that here keeps
+    it off the first real requests. A 404 is fine (``/accounts/0`` warms the
+    by-id path); a 5xx or an exception is logged and the worker starts anyway.
+    """
+    failures = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://warmup") as client:
+        for path in paths:
+            try:
+                response = await client.get(path)
+            except Exception as e:
+                failures.append(path)
+                logger.warning("Warm-up request %s failed: %s", path, e)
+                continue
+            if response.status_code >= 500:
+                failures.append(path)
+                logger.warning("Warm-up request %s returned %s", path, response.status_code)
+    return failures
+
+def drain_on_signal(delay: float = SERVER_DRAIN_SECONDS):
+    """Report ``stopping`` as soon as uvicorn's SIGTERM/SIGINT handler would run, and run it ``delay`` seconds later.
+
+    uvicorn stops accepting connections the moment its handler runs, so
+    without the delay no probe could see the 503. A second signal during
+    the delay is passed straight on (Ctrl+C twice still forces an exit).
+    Outside a uvicorn server's main thread (e.g. under the test client) the
+    handlers are left alone.
+    """
+    if threading.current_thread() is not threading.main_thread():
+        return
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        handler = signal.getsignal(signum)
+        if getattr(handler, "__name__", None) != "handle_exit":
+            continue
+
+        def drain(received, frame, handler=handler):
+            if readiness.state == "stopping":
+                handler(received, frame)
+                return
+            readiness.mark_stopping()
+            logger.info("Draining for %.1fs before shutting down", delay)
+            loop.call_soon_threadsafe(loop.call_later, delay, handler, received, frame)
+
+        signal.signal(signum, drain)
+
+async def start(app, open_pools):
+    """Open the pools, warm the app up, then report ready"""
+    readiness.reset()
+    started = time.perf_counter()
+    await open_pools()
+    failures = await warm_up(app)
+    readiness.mark_ready((time.perf_counter() - started) * 1000, failures)
+    drain_on_signal()
@@ -0,0 +1,523 @@
+#!/usr/bin/env python3
+"""
+HTTP load test for the CRM API with per-endpoint percentiles and regression gates.
+
+Creates and migrates the load-test database, seeds it with
+seed_crm_data.py whenever the requested dataset changes, and starts the
+API under uvicorn. It then drives every router with a weighted read/write
+mix from ``--concurrency`` closed-loop clients while ``--subscribers``
+clients follow the /stream change feed. The report gives count,
+throughput and p50/p95/p99 latency per endpoint. It is compared with a JSON
+baseline, and the exit status is 1 when an endpoint's p95 or the overall
+throughput regresses by more than ``--threshold``, or when a request fails.
+
+    python loadtest.py --update-baseline     # record the baseline
+    python loadtest.py                       # compare against it
+    python run_tests.py load --duration 60   # the same through the test runner
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+import psycopg2
+
+from database import DB_CONFIG
+from migrate import apply_migrations
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(BACKEND_DIR, "benchmarks", "loadtest_baseline.json")
+SAMPLE_SIZE = 2000
+# Routers driven by the --subscribers streams rather than the request mix
+SUBSCRIBED_ROUTERS = ("stream",)
+
+@dataclass
+class Context:
+    """Ids sampled from the seeded database plus rows created during the run"""
+    ids: Dict[str, List[int]]
+    words: List[str]
+    started_at: str
+    created: Dict[str, List[int]] = field(default_factory=lambda: {"accounts": []})
+
+    def pick(self, rng: random.Random, table: str) -> Optional[int]:
+        ids = self.ids.get(table)
+        return rng.choice(ids) if ids else None
+
+# A request as (method, url, httpx keyword arguments), or None when the
+# operation has nothing to act on yet
+Request = Optional[Tuple[str, str, Dict[str, Any]]]
+
+@dataclass(frozen=True)
+class Operation:
+    """One weighted request type of the mix, reported under ``name``"""
+    name: str
+    router: str
+    weight: float
+    build: Callable[[Context, random.Random], Request]
+    expect: Tuple[int, ...] = (200,)
+    after: Optional[Callable[[Context, httpx.Response], None]] = None
+
+def _get(path: str, table: Optional[str] = None, **params) -> Callable[[Context, random.Random], Request]:
+    """GET ``path``, formatting ``{id}`` with an id sampled from ``table``"""
+    def build(context: Context, rng: random.Random) -> Request:
+        if table is None:
+            return "GET", path, {"params": params}
+        row_id = context.pick(rng, table)
+        return None if row_id is None else ("GET", path.format(id=row_id), {"params": params})
+    return build
+
+def _ids_param(table: str, count: int) -> Callable[[Context, random.Random], Request]:
+    def build(context: Context, rng: random.Random) -> Request:
+        ids = context.ids.get(table) or []
+        if not ids:
+            return None
+        chosen = rng.sample(ids, min(count, len(ids)))
+        return "GET", f"/{table}/", {"params": {"ids": ",".join(map(str, chosen))}}
+    return build
+
+def _post_lookup(context: Context, rng: random.Random) -> Request:
+    ids = context.ids.get("emails") or []
+    return ("POST", "/emails/lookup", {"json": {"ids": rng.sample(ids, min(20, len(ids)))}}) if ids else None
+
+def _search(context: Context, rng: random.Random) -> Request:
+    return "GET", "/search", {"params": {"q": rng.choice(context.words), "limit": 20}}
+
+def _export(context: Context, rng: random.Random) -> Request:
+    return "GET", "/export/emails", {"params": {"since": context.started_at}}
+
+def _account_body(rng: random.Random) -> Dict[str, Any]:
+    return {"name": f"Load {uuid.uuid4().hex[:12]}", "industry": "Software", "plan": "Pro", "status": "Active"}
+
+def _create_account(context: Context, rng: random.Random) -> Request:
+    return "POST", "/accounts/", {"json": _account_body(rng)}
+
+def _remember_account(context: Context, response: httpx.Response):
+    if response.status_code == 200:
+        context.created["accounts"].append(response.json()["id"])
+
+def _update_account(context: Context, rng: random.Random) -> Request:
+    created = context.created["accounts"]
+    return ("PUT", f"/accounts/{rng.choice(created)}", {"json": _account_body(rng)}) if created else None
+
+def _delete_account(context: Context, rng: random.Random) -> Request:
+    created = context.created["accounts"]
+    return ("DELETE", f"/accounts/{created.pop(rng.randrange(len(created)))}", {}) if created else None
+
+def _create_contact(context: Context, rng: random.Random) -> Request:
+    account_id = context.pick(rng, "accounts")
+    return None if account_id is None else ("POST", "/contacts/", {"json": {
+        "account_id": account_id, "first_name": "Load", "last_name": "Test",
+        "email": f"load-{uuid.uuid4().hex}@example.com", "title": "Buyer",
+    }})
+
+def _email_body(contact_id: int) -> Dict[str, Any]:
+    return {"contact_id": contact_id, "subject": "Load test follow-up", "body": "Checking in on the proposal. " * 20}
+
+def _create_email(context: Context, rng: random.Random) -> Request:
+    contact_id = context.pick(rng, "contacts")
+    return None if contact_id is None else ("POST", "/emails/", {"json": _email_body(contact_id)})
+
+def _bulk_emails(context: Context, rng: random.Random) -> Request:
+    contact_id = context.pick(rng, "contacts")
+    return None if contact_id is None else ("POST", "/emails/bulk", {"json": [_email_body(contact_id)] * 20})
+
+def _create_call(context: Context, rng: random.Random) -> Request:
+    contact_id = context.pick(rng, "contacts")
+    return None if contact_id is None else ("POST", "/calls/", {"json": {
+        "contact_id": contact_id, "call_type": "follow-up", "duration": rng.randint(60, 3600), "outcome": "Interested"
+    }})
+
+def _batch_onboarding(context: Context, rng: random.Random) -> Request:
+    """An account with a contact and its first call, in one transaction"""
+    return ("POST", "/batch", {"json": {"operations": [
+        {"op": "create", "entity": "accounts", "ref": "account", "data": _account_body(rng)},
+        {"op": "create", "entity": "contacts", "ref": "contact", "data": {
+            "account_id": "$account", "first_name": "Batch", "last_name": "Test",
+            "email": f"batch-{uuid.uuid4().hex}@example.com",
+        }},
+        {"op": "create", "entity": "calls", "data": {
+            "contact_id": "$contact", "call_type": "discovery", "duration": rng.randint(60, 3600),
+        }},
+    ]}})
+
+def _create_transcript(context: Context, rng: random.Random) -> Request:
+    call_id = context.pick(rng, "calls")
+    return None if call_id is None else ("POST", "/call-transcripts/", {"json": {
+        "call_id": call_id, "transcript": "Agent: Thanks for your time today. Customer: Happy to help. " * 30
+    }})
+
+def _upload_transcript(context: Context, rng: random.Random) -> Request:
+    call_id = context.pick(rng, "calls")
+    return None if call_id is None else ("POST", "/call-transcripts/upload", {
+        "params": {"call_id": call_id}, "content": ("Agent: Let's go through the rollout plan.\n" * 2000).encode()
+    })
+
+# The mix: roughly 85% reads and 15% writes, weighted towards by-id and
+# relationship reads like the UI
+OPERATIONS: List[Operation] = [
+    Operation("GET /accounts/", "accounts", 4, _get("/accounts/", limit=50)),
+    Operation("GET /accounts/{id}", "accounts", 10, _get("/accounts/{id}", "accounts")),
+    Operation("POST /accounts/", "accounts", 2, _create_account, after=_remember_account),
+    Operation("PUT /accounts/{id}", "accounts", 1, _update_account, expect=(200, 404)),
+    Operation("DELETE /accounts/{id}", "accounts", 0.5, _delete_account, expect=(200, 404)),
+    Operation("GET /contacts/", "contacts", 2, _get("/contacts/", limit=50)),
+    Operation("GET /contacts/{id}", "contacts", 10, _get("/contacts/{id}", "contacts")),
+    Operation("GET /contacts/?ids=", "contacts", 2, _ids_param("contacts", 20)),
+    Operation("POST /contacts/", "contacts", 2, _create_contact),
+    Operation("GET /emails/", "emails", 2, _get("/emails/", limit=50)),
+    Operation("GET /emails/?fields=", "emails", 2, _get("/emails/", limit=50, fields="subject")),
+    Operation("GET /emails/{id}", "emails", 6, _get("/emails/{id}", "emails")),
+    Operation("POST /emails/", "emails", 3, _create_email),
+    Operation("GET /calls/", "calls", 1, _get("/calls/", limit=50)),
+    Operation("GET /calls/{id}", "calls", 5, _get("/calls/{id}", "calls")),
+    Operation("POST /calls/", "calls", 1, _create_call),
+    Operation("GET /call-transcripts/", "transcripts", 1, _get("/call-transcripts/", limit=50)),
+    Operation("GET /call-transcripts/{id}", "transcripts", 3, _get("/call-transcripts/{id}", "call_transcripts")),
+    Operation("GET /call-transcripts/{id}/content", "transcripts", 1,
+              _get("/call-transcripts/{id}/content", "call_transcripts")),
+    Operation("POST /call-transcripts/", "transcripts", 1, _create_transcript),
+    Operation("POST /call-transcripts/upload", "transcripts", 0.3, _upload_transcript),
+    Operation("GET /accounts/{id}/contacts", "relationships", 6, _get("/accounts/{id}/contacts", "accounts")),
+    Operation("GET /contacts/{id}/emails", "relationships", 6, _get("/contacts/{id}/emails", "contacts")),
+    Operation("GET /contacts/{id}/calls", "relationships", 4, _get("/contacts/{id}/calls", "contacts")),
+    Operation("GET /calls/{id}/transcript", "relationships", 3, _get("/calls/{id}/transcript", "calls"), expect=(200, 404)),
+    Operation("GET /accounts/{id}/timeline", "timeline", 3, _get("/accounts/{id}/timeline", "accounts", limit=20)),
+    Operation("GET /search", "search", 2, _search),
+    Operation("GET /export/emails?since=", "export", 0.3, _export),
+    Operation("POST /emails/bulk", "bulk", 0.3, _bulk_emails),
+    Operation("POST /batch", "batch", 0.5, _batch_onboarding),
+    Operation("POST /emails/lookup", "lookup", 1, _post_lookup),
+    Operation("GET /analytics/accounts/{id}/calls", "analytics", 1, _get("/analytics/accounts/{id}/calls", "accounts")),
+    Operation("GET /analytics/accounts/{id}/emails", "analytics", 1, _get("/analytics/accounts/{id}/emails", "accounts")),
+    Operation("GET /admin/slow-queries", "admin", 0.1, _get("/admin/slow-queries")),
+]
+
+def sample_context(config: Dict[str, Any], sample_size: int = SAMPLE_SIZE) -> Context:
+    """Sample existing ids (and search words) to aim the requests at"""
+    conn = psycopg2.connect(**config)
+    try:
+        with conn.cursor() as cur:
+            ids = {}
+            for table in ("accounts", "contacts", "emails", "calls", "call_transcripts"):
+                # Sampled evenly across the id range rather than ORDER BY random()
+                cur.execute(f"SELECT id FROM {table} WHERE id %% GREATEST((SELECT COUNT(*) FROM {table}) / %s, 1) = 0 "
+                            f"ORDER BY id LIMIT %s", (sample_size, sample_size))
+                ids[table] = [row[0] for row in cur.fetchall()]
+            cur.execute("SELECT subject FROM emails ORDER BY id LIMIT 200")
+            words = sorted({word.strip(".,").lower() for (subject,) in cur.fetchall() for word in subject.split()
+                            if len(word.strip(".,")) > 4})
+    finally:
+        conn.close()
+    return Context(ids, words or ["pricing"], datetime.now(timezone.utc).isoformat())
+
+class Recorder:
+    """Latencies and failures per operation name"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+
+    def add(self, name: str, elapsed: float, ok: bool):
+        self.latencies.setdefault(name, []).append(elapsed)
+        if not ok:
+            self.errors[name] = self.errors.get(name, 0) + 1
+
+async def follow_stream(client: httpx.AsyncClient, recorder: Recorder, counts: Dict[str, int]):
+    """Follow /stream until cancelled, recording the time to its headers and counting change events"""
+    started = time.perf_counter()
+    try:
+        async with client.stream("GET", "/stream") as response:
+            recorder.add("GET /stream", time.perf_counter() - started, response.status_code == 200)
+            async for line in response.aiter_lines():
+                if line == "event: change":
+                    counts["events"] += 1
+    except httpx.HTTPError:
+        recorder.add("GET /stream", time.perf_counter() - started, False)
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile of ``values`` (0 < q <= 1)"""
+    ordered = sorted(values)
+    return ordered[max(math.ceil(q * len(ordered)) - 1, 0)]
+
+def summarize(latencies: List[float], errors: int, duration: float) -> Dict[str, Any]:
+    return {
+        "count": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / duration, 2),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+    }
+
+def build_report(recorder: Recorder, duration: float, settings: Dict[str, Any]) -> Dict[str, Any]:
+    endpoints = {
+        name: summarize(latencies, recorder.errors.get(name, 0), duration)
+        for name, latencies in sorted(recorder.latencies.items())
+    }
+    everything = [value for latencies in recorder.latencies.values() for value in latencies]
+    return {
+        "settings": settings,
+        "machine": {"cpus": os.cpu_count(), "python": platform.python_version(), "platform": platform.platform()},
+        "recorded_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "total": summarize(everything, sum(recorder.errors.values()), duration) if everything else {},
+        "endpoints": endpoints,
+    }
+
+async def send(client: httpx.AsyncClient, operation: Operation, context: Context, rng: random.Random):
+    """Issue one request of ``operation``; returns (elapsed, ok) or None when it had nothing to do"""
+    request = operation.build(context, rng)
+    if request is None:
+        return None
+    method, url, kwargs = request
+    started = time.perf_counter()
+    try:
+        response = await client.request(method, url, **kwargs)
+        ok = response.status_code in operation.expect
+    except httpx.HTTPError:
+        response, ok = None, False
+    elapsed = time.perf_counter() - started
+    if response is not None and operation.after is not None:
+        operation.after(context, response)
+    return elapsed, ok
+
+async def preflight(client: httpx.AsyncClient, context: Context, operations: List[Operation] = OPERATIONS) -> List[str]:
+    """Run every operation once; returns the ones that failed"""
+    rng = random.Random(0)
+    failures = []
+    for operation in operations:
+        result = await send(client, operation, context, rng)
+        if result is None or not result[1]:
+            failures.append(operation.name)
+    return failures
+
+async def run_load(
+    client: httpx.AsyncClient,
+    context: Context,
+    concurrency: int,
+    duration: float,
+    warmup: float = 0.0,
+    seed: int = 42,
+    operations: List[Operation] = OPERATIONS,
+) -> Recorder:
+    """Closed-loop load: each worker sends its next request as soon as the last one returns"""
+    recorder = Recorder()
+    weights = [operation.weight for operation in operations]
+    loop = asyncio.get_running_loop()
+    record_from = loop.time() + warmup
+    end = record_from + duration
+
+    async def worker(index: int):
+        rng = random.Random(seed + index)
+        while (now := loop.time()) < end:
+            operation = rng.choices(operations, weights)[0]
+            result = await send(client, operation, context, rng)
+            if result is not None and now >= record_from:
+                recorder.add(operation.name, *result)
+
+    await asyncio.gather(*(worker(index) for index in range(concurrency)))
+    return recorder
+
+def compare(
+    baseline: Dict[str, Any],
+    report: Dict[str, Any],
+    threshold: float,
+    min_delta_ms: float,
+    min_samples: int = 0,
+) -> List[str]:
+    """Regressions of ``report`` against ``baseline``, as readable lines.
+
+    Endpoints with fewer than ``min_samples`` requests in either run are
+    too noisy to gate on their p95; they still fail on errors.
+    """
+    if baseline.get("settings") != report["settings"]:
+        return [f"baseline settings {baseline.get('settings')} differ from this run's {report['settings']}; "
+                "re-record it with --update-baseline"]
+    problems = []
+    for name, current in report["endpoints"].items():
+        if current["errors"]:
+            problems.append(f"{name}: {current['errors']} failed request(s)")
+        previous = baseline["endpoints"].get(name)
+        if previous is None or min(current["count"], previous["count"]) < min_samples:
+            continue
+        limit = previous["p95_ms"] * (1 + threshold)
+        if current["p95_ms"] > limit and current["p95_ms"] - previous["p95_ms"] > min_delta_ms:
+            problems.append(f"{name}: p95 {current['p95_ms']:.1f} ms vs baseline {previous['p95_ms']:.1f} ms")
+    if baseline.get("total") and report["total"]:
+        floor = baseline["total"]["rps"] * (1 - threshold)
+        if report["total"]["rps"] < floor:
+            problems.append(f"throughput {report['total']['rps']:.1f} req/s vs baseline {baseline['total']['rps']:.1f} req/s")
+    return problems
+
+def print_report(report: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None):
+    previous = (baseline or {}).get("endpoints", {})
+    print(f"{'endpoint':<38} {'count':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'base p95':>9} {'errors':>6}")
+    rows = list(report["endpoints"].items()) + [("TOTAL", report["total"])]
+    for name, stats in rows:
+        base = previous.get(name, {}).get("p95_ms") if name != "TOTAL" else (baseline or {}).get("total", {}).get("p95_ms")
+        base_text = f"{base:>9.1f}" if base is not None else f"{'-':>9}"
+        print(f"{name:<38} {stats['count']:>7} {stats['rps']:>8.1f} {stats['p50_ms']:>8.1f} "
+              f"{stats['p95_ms']:>8.1f} {stats['p99_ms']:>8.1f} {base_text} {stats['errors']:>6}")
+    if report.get("streamed_events") is not None:
+        print(f"/stream subscribers received {report['streamed_events']} change events")
+
+def prepare_database(config: Dict[str, Any], seed_args: List[str], reseed: bool):
+    """Create, migrate and seed the load-test database.
+
+    The seed arguments are kept as the database's comment, so it is only
+    re-seeded when they change (or when asked to).
+    """
+    marker = "loadtest seed: " + " ".join(seed_args)
+    admin = psycopg2.connect(**{**config, "dbname": "postgres"})
+    admin.autocommit = True
+    with admin.cursor() as cur:
+        cur.execute("SELECT shobj_description(oid, 'pg_database') FROM pg_database WHERE datname = %s", (config["dbname"],))
+        row = cur.fetchone()
+        if row is None:
+            cur.execute(f'CREATE DATABASE "{config["dbname"]}"')
+    admin.close()
+    apply_migrations(config)
+
+    if reseed or row is None or row[0] != marker:
+        env = {**os.environ, **_db_env(config)}
+        subprocess.run([sys.executable, "seed_crm_data.py", "--truncate", *seed_args], cwd=BACKEND_DIR, env=env, check=True)
+        conn = psycopg2.connect(**config)
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            cur.execute(f'COMMENT ON DATABASE "{config["dbname"]}" IS %s', (marker,))
+        conn.close()
+
+def _db_env(config: Dict[str, Any]) -> Dict[str, str]:
+    return {"DB_HOST": config["host"], "DB_PORT": str(config["port"]), "DB_USER": config["user"],
+            "DB_PASSWORD": config["password"], "DB_NAME": config["dbname"]}
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def start_server(config: Dict[str, Any], workers: int) -> Tuple[subprocess.Popen, str]:
+    """Run the API under uvicorn against the load-test database and wait for /ready"""
+    port = _free_port()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning", "--no-access-log"],
+        cwd=BACKEND_DIR, env={**os.environ, **_db_env(config)},
+    )
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit("API server exited during startup")
+        try:
+            if httpx.get(f"{url}/ready", timeout=1).status_code == 200:
+                return process, url
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    process.terminate()
+    raise SystemExit("API server did not become ready within 30s")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--db-name", default=os.getenv("LOADTEST_DB_NAME", "crm_loadtest"), help="Database to load test")
+    parser.add_argument("--size", default="medium", help="seed_crm_data.py dataset preset")
+    parser.add_argument("--seed-arg", action="append", default=[], metavar="ARG",
+                        help="Extra seed_crm_data.py argument, e.g. --seed-arg=--emails=200000 (repeatable)")
+    parser.add_argument("--reseed", action="store_true", help="Re-seed even if the database already holds this dataset")
+    parser.add_argument("--url", help="Load an already running server instead of starting one")
+    parser.add_argument("--server-workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent closed-loop clients")
+    parser.add_argument("--subscribers", type=int, default=4, help="Clients following the /stream change feed meanwhile")
+    parser.add_argument("--duration", type=float, default=30, help="Measured seconds")
+    parser.add_argument("--warmup", type=float, default=5, help="Unmeasured seconds before measuring")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for the request mix")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON file")
+    parser.add_argument("--update-baseline", action="store_true", help="Save this run as the baseline instead of comparing")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed relative p95/throughput regression")
+    parser.add_argument("--min-delta-ms", type=float, default=2.0, help="Ignore p95 increases smaller than this")
+    parser.add_argument("--min-samples", type=int, default=100, help="Only gate endpoints with at least this many requests")
+    parser.add_argument("--output", help="Also write this run's report to a JSON file")
+    return parser.parse_args(argv)
+
+async def _drive(url: str, context: Context, args) -> Tuple[Recorder, List[str], int]:
+    connections = args.concurrency + args.subscribers
+    limits = httpx.Limits(max_connections=connections, max_keepalive_connections=connections)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30) as client:
+        failures = await preflight(client, context)
+        if failures:
+            return Recorder(), failures, 0
+        streamed = {"events": 0}
+        subscribers = Recorder()
+        streams = [asyncio.create_task(follow_stream(client, subscribers, streamed)) for _ in range(args.subscribers)]
+        recorder = await run_load(client, context, args.concurrency, args.duration, args.warmup, args.seed)
+        for stream in streams:
+            stream.cancel()
+        await asyncio.gather(*streams, return_exceptions=True)
+        recorder.latencies.update(subscribers.latencies)
+        recorder.errors.update(subscribers.errors)
+        return recorder, [], streamed["events"]
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    config = {**DB_CONFIG, "dbname": args.db_name}
+    prepare_database(config, ["--size", args.size, *args.seed_arg], args.reseed)
+    context = sample_context(config)
+
+    process, url = (None, args.url) if args.url else start_server(config, args.server_workers)
+    try:
+        recorder, failures, streamed = asyncio.run(_drive(url, context, args))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=10)
+    if failures:
+        print("Preflight failed for: " + ", ".join(failures))
+        return 1
+
+    settings = {"size": args.size, "seed_args": args.seed_arg, "concurrency": args.concurrency,
+                "duration": args.duration, "seed": args.seed, "server_workers": args.server_workers,
+                "subscribers": args.subscribers}
+    report = build_report(recorder, args.duration, settings)
+    report["streamed_events"] = streamed
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.update_baseline:
+        print_report(report)
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print_report(report)
+        print(f"No baseline at {args.baseline}; record one with --update-baseline")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    print_report(report, baseline)
+    problems = compare(baseline, report, args.threshold, args.min_delta_ms, args.min_samples)
+    if problems:
+        print("\nRegressions:")
+        for problem in problems:
+            print(f"  - {problem}")
+        return 1
+    print(f"\nNo regressions beyond {args.threshold:.0%} of the baseline")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,75 @@
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, Query
+
+from async_database import async_db_manager
+from cache import MISSING, entity_cache, entity_key, rows_tag, versioned_row
+from database import ROW_VERSION_COLUMN
+from entities import Entity, select_columns
+from responses import FastJSONResponse
+
+# Upper bound on ids resolved by one lookup request
+MAX_LOOKUP_IDS = int(os.getenv("API_MAX_LOOKUP_IDS", "1000"))
+
+def normalize_ids(ids: List[int]) -> List[int]:
+    """Drop duplicate ids (keeping request order) and enforce the batch cap"""
+    ids = list(dict.fromkeys(ids))
+    if len(ids) > MAX_LOOKUP_IDS:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_LOOKUP_IDS} ids per lookup")
+    return ids
+
+def lookup_ids(
+    ids: Optional[List[str]] = Query(None, description="Comma-separated ids to fetch instead of a page"),
+) -> Optional[List[int]]:
+    """Parse ``?ids=1,2&ids=3`` for the list endpoints"""
+    if ids is None:
+        return None
+    try:
+        parsed = [int(value) for param in ids for value in param.split(",") if value.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be comma-separated integers")
+    return normalize_ids(parsed)
+
+async def fetch_by_ids(
+    entity: Entity,
+    ids: List[int],
+    fields: Optional[str] = None,
+) -> Tuple[List[Dict[str, Any]], List[int]]:
+    """Resolve ids in request order, returning (rows, missing ids).
+
+    Rows already in the entity cache are used as-is; the rest are read with
+    a single ``id = ANY(...)`` query and, when they are full rows, cached
+    for later by-id reads.
+    """
+    columns = select_columns(entity, fields)
+    full = columns == entity.columns
+    found = {}
+    pending = []
+    for row_id in ids:
+        cached = entity_cache.get(entity_key(entity.table, row_id))
+        if cached is MISSING:
+            pending.append(row_id)
+        else:
+            found[row_id] = cached.row if full else {name: cached.row[name] for name in columns}
+
+    if pending:
+        generation = entity_cache.generation(rows_tag(entity.table))
+        rows, cur = await async_db_manager.execute_query(
+            f"SELECT {entity.select_sql(columns)}, {ROW_VERSION_COLUMN} FROM {entity.table} WHERE id = ANY(%s)", (pending,),
+            primary=full  # full rows are cached, so never from a lagging replica
+        )
+        records, versions = async_db_manager.rows_to_versioned_dicts(rows, cur)
+        # Rows read while one of the table's rows was invalidated may be stale
+        cache_rows = full and entity_cache.generation(rows_tag(entity.table)) == generation
+        for record, version in zip(records, versions):
+            found[record["id"]] = record
+            if cache_rows:
+                entity_cache.set(entity_key(entity.table, record["id"]), versioned_row(entity, record, version))
+
+    return [found[row_id] for row_id in ids if row_id in found], [row_id for row_id in ids if row_id not in found]
+
+async def lookup_response(entity: Entity, ids: List[int], fields: Optional[str] = None) -> FastJSONResponse:
+    """Serve a batch lookup as ``{"items": [...], "missing": [...]}``"""
+    items, missing = await fetch_by_ids(entity, ids, fields)
+    return FastJSONResponse({"items": items, "missing": missing})
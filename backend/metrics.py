@@ -0,0 +1,205 @@
+import bisect
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Record HTTP and database metrics and serve them at /metrics
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DB_LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0, 5.0)
+ROW_BUCKETS = (0, 1, 10, 100, 1000, 10000, 100000)
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Metric:
+    """A named metric family with a fixed set of label names.
+
+    Counters and gauges can take a ``collect`` callable instead of being
+    updated in place; it returns ``{label values: value}`` at scrape time.
+    """
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 collect: Optional[Callable[[], Dict[Tuple[str, ...], float]]] = None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.collect = collect
+        self._series: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+    def render(self) -> List[str]:
+        if self.collect is not None:
+            values = self.collect()
+        else:
+            with self._lock:
+                values = dict(self._series)
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}" for labels, value in values.items()]
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, *labels: str, amount: float = 1):
+        with self._lock:
+            self._series[labels] = self._series.get(labels, 0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._series.get(labels, 0)
+
+class Gauge(Metric):
+    type = "gauge"
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Iterable[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labels: str):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # Per-bucket counts (the last one is +Inf), then the sum
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return sum(series[:-1]) if series else 0
+
+    def total(self, *labels: str) -> float:
+        series = self._series.get(labels)
+        return series[-1] if series else 0.0
+
+    def render(self) -> List[str]:
+        with self._lock:
+            series = [(labels, list(values)) for labels, values in self._series.items()]
+        lines = []
+        for labels, values in series:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), values):
+                cumulative += count
+                le = f'le="{_format_value(float(bound))}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(values[-1])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+class Registry:
+    """The metrics served at /metrics, in registration order"""
+
+    def __init__(self):
+        self.metrics: List[Metric] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            lines += metric.header()
+            lines += metric.render()
+        return "\n".join(lines) + "\n"
+
+    def clear(self):
+        for metric in self.metrics:
+            metric.clear()
+
+registry = Registry()
+
+HTTP_REQUESTS = registry.register(Counter(
+    "http_requests_total", "HTTP requests by route template and status", ("method", "route", "status")
+))
+HTTP_LATENCY = registry.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency, including streaming the body", ("method", "route")
+))
+DB_LATENCY = registry.register(Histogram(
+    "db_operation_duration_seconds", "Database time per connect (pool checkout), execute or fetch call",
+    ("driver", "operation"), DB_LATENCY_BUCKETS
+))
+DB_ROWS = registry.register(Histogram(
+    "db_fetched_rows", "Rows returned per fetch call", ("driver",), ROW_BUCKETS
+))
+
+# Scopes of the requests being served; grouped by route only at scrape time
+_in_flight: Dict[int, dict] = {}
+
+def route_template(scope: dict) -> str:
+    """The matched route's path template, so ids don't explode label cardinality"""
+    route = scope.get("route")
+    return getattr(route, "path", None) or "<unmatched>"
+
+def _collect_in_flight() -> Dict[Tuple[str, ...], float]:
+    counts: Dict[Tuple[str, ...], float] = {}
+    for scope in list(_in_flight.values()):
+        key = (scope["method"], route_template(scope))
+        counts[key] = counts.get(key, 0) + 1
+    return counts
+
+HTTP_IN_FLIGHT = registry.register(Gauge(
+    "http_requests_in_progress", "HTTP requests being served by route template", ("method", "route"),
+    collect=_collect_in_flight
+))
+
+class MetricsMiddleware:
+    """ASGI middleware recording request count, latency and in-flight requests per route.
+
+    The route template is read from the scope after routing, so requests are
+    labelled ``/accounts/{account_id}`` rather than by their concrete path.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        key = id(scope)
+        _in_flight[key] = scope
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            del _in_flight[key]
+            route = route_template(scope)
+            HTTP_REQUESTS.inc(scope["method"], route, str(status))
+            HTTP_LATENCY.observe(elapsed, scope["method"], route)
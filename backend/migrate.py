@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Versioned schema migrations for the CRM database.
+
+Migrations live in ``migrations/`` as ``NNNN_name.up.sql`` /
+``NNNN_name.down.sql`` pairs and are recorded in ``schema_migrations``.
+Each file runs in its own transaction unless its first line is
+``-- migrate: no-transaction`` (needed for ``CREATE INDEX CONCURRENTLY``).
+A failed concurrent build leaves an invalid index behind, which ``IF NOT
+EXISTS`` would skip; such an index is dropped before it is built again, and
+a script whose indexes end up invalid is not recorded.
+
+    python migrate.py up              # apply everything pending
+    python migrate.py up --to 1       # apply up to version 1
+    python migrate.py down            # roll back the latest migration
+    python migrate.py down --to 0     # roll back everything
+    python migrate.py status
+"""
+
+import argparse
+import os
+import re
+import sys
+from typing import Any, Dict, List, NamedTuple, Optional
+
+import psycopg2
+
+from database import DB_CONFIG
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+NO_TRANSACTION_MARKER = "-- migrate: no-transaction"
+# Serializes concurrent migration runs (e.g. several app instances starting)
+ADVISORY_LOCK_ID = 727_001
+CONCURRENT_INDEX = re.compile(
+    r"CREATE\s+(?:UNIQUE\s+)?INDEX\s+CONCURRENTLY\s+(?:IF\s+NOT\s+EXISTS\s+)?(\w+)", re.IGNORECASE
+)
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    up_path: str
+    down_path: Optional[str]
+
+def discover_migrations(directory: str = MIGRATIONS_DIR) -> List[Migration]:
+    """List migrations on disk, ordered by version"""
+    migrations = {}
+    for filename in os.listdir(directory):
+        match = re.fullmatch(r"(\d+)_(\w+)\.up\.sql", filename)
+        if not match:
+            continue
+        version = int(match.group(1))
+        if version in migrations:
+            raise ValueError(f"Duplicate migration version {version}")
+        down_path = os.path.join(directory, filename.replace(".up.sql", ".down.sql"))
+        migrations[version] = Migration(
+            version,
+            match.group(2),
+            os.path.join(directory, filename),
+            down_path if os.path.exists(down_path) else None,
+        )
+    return [migrations[version] for version in sorted(migrations)]
+
+def split_statements(sql: str) -> List[str]:
+    """Split a simple SQL script into statements (no function bodies)"""
+    lines = [line for line in sql.splitlines() if not line.strip().startswith("--")]
+    return [statement.strip() for statement in "\n".join(lines).split(";") if statement.strip()]
+
+def _invalid_indexes(cur, names: List[str]) -> List[str]:
+    """Those of ``names`` that exist but are marked invalid (a failed concurrent build)"""
+    if not names:
+        return []
+    cur.execute(
+        "SELECT name FROM unnest(%s::text[]) AS name JOIN pg_index ON indexrelid = to_regclass(name) "
+        "WHERE NOT indisvalid",
+        (names,)
+    )
+    return [row[0] for row in cur.fetchall()]
+
+def _run_script(conn, path: str, record_sql: str, version: int, name: str):
+    with open(path) as f:
+        sql = f.read()
+
+    if sql.lstrip().startswith(NO_TRANSACTION_MARKER):
+        conn.autocommit = True
+        try:
+            with conn.cursor() as cur:
+                built = []
+                for statement in split_statements(sql):
+                    match = CONCURRENT_INDEX.match(statement)
+                    if match:
+                        built.append(match.group(1))
+                        if _invalid_indexes(cur, [built[-1]]):
+                            cur.execute(f"DROP INDEX CONCURRENTLY {built[-1]}")
+                    cur.execute(statement)
+                invalid = _invalid_indexes(cur, built)
+                if invalid:
+                    raise RuntimeError(f"Migration {version} left invalid indexes: {', '.join(invalid)}")
+                cur.execute(record_sql, (version, name))
+        finally:
+            conn.autocommit = False
+        return
+
+    with conn.cursor() as cur:
+        cur.execute(sql)
+        cur.execute(record_sql, (version, name))
+    conn.commit()
+
+def _connect(config: Optional[Dict[str, Any]]):
+    conn = psycopg2.connect(**(config or DB_CONFIG))
+    conn.autocommit = True
+    with conn.cursor() as cur:
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version INTEGER PRIMARY KEY,
+                name VARCHAR(255) NOT NULL,
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        cur.execute("SELECT pg_advisory_lock(%s)", (ADVISORY_LOCK_ID,))
+    conn.autocommit = False
+    return conn
+
+def _close(conn):
+    conn.rollback()
+    conn.autocommit = True
+    with conn.cursor() as cur:
+        cur.execute("SELECT pg_advisory_unlock(%s)", (ADVISORY_LOCK_ID,))
+    conn.close()
+
+def applied_versions(conn) -> List[int]:
+    with conn.cursor() as cur:
+        cur.execute("SELECT version FROM schema_migrations ORDER BY version")
+        versions = [row[0] for row in cur.fetchall()]
+    conn.commit()
+    return versions
+
+def apply_migrations(config: Optional[Dict[str, Any]] = None, target: Optional[int] = None) -> List[Migration]:
+    """Apply pending migrations up to ``target`` (default: latest)"""
+    conn = _connect(config)
+    try:
+        applied = set(applied_versions(conn))
+        done = []
+        for migration in discover_migrations():
+            if migration.version in applied or (target is not None and migration.version > target):
+                continue
+            _run_script(
+                conn, migration.up_path,
+                "INSERT INTO schema_migrations (version, name) VALUES (%s, %s)",
+                migration.version, migration.name,
+            )
+            done.append(migration)
+        return done
+    finally:
+        _close(conn)
+
+def rollback_migrations(config: Optional[Dict[str, Any]] = None, target: Optional[int] = None) -> List[Migration]:
+    """Roll back applied migrations above ``target`` (default: only the latest)"""
+    conn = _connect(config)
+    try:
+        applied = applied_versions(conn)
+        if target is None:
+            target = applied[-2] if len(applied) > 1 else 0
+        by_version = {migration.version: migration for migration in discover_migrations()}
+        done = []
+        for version in reversed(applied):
+            if version <= target:
+                break
+            migration = by_version.get(version)
+            if migration is None or migration.down_path is None:
+                raise RuntimeError(f"Migration {version} has no down script")
+            _run_script(
+                conn, migration.down_path,
+                "DELETE FROM schema_migrations WHERE version = %s AND name = %s",
+                migration.version, migration.name,
+            )
+            done.append(migration)
+        return done
+    finally:
+        _close(conn)
+
+def migration_status(config: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    """Every known migration with whether it is applied"""
+    conn = _connect(config)
+    try:
+        applied = set(applied_versions(conn))
+        return [
+            {"version": migration.version, "name": migration.name, "applied": migration.version in applied}
+            for migration in discover_migrations()
+        ]
+    finally:
+        _close(conn)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Apply or roll back CRM schema migrations")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    up = subparsers.add_parser("up", help="Apply pending migrations")
+    up.add_argument("--to", type=int, help="Stop after this version")
+    down = subparsers.add_parser("down", help="Roll back migrations")
+    down.add_argument("--to", type=int, help="Roll back until this version is the latest applied (0 for all)")
+    subparsers.add_parser("status", help="Show applied and pending migrations")
+    args = parser.parse_args(argv)
+
+    if args.command == "up":
+        done = apply_migrations(target=args.to)
+        for migration in done:
+            print(f"Applied {migration.version:04d}_{migration.name}")
+        print("Database is up to date" if not done else f"{len(done)} migration(s) applied")
+    elif args.command == "down":
+        done = rollback_migrations(target=args.to)
+        for migration in done:
+            print(f"Rolled back {migration.version:04d}_{migration.name}")
+        print(f"{len(done)} migration(s) rolled back")
+    else:
+        for row in migration_status():
+            marker = "x" if row["applied"] else " "
+            print(f"[{marker}] {row['version']:04d}_{row['name']}")
+
+if __name__ == "__main__":
+    sys.exit(main())
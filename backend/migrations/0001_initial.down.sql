@@ -0,0 +1,5 @@
+DROP TABLE IF EXISTS call_transcripts;
+DROP TABLE IF EXISTS calls;
+DROP TABLE IF EXISTS emails;
+DROP TABLE IF EXISTS contacts;
+DROP TABLE IF EXISTS accounts;
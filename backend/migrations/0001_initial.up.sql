@@ -1,23 +1,29 @@
--- CRM Database Schema
+-- CRM base schema.
+-- Written to also adopt databases created from the old crm_schema.sql,
+-- which lacked several of the columns the API reads and writes.
 
-CREATE TABLE accounts (
+CREATE TABLE IF NOT EXISTS accounts (
     id SERIAL PRIMARY KEY,
     name VARCHAR(255) NOT NULL,
     industry VARCHAR(100),
+    plan VARCHAR(50),
+    status VARCHAR(50),
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
-CREATE TABLE contacts (
+CREATE TABLE IF NOT EXISTS contacts (
     id SERIAL PRIMARY KEY,
     account_id INTEGER REFERENCES accounts(id) ON DELETE CASCADE,
     first_name VARCHAR(100) NOT NULL,
     last_name VARCHAR(100) NOT NULL,
     email VARCHAR(255) UNIQUE NOT NULL,
     phone VARCHAR(50),
+    title VARCHAR(100),
+    role VARCHAR(100),
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
-CREATE TABLE emails (
+CREATE TABLE IF NOT EXISTS emails (
     id SERIAL PRIMARY KEY,
     contact_id INTEGER REFERENCES contacts(id) ON DELETE CASCADE,
     subject VARCHAR(255) NOT NULL,
@@ -25,22 +31,27 @@ CREATE TABLE emails (
     sent_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
-ALTER TABLE accounts ADD COLUMN IF NOT EXISTS plan VARCHAR(50);
-ALTER TABLE accounts ADD COLUMN IF NOT EXISTS status VARCHAR(50);
-
-ALTER TABLE contacts ADD COLUMN IF NOT EXISTS title VARCHAR(100);
-ALTER TABLE contacts ADD COLUMN IF NOT EXISTS role VARCHAR(100);
-
 CREATE TABLE IF NOT EXISTS calls (
     id SERIAL PRIMARY KEY,
     contact_id INTEGER REFERENCES contacts(id) ON DELETE CASCADE,
-    account_id INTEGER REFERENCES accounts(id) ON DELETE CASCADE,
-    call_type VARCHAR(50),
-    call_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    call_type VARCHAR(50) NOT NULL,
+    duration INTEGER,
+    outcome VARCHAR(255),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
 CREATE TABLE IF NOT EXISTS call_transcripts (
     id SERIAL PRIMARY KEY,
     call_id INTEGER REFERENCES calls(id) ON DELETE CASCADE,
-    transcript TEXT
+    transcript TEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
+
+ALTER TABLE accounts ADD COLUMN IF NOT EXISTS plan VARCHAR(50);
+ALTER TABLE accounts ADD COLUMN IF NOT EXISTS status VARCHAR(50);
+ALTER TABLE contacts ADD COLUMN IF NOT EXISTS title VARCHAR(100);
+ALTER TABLE contacts ADD COLUMN IF NOT EXISTS role VARCHAR(100);
+ALTER TABLE calls ADD COLUMN IF NOT EXISTS duration INTEGER;
+ALTER TABLE calls ADD COLUMN IF NOT EXISTS outcome VARCHAR(255);
+ALTER TABLE calls ADD COLUMN IF NOT EXISTS created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP;
+ALTER TABLE call_transcripts ADD COLUMN IF NOT EXISTS created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP;
@@ -0,0 +1,11 @@
+-- migrate: no-transaction
+
+DROP INDEX CONCURRENTLY IF EXISTS call_transcripts_call_id_idx;
+DROP INDEX CONCURRENTLY IF EXISTS call_transcripts_created_at_id_idx;
+DROP INDEX CONCURRENTLY IF EXISTS calls_contact_id_created_at_id_idx;
+DROP INDEX CONCURRENTLY IF EXISTS calls_created_at_id_idx;
+DROP INDEX CONCURRENTLY IF EXISTS emails_contact_id_sent_at_id_idx;
+DROP INDEX CONCURRENTLY IF EXISTS emails_sent_at_id_idx;
+DROP INDEX CONCURRENTLY IF EXISTS contacts_account_id_created_at_id_idx;
+DROP INDEX CONCURRENTLY IF EXISTS contacts_created_at_id_idx;
+DROP INDEX CONCURRENTLY IF EXISTS accounts_created_at_id_idx;
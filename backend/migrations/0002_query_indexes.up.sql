@@ -0,0 +1,32 @@
+-- migrate: no-transaction
+-- Indexes matching the WHERE / ORDER BY of every list and relationship
+-- query. Keyset pages scan (sort_column DESC, id DESC); relationship lists
+-- add the foreign key as the leading column. Built CONCURRENTLY so they can
+-- be applied to a live database without blocking writes.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS accounts_created_at_id_idx
+    ON accounts (created_at DESC, id DESC);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS contacts_created_at_id_idx
+    ON contacts (created_at DESC, id DESC);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS contacts_account_id_created_at_id_idx
+    ON contacts (account_id, created_at DESC, id DESC);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS emails_sent_at_id_idx
+    ON emails (sent_at DESC, id DESC);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS emails_contact_id_sent_at_id_idx
+    ON emails (contact_id, sent_at DESC, id DESC);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS calls_created_at_id_idx
+    ON calls (created_at DESC, id DESC);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS calls_contact_id_created_at_id_idx
+    ON calls (contact_id, created_at DESC, id DESC);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS call_transcripts_created_at_id_idx
+    ON call_transcripts (created_at DESC, id DESC);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS call_transcripts_call_id_idx
+    ON call_transcripts (call_id);
@@ -0,0 +1,5 @@
+-- migrate: no-transaction
+DROP INDEX CONCURRENTLY IF EXISTS call_transcripts_search_vector_idx;
+DROP INDEX CONCURRENTLY IF EXISTS emails_search_vector_idx;
+ALTER TABLE call_transcripts DROP COLUMN IF EXISTS search_vector;
+ALTER TABLE emails DROP COLUMN IF EXISTS search_vector;
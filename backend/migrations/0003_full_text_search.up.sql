@@ -0,0 +1,21 @@
+-- migrate: no-transaction
+-- Full-text search over email subjects/bodies and call transcripts.
+-- Stored generated columns keep the vectors current on every INSERT and
+-- UPDATE without triggers. Adding them rewrites the table, so run this in a
+-- quiet window on large databases; the GIN indexes are then built
+-- CONCURRENTLY.
+
+ALTER TABLE emails ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(subject, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(body, '')), 'B')
+    ) STORED;
+
+ALTER TABLE call_transcripts ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (to_tsvector('english', coalesce(transcript, ''))) STORED;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS emails_search_vector_idx
+    ON emails USING gin (search_vector);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS call_transcripts_search_vector_idx
+    ON call_transcripts USING gin (search_vector);
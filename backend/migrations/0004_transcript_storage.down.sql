@@ -0,0 +1,8 @@
+DROP TRIGGER IF EXISTS call_transcripts_inline_size ON call_transcripts;
+DROP FUNCTION IF EXISTS call_transcripts_inline_size();
+DROP TABLE IF EXISTS call_transcript_chunks;
+
+ALTER TABLE call_transcripts DROP COLUMN IF EXISTS compression;
+ALTER TABLE call_transcripts DROP COLUMN IF EXISTS checksum;
+ALTER TABLE call_transcripts DROP COLUMN IF EXISTS stored_length;
+ALTER TABLE call_transcripts DROP COLUMN IF EXISTS byte_length;
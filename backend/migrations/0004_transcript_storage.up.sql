@@ -0,0 +1,42 @@
+-- Size/checksum metadata for call transcripts and chunked storage for
+-- transcripts uploaded as a stream.
+--
+-- Inline transcripts (compression IS NULL) keep their full text in
+-- call_transcripts.transcript and a trigger maintains byte_length and
+-- checksum. Streamed transcripts are stored as a sequence of compressed
+-- chunks in call_transcript_chunks; their transcript column only holds the
+-- leading text used for search and previews.
+
+ALTER TABLE call_transcripts ADD COLUMN IF NOT EXISTS byte_length BIGINT;
+ALTER TABLE call_transcripts ADD COLUMN IF NOT EXISTS stored_length BIGINT;
+ALTER TABLE call_transcripts ADD COLUMN IF NOT EXISTS checksum VARCHAR(64);
+ALTER TABLE call_transcripts ADD COLUMN IF NOT EXISTS compression VARCHAR(16);
+
+CREATE TABLE IF NOT EXISTS call_transcript_chunks (
+    transcript_id INTEGER NOT NULL REFERENCES call_transcripts(id) ON DELETE CASCADE,
+    seq INTEGER NOT NULL,
+    data BYTEA NOT NULL,
+    PRIMARY KEY (transcript_id, seq)
+);
+
+-- Chunks are compressed by the application; don't run them through pglz again
+ALTER TABLE call_transcript_chunks ALTER COLUMN data SET STORAGE EXTERNAL;
+
+CREATE OR REPLACE FUNCTION call_transcripts_inline_size() RETURNS trigger AS $$
+BEGIN
+    IF NEW.compression IS NULL THEN
+        NEW.byte_length := octet_length(NEW.transcript);
+        NEW.stored_length := NULL;
+        NEW.checksum := encode(sha256(convert_to(NEW.transcript, 'UTF8')), 'hex');
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS call_transcripts_inline_size ON call_transcripts;
+CREATE TRIGGER call_transcripts_inline_size
+    BEFORE INSERT OR UPDATE OF transcript, compression ON call_transcripts
+    FOR EACH ROW EXECUTE FUNCTION call_transcripts_inline_size();
+
+-- Backfill existing rows through the trigger
+UPDATE call_transcripts SET compression = NULL WHERE byte_length IS NULL;
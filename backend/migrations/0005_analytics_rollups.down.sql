@@ -0,0 +1,12 @@
+DROP TRIGGER IF EXISTS calls_rollup_insert ON calls;
+DROP TRIGGER IF EXISTS calls_rollup_delete ON calls;
+DROP TRIGGER IF EXISTS calls_rollup_update_old ON calls;
+DROP TRIGGER IF EXISTS calls_rollup_update_new ON calls;
+DROP TRIGGER IF EXISTS emails_rollup_insert ON emails;
+DROP TRIGGER IF EXISTS emails_rollup_delete ON emails;
+DROP TRIGGER IF EXISTS emails_rollup_update_old ON emails;
+DROP TRIGGER IF EXISTS emails_rollup_update_new ON emails;
+DROP FUNCTION IF EXISTS calls_rollup();
+DROP FUNCTION IF EXISTS emails_rollup();
+DROP TABLE IF EXISTS call_stats;
+DROP TABLE IF EXISTS email_weekly_stats;
@@ -0,0 +1,110 @@
+-- Per-contact rollups of calls and emails behind the /analytics endpoints.
+--
+-- Statement-level triggers with transition tables keep them current for
+-- every write path (routers, bulk inserts, seeding, cascading deletes):
+-- each statement adds its inserted rows (+1) and subtracts its deleted rows
+-- (-1); an UPDATE does both. Rollups are keyed by contact rather than
+-- account, so moving a contact to another account needs no rewrite and
+-- deleting one cascades to its rollup rows. Account figures sum the rollups
+-- of the account's contacts, whose size doesn't grow with history.
+
+CREATE TABLE IF NOT EXISTS call_stats (
+    contact_id INTEGER NOT NULL REFERENCES contacts(id) ON DELETE CASCADE,
+    call_type VARCHAR(50) NOT NULL,
+    outcome VARCHAR(255),
+    calls BIGINT NOT NULL,
+    timed_calls BIGINT NOT NULL,  -- calls with a duration, for the average
+    total_duration BIGINT NOT NULL
+);
+
+-- One row per (contact, type, outcome) with NULL outcomes grouped together.
+-- Keyed on an expression rather than UNIQUE NULLS NOT DISTINCT, which needs
+-- PostgreSQL 15; the IS NULL column keeps a NULL outcome apart from ''.
+CREATE UNIQUE INDEX IF NOT EXISTS call_stats_key
+    ON call_stats (contact_id, call_type, coalesce(outcome, ''), (outcome IS NULL));
+
+CREATE TABLE IF NOT EXISTS email_weekly_stats (
+    contact_id INTEGER NOT NULL REFERENCES contacts(id) ON DELETE CASCADE,
+    week DATE NOT NULL,  -- Monday of the ISO week the emails were sent in
+    emails BIGINT NOT NULL,
+    PRIMARY KEY (contact_id, week)
+);
+
+-- TG_ARGV[0] is the sign: 1 for triggers over inserted (new) rows, -1 for
+-- deleted (old) ones. Keys are upserted in order so concurrent statements
+-- lock rollup rows in the same order. Rows whose contact is gone are
+-- skipped: when deleting a contact cascades to its calls and emails, its
+-- rollup rows have already been cascaded away.
+CREATE OR REPLACE FUNCTION calls_rollup() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO call_stats AS s (contact_id, call_type, outcome, calls, timed_calls, total_duration)
+    SELECT contact_id, call_type, outcome,
+           count(*) * TG_ARGV[0]::int,
+           count(duration) * TG_ARGV[0]::int,
+           coalesce(sum(duration), 0) * TG_ARGV[0]::int
+    FROM changed_rows
+    WHERE contact_id IN (SELECT id FROM contacts)
+    GROUP BY contact_id, call_type, outcome
+    ORDER BY contact_id, call_type, outcome
+    ON CONFLICT (contact_id, call_type, coalesce(outcome, ''), (outcome IS NULL)) DO UPDATE SET
+        calls = s.calls + EXCLUDED.calls,
+        timed_calls = s.timed_calls + EXCLUDED.timed_calls,
+        total_duration = s.total_duration + EXCLUDED.total_duration;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION emails_rollup() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO email_weekly_stats AS s (contact_id, week, emails)
+    SELECT contact_id, date_trunc('week', sent_at)::date, count(*) * TG_ARGV[0]::int
+    FROM changed_rows
+    WHERE contact_id IN (SELECT id FROM contacts) AND sent_at IS NOT NULL
+    GROUP BY 1, 2
+    ORDER BY 1, 2
+    ON CONFLICT (contact_id, week) DO UPDATE SET emails = s.emails + EXCLUDED.emails;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS calls_rollup_insert ON calls;
+DROP TRIGGER IF EXISTS calls_rollup_delete ON calls;
+DROP TRIGGER IF EXISTS calls_rollup_update_old ON calls;
+DROP TRIGGER IF EXISTS calls_rollup_update_new ON calls;
+CREATE TRIGGER calls_rollup_insert AFTER INSERT ON calls
+    REFERENCING NEW TABLE AS changed_rows FOR EACH STATEMENT EXECUTE FUNCTION calls_rollup('1');
+CREATE TRIGGER calls_rollup_delete AFTER DELETE ON calls
+    REFERENCING OLD TABLE AS changed_rows FOR EACH STATEMENT EXECUTE FUNCTION calls_rollup('-1');
+CREATE TRIGGER calls_rollup_update_old AFTER UPDATE ON calls
+    REFERENCING OLD TABLE AS changed_rows FOR EACH STATEMENT EXECUTE FUNCTION calls_rollup('-1');
+CREATE TRIGGER calls_rollup_update_new AFTER UPDATE ON calls
+    REFERENCING NEW TABLE AS changed_rows FOR EACH STATEMENT EXECUTE FUNCTION calls_rollup('1');
+
+DROP TRIGGER IF EXISTS emails_rollup_insert ON emails;
+DROP TRIGGER IF EXISTS emails_rollup_delete ON emails;
+DROP TRIGGER IF EXISTS emails_rollup_update_old ON emails;
+DROP TRIGGER IF EXISTS emails_rollup_update_new ON emails;
+CREATE TRIGGER emails_rollup_insert AFTER INSERT ON emails
+    REFERENCING NEW TABLE AS changed_rows FOR EACH STATEMENT EXECUTE FUNCTION emails_rollup('1');
+CREATE TRIGGER emails_rollup_delete AFTER DELETE ON emails
+    REFERENCING OLD TABLE AS changed_rows FOR EACH STATEMENT EXECUTE FUNCTION emails_rollup('-1');
+CREATE TRIGGER emails_rollup_update_old AFTER UPDATE ON emails
+    REFERENCING OLD TABLE AS changed_rows FOR EACH STATEMENT EXECUTE FUNCTION emails_rollup('-1');
+CREATE TRIGGER emails_rollup_update_new AFTER UPDATE ON emails
+    REFERENCING NEW TABLE AS changed_rows FOR EACH STATEMENT EXECUTE FUNCTION emails_rollup('1');
+
+-- Backfill. The triggers' locks keep writers out until this commits, so no
+-- row is counted twice or missed.
+TRUNCATE call_stats, email_weekly_stats;
+
+INSERT INTO call_stats (contact_id, call_type, outcome, calls, timed_calls, total_duration)
+SELECT contact_id, call_type, outcome, count(*), count(duration), coalesce(sum(duration), 0)
+FROM calls
+WHERE contact_id IS NOT NULL
+GROUP BY contact_id, call_type, outcome;
+
+INSERT INTO email_weekly_stats (contact_id, week, emails)
+SELECT contact_id, date_trunc('week', sent_at)::date, count(*)
+FROM emails
+WHERE contact_id IS NOT NULL AND sent_at IS NOT NULL
+GROUP BY 1, 2;
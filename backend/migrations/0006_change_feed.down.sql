@@ -0,0 +1,14 @@
+DO $$
+DECLARE
+    tbl TEXT;
+BEGIN
+    FOREACH tbl IN ARRAY ARRAY['accounts', 'contacts', 'emails', 'calls', 'call_transcripts']
+    LOOP
+        EXECUTE format('DROP TRIGGER IF EXISTS %1$s_change_insert ON %1$s', tbl);
+        EXECUTE format('DROP TRIGGER IF EXISTS %1$s_change_update ON %1$s', tbl);
+        EXECUTE format('DROP TRIGGER IF EXISTS %1$s_change_delete ON %1$s', tbl);
+        EXECUTE format('DROP FUNCTION IF EXISTS %s_change_notify()', tbl);
+    END LOOP;
+END;
+$$;
+DROP SEQUENCE IF EXISTS change_event_ids;
@@ -0,0 +1,72 @@
+-- Change notifications behind the /stream Server-Sent Events feed.
+--
+-- Statement-level triggers on the five CRM tables NOTIFY the crm_changes
+-- channel with JSON arrays of events, at most 50 per notification to stay
+-- well under the 8000-byte payload limit. Notifications are delivered when
+-- the transaction commits, in commit order, so listeners never see
+-- rolled-back changes. Event ids come from a sequence; they are unique but,
+-- across concurrent transactions, not necessarily increasing.
+--
+-- Each table gets its own trigger function, generated below from one
+-- template, so its query is planned once per session rather than on every
+-- statement as dynamic SQL would be. The payloads are built by one
+-- set-based query: rows are numbered in id order, given event ids in that
+-- order and aggregated 50 to a batch. A row's account is looked up through
+-- its parents; rows whose parent was deleted by the same cascade have none.
+--
+-- Sessions that SET crm.change_feed = off skip the notifications; bulk
+-- loads (seed_crm_data.py) do, and send one {"reset": ...} notification
+-- instead, which makes every listener reset its subscribers.
+
+CREATE SEQUENCE IF NOT EXISTS change_event_ids;
+
+DO $$
+DECLARE
+    target RECORD;
+BEGIN
+    FOR target IN SELECT * FROM (VALUES
+        ('accounts', 'accounts', 'r.id'),
+        ('contacts', 'contacts', 'r.account_id'),
+        ('emails', 'emails', '(SELECT account_id FROM contacts WHERE id = r.contact_id)'),
+        ('calls', 'calls', '(SELECT account_id FROM contacts WHERE id = r.contact_id)'),
+        ('call_transcripts', 'call-transcripts',
+         '(SELECT c.account_id FROM calls l JOIN contacts c ON c.id = l.contact_id WHERE l.id = r.call_id)')
+    ) AS t(tbl, entity, account)
+    LOOP
+        EXECUTE format($function$
+            CREATE OR REPLACE FUNCTION %1$s_change_notify() RETURNS trigger AS $body$
+            BEGIN
+                IF current_setting('crm.change_feed', true) = 'off' THEN
+                    RETURN NULL;
+                END IF;
+                PERFORM pg_notify('crm_changes', payloads.events::text)
+                FROM (
+                    SELECT json_agg(json_build_object(
+                        'id', e.event_id, 'entity', %2$L, 'op', lower(TG_OP),
+                        'entity_id', e.id, 'account_id', e.account_id
+                    ) ORDER BY e.event_id) AS events
+                    FROM (
+                        SELECT r.id, %3$s AS account_id, nextval('change_event_ids') AS event_id,
+                               (row_number() OVER (ORDER BY r.id) - 1) / 50 AS batch
+                        FROM changed_rows r
+                    ) e
+                    GROUP BY e.batch
+                    ORDER BY e.batch
+                ) payloads;
+                RETURN NULL;
+            END;
+            $body$ LANGUAGE plpgsql
+        $function$, target.tbl, target.entity, target.account);
+
+        EXECUTE format('DROP TRIGGER IF EXISTS %1$s_change_insert ON %1$s', target.tbl);
+        EXECUTE format('DROP TRIGGER IF EXISTS %1$s_change_update ON %1$s', target.tbl);
+        EXECUTE format('DROP TRIGGER IF EXISTS %1$s_change_delete ON %1$s', target.tbl);
+        EXECUTE format('CREATE TRIGGER %1$s_change_insert AFTER INSERT ON %1$s REFERENCING NEW TABLE AS changed_rows '
+                       'FOR EACH STATEMENT EXECUTE FUNCTION %1$s_change_notify()', target.tbl);
+        EXECUTE format('CREATE TRIGGER %1$s_change_update AFTER UPDATE ON %1$s REFERENCING NEW TABLE AS changed_rows '
+                       'FOR EACH STATEMENT EXECUTE FUNCTION %1$s_change_notify()', target.tbl);
+        EXECUTE format('CREATE TRIGGER %1$s_change_delete AFTER DELETE ON %1$s REFERENCING OLD TABLE AS changed_rows '
+                       'FOR EACH STATEMENT EXECUTE FUNCTION %1$s_change_notify()', target.tbl);
+    END LOOP;
+END;
+$$;
@@ -1,6 +1,8 @@
-from pydantic import BaseModel
-from typing import Optional
-from datetime import datetime
+from pydantic import BaseModel, Field
+from typing import Any, Dict, Generic, List, Literal, Optional, TypeVar, Union
+from datetime import date, datetime
+
+T = TypeVar("T")
 
 # Account Models
 class AccountBase(BaseModel):
@@ -97,11 +99,148 @@ class CallTranscriptUpdate(CallTranscriptBase):
 
 class CallTranscript(CallTranscriptBase):
     id: int
+    byte_length: Optional[int] = None
+    stored_length: Optional[int] = None
+    checksum: Optional[str] = None
+    compression: Optional[str] = None
+    # True when transcript holds only the leading part of a streamed
+    # transcript; the full text is at content_url
+    truncated: bool = False
+    content_url: Optional[str] = None
     created_at: datetime
 
     class Config:
         from_attributes = True
 
+class CallTranscriptSummary(BaseModel):
+    """A call transcript in list pages: a preview and sizes instead of the full text"""
+    id: int
+    call_id: int
+    preview: str
+    byte_length: Optional[int] = None
+    compression: Optional[str] = None
+    created_at: datetime
+
 # Response Models
 class MessageResponse(BaseModel):
-    message: str 
\ No newline at end of file
+    message: str
+
+class BulkRowError(BaseModel):
+    index: int
+    detail: str
+
+class BulkCreateResult(BaseModel):
+    created: int
+    ids: List[Optional[int]]
+    errors: List[BulkRowError]
+
+class BatchOperation(BaseModel):
+    op: Literal["create", "update", "delete"]
+    entity: str
+    # Row to update or delete: an id or an earlier create's "$ref"
+    id: Optional[Union[int, str]] = None
+    # Fields for create and update; values may be "$ref" strings
+    data: Optional[Dict[str, Any]] = None
+    # Name later operations use, as "$name", for the id this create produces
+    ref: Optional[str] = None
+
+class BatchRequest(BaseModel):
+    operations: List[BatchOperation] = Field(..., min_length=1)
+
+class BatchResult(BaseModel):
+    index: int
+    op: str
+    entity: str
+    id: int
+    row: Optional[Dict[str, Any]] = None
+
+class BatchResponse(BaseModel):
+    results: List[BatchResult]
+    refs: Dict[str, int]
+
+class Page(BaseModel, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = None
+
+class LookupRequest(BaseModel):
+    ids: List[int]
+
+class LookupResult(BaseModel, Generic[T]):
+    items: List[T]
+    missing: List[int]
+
+class TimelineEvent(BaseModel):
+    kind: str  # "email", "call" or "transcript"
+    id: int
+    contact_id: int
+    contact_name: str
+    call_id: Optional[int] = None
+    occurred_at: datetime
+    summary: Optional[str] = None
+    snippet: Optional[str] = None
+
+class SearchHit(BaseModel):
+    kind: str  # "email" or "transcript"
+    id: int
+    rank: float
+    occurred_at: Optional[datetime] = None
+    title: Optional[str] = None
+    highlight: Optional[str] = None
+    call_id: Optional[int] = None
+    contact_id: int
+    contact_name: str
+    account_id: Optional[int] = None
+    account_name: Optional[str] = None
+
+# Analytics
+class CallStatsGroup(BaseModel):
+    call_type: Optional[str] = None  # set in by_type groups
+    outcome: Optional[str] = None  # set in by_outcome groups (None there means "no outcome")
+    calls: int
+    total_duration: int
+    average_duration: Optional[float] = None
+
+class AccountCallStats(BaseModel):
+    account_id: int
+    calls: int
+    total_duration: int
+    average_duration: Optional[float] = None
+    by_type: List[CallStatsGroup]
+    by_outcome: List[CallStatsGroup]
+
+class WeeklyEmailCount(BaseModel):
+    week: date  # Monday of the ISO week
+    emails: int
+
+class AccountEmailStats(BaseModel):
+    account_id: int
+    emails: int
+    weeks: List[WeeklyEmailCount]
+
+# Slow-query log
+class SlowQuerySettings(BaseModel):
+    enabled: bool
+    threshold_ms: float
+    sample_rate: float
+    max_entries: int
+
+class SlowQuerySettingsUpdate(BaseModel):
+    enabled: Optional[bool] = None
+    threshold_ms: Optional[float] = Field(None, ge=0)
+    sample_rate: Optional[float] = Field(None, ge=0, le=1)
+
+class SlowQuery(BaseModel):
+    id: int
+    recorded_at: datetime
+    duration_ms: float
+    route: Optional[str] = None
+    driver: str
+    statement: str
+    params: Any = None  # types and lengths of the parameters, never their values
+    plan_status: str  # "not_sampled", "pending", "captured", "failed", "skipped" or "unsupported"
+    plan: Optional[str] = None
+    plan_analyzed: bool = False  # True when the plan comes from EXPLAIN ANALYZE (read-only statements only)
+
+class SlowQueryLogView(BaseModel):
+    settings: SlowQuerySettings
+    queries: List[SlowQuery]
@@ -0,0 +1,161 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+import os
+
+from fastapi import HTTPException, Query, Request
+from fastapi.responses import Response
+
+from async_database import async_db_manager
+from cache import MISSING, entity_cache
+from database import ROW_VERSION_COLUMN
+from entities import Entity, select_columns
+from responses import conditional_response, etag_matches, make_etag, not_modified
+
+# Page size limits for list endpoints
+DEFAULT_PAGE_SIZE = int(os.getenv("API_DEFAULT_PAGE_SIZE", "50"))
+MAX_PAGE_SIZE = int(os.getenv("API_MAX_PAGE_SIZE", "500"))
+
+class PageParams:
+    """Query parameters shared by every paginated list endpoint"""
+
+    def __init__(
+        self,
+        request: Request,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Maximum number of items to return"),
+        cursor: Optional[str] = Query(None, description="Opaque next_cursor from the previous page"),
+    ):
+        self.request = request
+        self.limit = limit
+        self.cursor = cursor
+
+class PageResult(NamedTuple):
+    items: List[Dict[str, Any]]
+    next_cursor: Optional[str]
+    etag: str
+
+def encode_cursor(sort_value: datetime, row_id: int, *tiebreakers: Any) -> str:
+    """Encode the keyset position of the last row on a page"""
+    payload = json.dumps([sort_value.isoformat(), row_id, *tiebreakers], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, tiebreakers: int = 0) -> Tuple[Any, ...]:
+    """Decode a cursor produced by encode_cursor into (sort_value, row_id, *tiebreakers)"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id, *rest = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if len(rest) != tiebreakers:
+            raise ValueError("Wrong cursor shape")
+        return (datetime.fromisoformat(sort_value), int(row_id), *rest)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def keyset_query(
+    table: str,
+    sort_column: str,
+    limit: int,
+    cursor: Optional[str] = None,
+    where: Optional[str] = None,
+    params: tuple = (),
+    columns: str = "*",
+) -> Tuple[str, tuple]:
+    """Build a newest-first keyset query over ``(sort_column, id)``.
+
+    One extra row is requested so the caller can tell whether another page
+    follows without a separate COUNT.
+    """
+    conditions = [where] if where else []
+    params = tuple(params)
+    if cursor is not None:
+        sort_value, row_id = decode_cursor(cursor)
+        conditions.append(f"({sort_column}, id) < (%s, %s)")
+        params += (sort_value, row_id)
+
+    query = f"SELECT {columns} FROM {table}"
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += f" ORDER BY {sort_column} DESC, id DESC LIMIT %s"
+    return query, params + (limit + 1,)
+
+def page_columns(entity: Entity, fields: Optional[str]) -> Tuple[str, ...]:
+    """Projection for a list page; the keyset columns are always included"""
+    return select_columns(entity, fields, required=("id", entity.sort_column), listing=True)
+
+async def fetch_page(
+    entity: Entity,
+    page: PageParams,
+    where: Optional[str] = None,
+    params: tuple = (),
+    fields: Optional[str] = None,
+    primary: bool = False,
+) -> PageResult:
+    """Fetch one page of rows as dicts with the next page's cursor and its ETag (from the primary with ``primary``)"""
+    sort_column = entity.sort_column
+    columns = page_columns(entity, fields)
+    query, query_params = keyset_query(
+        entity.table, sort_column, page.limit, page.cursor, where, params,
+        columns=f"{entity.select_sql(columns)}, {ROW_VERSION_COLUMN}"
+    )
+    rows, cur = await async_db_manager.execute_query(query, query_params, primary=primary)
+
+    records, versions = async_db_manager.rows_to_versioned_dicts(rows[:page.limit], cur)
+    next_cursor = None
+    if len(rows) > page.limit:
+        last = records[-1]
+        next_cursor = encode_cursor(last[sort_column], last["id"])
+    etag = make_etag(
+        entity.table, columns, [(record["id"], version) for record, version in zip(records, versions)], next_cursor
+    )
+    return PageResult(records, next_cursor, etag)
+
+async def page_etag(
+    entity: Entity,
+    page: PageParams,
+    where: Optional[str] = None,
+    params: tuple = (),
+    fields: Optional[str] = None,
+) -> str:
+    """ETag of a page computed from row versions alone, without reading the rows"""
+    query, query_params = keyset_query(
+        entity.table, entity.sort_column, page.limit, page.cursor, where, params,
+        columns=f"id, {entity.sort_column}, {ROW_VERSION_COLUMN}"
+    )
+    rows, _ = await async_db_manager.execute_query(query, query_params)
+
+    next_cursor = None
+    if len(rows) > page.limit:
+        row_id, sort_value, _ = rows[page.limit - 1]
+        next_cursor = encode_cursor(sort_value, row_id)
+    return make_etag(
+        entity.table, page_columns(entity, fields),
+        [(row_id, version) for row_id, _, version in rows[:page.limit]], next_cursor
+    )
+
+async def page_response(
+    entity: Entity,
+    page: PageParams,
+    where: Optional[str] = None,
+    params: tuple = (),
+    cache_tag: Optional[str] = None,
+    fields: Optional[str] = None,
+) -> Response:
+    """Serve one page as JSON with an ETag, or 304 if the client's copy is current.
+
+    Pages of lists with a ``cache_tag`` are served through the entity cache
+    and dropped when the tag is invalidated. Conditional requests that miss
+    the cache check row versions first and only read full rows on a change.
+    """
+    columns = page_columns(entity, fields)
+    key = entity_cache.page_key(cache_tag, page.limit, page.cursor, ",".join(columns)) if cache_tag is not None else None
+    result = entity_cache.get(key) if key is not None else MISSING
+    if result is MISSING:
+        if "if-none-match" in page.request.headers:
+            etag = await page_etag(entity, page, where, params, fields)
+            if etag_matches(page.request, etag):
+                return not_modified(etag)
+        # Cached pages outlive the request, so they are never read from a lagging replica
+        result = await fetch_page(entity, page, where, params, fields, primary=key is not None)
+        if key is not None:
+            entity_cache.set(key, result)
+    return conditional_response(page.request, {"items": result.items, "next_cursor": result.next_cursor}, result.etag)
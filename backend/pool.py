@@ -0,0 +1,239 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Any, Optional
+
+import psycopg2
+import psycopg2.extensions
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no connection becomes available within the acquire timeout"""
+
+
+class PoolClosedError(Exception):
+    """Raised when a connection is requested from a closed pool"""
+
+
+class ConnectionPool:
+    """Thread-safe pool of autocommit psycopg2 connections.
+
+    Connections are created lazily up to ``max_size`` and kept open between
+    queries. A connection that has sat idle for longer than
+    ``health_check_interval`` seconds is pinged with ``SELECT 1`` before it is
+    handed out again, and idle connections above ``min_size`` are closed once
+    they exceed ``max_idle`` seconds.
+    """
+
+    def __init__(
+        self,
+        config: Dict[str, Any],
+        min_size: int = 1,
+        max_size: int = 20,
+        timeout: float = 10.0,
+        health_check_interval: float = 30.0,
+        max_idle: float = 300.0,
+        connection_factory=None,
+    ):
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError("Pool sizes must satisfy 0 <= min_size <= max_size and max_size >= 1")
+        self.config = config
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+        self.max_idle = max_idle
+        self.connection_factory = connection_factory
+
+        self._lock = threading.Condition()
+        # Idle connections as (connection, returned_at) pairs, most recent last
+        self._idle = deque()
+        self._size = 0
+        self._closed = False
+        self._stats = {
+            "connections_created": 0,
+            "connections_closed": 0,
+            "health_checks_failed": 0,
+            "acquired": 0,
+            "timeouts": 0,
+            "wait_time_total": 0.0,
+        }
+
+    def _connect(self):
+        kwargs = dict(self.config)
+        if self.connection_factory is not None:
+            kwargs["connection_factory"] = self.connection_factory
+        conn = psycopg2.connect(**kwargs)
+        conn.autocommit = True
+        with self._lock:
+            self._stats["connections_created"] += 1
+        return conn
+
+    def _close_connection(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+        with self._lock:
+            self._stats["connections_closed"] += 1
+
+    def _is_healthy(self, conn) -> bool:
+        if conn.closed:
+            return False
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            return True
+        except psycopg2.Error:
+            return False
+
+    def open(self):
+        """Eagerly create ``min_size`` connections"""
+        while True:
+            with self._lock:
+                if self._closed:
+                    raise PoolClosedError("Connection pool is closed")
+                if self._size >= self.min_size:
+                    return
+                self._size += 1
+            try:
+                conn = self._connect()
+            except Exception:
+                with self._lock:
+                    self._size -= 1
+                    self._lock.notify()
+                raise
+            self.putconn(conn)
+
+    def getconn(self, timeout: Optional[float] = None):
+        """Take a connection from the pool, waiting up to ``timeout`` seconds"""
+        timeout = self.timeout if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout
+
+        while True:
+            conn = None
+            idle_for = 0.0
+            with self._lock:
+                while True:
+                    if self._closed:
+                        raise PoolClosedError("Connection pool is closed")
+                    if self._idle:
+                        conn, returned_at = self._idle.pop()
+                        idle_for = time.monotonic() - returned_at
+                        break
+                    if self._size < self.max_size:
+                        # Reserve a slot and connect outside the lock
+                        self._size += 1
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats["timeouts"] += 1
+                        raise PoolTimeoutError(
+                            f"Timed out after {timeout:.1f}s waiting for a database connection "
+                            f"(pool max_size={self.max_size})"
+                        )
+                    self._lock.wait(remaining)
+
+            if conn is None:
+                try:
+                    conn = self._connect()
+                except Exception:
+                    with self._lock:
+                        self._size -= 1
+                        self._lock.notify()
+                    raise
+            elif conn.closed or (idle_for >= self.health_check_interval and not self._is_healthy(conn)):
+                with self._lock:
+                    self._stats["health_checks_failed"] += 1
+                self._discard(conn)
+                continue
+
+            with self._lock:
+                self._stats["acquired"] += 1
+                self._stats["wait_time_total"] += time.monotonic() - started
+            return conn
+
+    def putconn(self, conn, discard: bool = False):
+        """Return a connection to the pool, or close it if it is unusable"""
+        if not discard and not conn.closed:
+            status = conn.info.transaction_status
+            if status != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                try:
+                    conn.rollback()
+                    conn.autocommit = True
+                except psycopg2.Error:
+                    discard = True
+            elif not conn.autocommit:
+                conn.autocommit = True
+
+        if discard or conn.closed:
+            self._discard(conn)
+            return
+
+        now = time.monotonic()
+        expired = []
+        with self._lock:
+            if self._closed:
+                expired.append(conn)
+                self._size -= 1
+            else:
+                self._idle.append((conn, now))
+                # Trim connections that have been idle too long, oldest first
+                while self._size > self.min_size and self._idle and now - self._idle[0][1] > self.max_idle:
+                    expired.append(self._idle.popleft()[0])
+                    self._size -= 1
+            self._lock.notify()
+        for stale in expired:
+            self._close_connection(stale)
+
+    def _discard(self, conn):
+        with self._lock:
+            self._size -= 1
+            self._lock.notify()
+        self._close_connection(conn)
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None):
+        """Context manager that borrows a connection and always returns it"""
+        conn = self.getconn(timeout)
+        discard = False
+        try:
+            yield conn
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            # The server went away or the socket broke; do not reuse it
+            discard = True
+            raise
+        finally:
+            self.putconn(conn, discard=discard)
+
+    def close(self):
+        """Close all idle connections; in-use connections close when returned"""
+        with self._lock:
+            self._closed = True
+            idle = [conn for conn, _ in self._idle]
+            self._idle.clear()
+            self._size -= len(idle)
+            self._lock.notify_all()
+        for conn in idle:
+            self._close_connection(conn)
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of pool sizes and counters"""
+        with self._lock:
+            idle = len(self._idle)
+            acquired = self._stats["acquired"]
+            return {
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "size": self._size,
+                "idle": idle,
+                "in_use": self._size - idle,
+                **self._stats,
+                "avg_wait_ms": (self._stats["wait_time_total"] / acquired * 1000) if acquired else 0.0,
+            }
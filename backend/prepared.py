@@ -0,0 +1,137 @@
+import itertools
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+import psycopg2
+import psycopg2.errors
+import psycopg2.extensions
+
+# Server-side prepared statements on pooled connections
+PREPARED_STATEMENTS_ENABLED = os.getenv("DB_PREPARED_STATEMENTS", "true").lower() in ("1", "true", "yes")
+# A statement is prepared on its Nth execution on a connection
+PREPARE_THRESHOLD = int(os.getenv("DB_PREPARE_THRESHOLD", "2"))
+# Prepared statements kept per connection; the least recently used is deallocated
+PREPARED_MAX = int(os.getenv("DB_PREPARED_MAX", "100"))
+
+_PLACEHOLDER = re.compile(r"%%|%s|%\(")
+_statement_ids = itertools.count(1)
+
+def server_placeholders(query: str) -> Optional[str]:
+    """``query`` with psycopg2's ``%s`` placeholders numbered ``$1, $2, ...``;
+    None if it uses named ``%(name)s`` placeholders"""
+    numbers = itertools.count(1)
+
+    def replace(match):
+        token = match.group()
+        if token == "%(":
+            raise ValueError
+        return "%" if token == "%%" else f"${next(numbers)}"
+
+    try:
+        return _PLACEHOLDER.sub(replace, query)
+    except ValueError:
+        return None
+
+class PreparedStatementStats:
+    """Counters shared by every preparing connection"""
+
+    EVENTS = ("hits", "misses", "prepared", "evictions", "failures")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.clear()
+
+    def add(self, event: str):
+        with self._lock:
+            self._counts[event] += 1
+
+    def clear(self):
+        with self._lock:
+            self._counts = dict.fromkeys(self.EVENTS, 0)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Counts plus the fraction of executions served by an existing prepared statement"""
+        with self._lock:
+            counts = dict(self._counts)
+        executions = counts["hits"] + counts["misses"]
+        return {**counts, "hit_rate": counts["hits"] / executions if executions else 0.0}
+
+prepared_stats = PreparedStatementStats()
+
+class PreparingConnection(psycopg2.extensions.connection):
+    """psycopg2 connection that transparently prepares its hot statements.
+
+    Statements executed ``PREPARE_THRESHOLD`` times are turned into
+    ``PREPARE ps_N AS ...`` and afterwards run as ``EXECUTE ps_N (...)``,
+    so Postgres skips parsing and planning. At most ``PREPARED_MAX``
+    statements are kept, in LRU order. Statements that can't be prepared
+    (for example ones Postgres can't infer parameter types for) run as
+    usual. Only autocommit statements on unnamed cursors go this way,
+    because a failed PREPARE would abort an open transaction.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.threshold = PREPARE_THRESHOLD
+        self.max_prepared = PREPARED_MAX
+        # query -> statement name, or None for queries that can't be prepared
+        self.prepared: "OrderedDict[str, Optional[str]]" = OrderedDict()
+        # query -> executions so far, for queries not prepared yet
+        self.seen: "OrderedDict[str, int]" = OrderedDict()
+
+    def _remember(self, query: str, name: Optional[str]):
+        self.prepared[query] = name
+        while len(self.prepared) > self.max_prepared:
+            _, evicted = self.prepared.popitem(last=False)
+            if evicted is not None:
+                with self.cursor() as cur:
+                    cur.execute(f"DEALLOCATE {evicted}")
+                prepared_stats.add("evictions")
+
+    def _prepare(self, execute: Callable, query: str, params) -> Optional[str]:
+        """Prepare ``query`` once it is hot; returns its statement name"""
+        if query in self.prepared:
+            self.prepared.move_to_end(query)
+            return self.prepared[query]
+        count = self.seen.pop(query, 0) + 1
+        if count < self.threshold:
+            self.seen[query] = count
+            if len(self.seen) > self.max_prepared * 4:
+                self.seen.popitem(last=False)
+            return None
+        body = server_placeholders(query) if params is not None else query
+        name = None
+        if body is not None:
+            name = f"ps_{next(_statement_ids)}"
+            try:
+                execute(f"PREPARE {name} AS {body}")
+                prepared_stats.add("prepared")
+            except psycopg2.Error:
+                name = None
+        if name is None:
+            prepared_stats.add("failures")
+        self._remember(query, name)
+        return name
+
+    def execute_prepared(self, execute: Callable, query, params):
+        """Run ``query`` with the cursor's plain ``execute``, through a prepared statement when hot"""
+        if not isinstance(query, str) or isinstance(params, dict):
+            return execute(query, params)
+        was_prepared = self.prepared.get(query) is not None
+        name = self._prepare(execute, query, params)
+        if name is None:
+            prepared_stats.add("misses")
+            return execute(query, params)
+        prepared_stats.add("hits" if was_prepared else "misses")
+        arguments = f" ({', '.join(['%s'] * len(params))})" if params else ""
+        try:
+            return execute(f"EXECUTE {name}{arguments}", params or None)
+        except psycopg2.errors.FeatureNotSupported:
+            # "cached plan must not change result type": the table changed
+            # under a SELECT *; forget the statement and run it afresh
+            del self.prepared[query]
+            execute(f"DEALLOCATE {name}")
+            return execute(query, params)
@@ -0,0 +1,189 @@
+import contextvars
+import itertools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+import psycopg2
+import psycopg2.extensions
+
+from pool import ConnectionPool
+
+# Read replicas: comma-separated libpq DSNs or URLs; settings they leave out
+# (user, password, dbname, ...) are taken from the primary's DB_CONFIG
+DB_REPLICAS = os.getenv("DB_REPLICAS", "")
+# Seconds a client's reads stay on the primary after it wrote
+REPLICA_STICKY_SECONDS = float(os.getenv("DB_REPLICA_STICKY_SECONDS", "5"))
+# Seconds a failing replica is left out of rotation before it is tried again
+REPLICA_RETRY_SECONDS = float(os.getenv("DB_REPLICA_RETRY_SECONDS", "30"))
+# Seconds to wait for a replica connection, so an unreachable replica that
+# drops packets is ejected quickly instead of after the OS TCP timeout
+REPLICA_CONNECT_TIMEOUT = int(os.getenv("DB_REPLICA_CONNECT_TIMEOUT", "3"))
+# statement_timeout of replica sessions in milliseconds (0 = none); a read
+# cancelled on a replica is retried on the primary
+REPLICA_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_REPLICA_STATEMENT_TIMEOUT_MS", "30000"))
+
+STICKY_COOKIE = "crm_read_primary_until"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+def parse_replicas(value: str, primary: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Connection configs for the comma-separated replica DSNs in ``value``.
+
+    Replicas get ``DB_REPLICA_CONNECT_TIMEOUT`` and
+    ``DB_REPLICA_STATEMENT_TIMEOUT_MS`` unless their DSN sets
+    ``connect_timeout`` or ``options`` itself.
+    """
+    defaults = {"connect_timeout": REPLICA_CONNECT_TIMEOUT}
+    if REPLICA_STATEMENT_TIMEOUT_MS:
+        defaults["options"] = f"-c statement_timeout={REPLICA_STATEMENT_TIMEOUT_MS}"
+    configs = []
+    for dsn in filter(None, (part.strip() for part in value.split(","))):
+        settings = psycopg2.extensions.parse_dsn(dsn)
+        if "port" in settings:
+            settings["port"] = int(settings["port"])
+        if "connect_timeout" in settings:
+            settings["connect_timeout"] = int(settings["connect_timeout"])
+        configs.append({**primary, **defaults, **settings})
+    return configs
+
+class Replica:
+    """One read replica with its own pool and ejection state"""
+
+    def __init__(self, config: Dict[str, Any], pool_options: Optional[Dict[str, Any]] = None):
+        self.config = config
+        self.pool_options = pool_options
+        self.ejected_until = 0.0
+        self.reads = 0
+        self.failures = 0
+        self._pool = None
+        self._lock = threading.Lock()
+
+    @property
+    def name(self) -> str:
+        return f"{self.config['host']}:{self.config['port']}/{self.config['dbname']}"
+
+    @property
+    def healthy(self) -> bool:
+        return time.monotonic() >= self.ejected_until
+
+    @contextmanager
+    def connection(self):
+        """A pooled (or, without pool options, dedicated) connection to the replica"""
+        if self.pool_options is None:
+            conn = psycopg2.connect(**self.config)
+            conn.autocommit = True
+            try:
+                yield conn
+            finally:
+                conn.close()
+            return
+        with self._lock:
+            if self._pool is None:
+                self._pool = ConnectionPool(self.config, **self.pool_options)
+        with self._pool.connection() as conn:
+            yield conn
+
+    def eject(self):
+        """Leave the replica out of rotation for ``REPLICA_RETRY_SECONDS``, dropping its idle connections"""
+        self.failures += 1
+        self.ejected_until = time.monotonic() + REPLICA_RETRY_SECONDS
+        self.close()
+
+    def close(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"replica": self.name, "healthy": self.healthy, "reads": self.reads, "failures": self.failures}
+
+class ReplicaSet:
+    """Round-robin over the healthy replicas"""
+
+    def __init__(self, configs: List[Dict[str, Any]], pool_options: Optional[Dict[str, Any]] = None):
+        self.replicas = [Replica(config, pool_options) for config in configs]
+        self._turn = itertools.count()
+        self.primary_reads = 0
+
+    def __bool__(self) -> bool:
+        return bool(self.replicas)
+
+    def candidates(self) -> List[Replica]:
+        """Healthy replicas in the order to try them for the next read"""
+        start = next(self._turn)
+        count = len(self.replicas)
+        ordered = [self.replicas[(start + offset) % count] for offset in range(count)]
+        return [replica for replica in ordered if replica.healthy]
+
+    def close(self):
+        for replica in self.replicas:
+            replica.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"primary_reads": self.primary_reads, "replicas": [replica.stats() for replica in self.replicas]}
+
+class RoutingState:
+    """Per-request routing: whether reads must go to the primary"""
+
+    def __init__(self, method: str, primary_until: float):
+        self.wrote = method not in SAFE_METHODS
+        self.primary_until = primary_until
+
+    @property
+    def primary_only(self) -> bool:
+        return self.wrote or time.time() < self.primary_until
+
+# Routing state of the request being served; outside requests reads may use replicas
+current_routing: contextvars.ContextVar[Optional[RoutingState]] = contextvars.ContextVar("current_routing", default=None)
+
+def reads_need_primary() -> bool:
+    state = current_routing.get()
+    return state is not None and state.primary_only
+
+def _sticky_until(scope) -> float:
+    for name, value in scope.get("headers", ()):
+        if name == b"cookie":
+            for part in value.decode("latin-1").split(";"):
+                key, _, stamp = part.strip().partition("=")
+                if key == STICKY_COOKIE:
+                    try:
+                        return float(stamp)
+                    except ValueError:
+                        return 0.0
+    return 0.0
+
+class ReadYourWritesMiddleware:
+    """ASGI middleware giving clients read-your-writes consistency with replicas.
+
+    Requests with unsafe methods (POST, PUT, PATCH, DELETE) read from the
+    primary. A successful one sets a cookie that sends the same client's
+    reads to the primary for ``REPLICA_STICKY_SECONDS``, longer than the
+    replicas should lag. ``active()`` tells whether any replicas are
+    configured; without them requests pass straight through.
+    """
+
+    def __init__(self, app, active: Callable[[], bool] = lambda: True):
+        self.app = app
+        self.active = active
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.active():
+            await self.app(scope, receive, send)
+            return
+        state = RoutingState(scope["method"], _sticky_until(scope))
+
+        async def send_with_cookie(message):
+            if message["type"] == "http.response.start" and state.wrote and message["status"] < 400:
+                until = time.time() + REPLICA_STICKY_SECONDS
+                cookie = f"{STICKY_COOKIE}={until:.3f}; Max-Age={int(REPLICA_STICKY_SECONDS) or 1}; Path=/; HttpOnly; SameSite=Lax"
+                message["headers"] = [*message.get("headers", ()), (b"set-cookie", cookie.encode("latin-1"))]
+            await send(message)
+
+        token = current_routing.set(state)
+        try:
+            await self.app(scope, receive, send_with_cookie)
+        finally:
+            current_routing.reset(token)
@@ -0,0 +1,74 @@
+import hashlib
+import json
+import os
+from datetime import date, datetime
+from typing import Any, Dict, Set
+
+from fastapi import Request
+from fastapi.responses import JSONResponse, Response
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+# max-age sent with ETagged responses; 0 makes clients revalidate every time
+HTTP_CACHE_MAX_AGE = int(os.getenv("API_CACHE_MAX_AGE", "0"))
+
+def dumps(content: Any) -> bytes:
+    """Serialize plain dicts/lists (including datetimes) to JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, default=_json_default, separators=(",", ":")).encode("utf-8")
+
+class FastJSONResponse(JSONResponse):
+    """JSON response that serializes database rows directly.
+
+    Returning this from a route skips building Pydantic models and FastAPI's
+    ``response_model`` validation, so rows go from the row mapper straight
+    to orjson (or the stdlib encoder when orjson is not installed). Only use
+    it with dicts whose keys already match the declared response model.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+def make_etag(*parts: Any) -> str:
+    """Strong ETag over the values that determine a representation"""
+    return '"%s"' % hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Whether the request's If-None-Match names this ETag (weak comparison)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return etag in (tag.strip().removeprefix("W/") for tag in header.split(","))
+
+def accepted_encodings(request: Request) -> Set[str]:
+    """Content codings the client accepts (``q=0`` entries excluded)"""
+    accepted = set()
+    for entry in request.headers.get("accept-encoding", "").split(","):
+        coding, _, params = entry.strip().partition(";")
+        if coding and params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            accepted.add(coding.strip().lower())
+    return accepted
+
+def cache_headers(etag: str) -> Dict[str, str]:
+    control = f"private, max-age={HTTP_CACHE_MAX_AGE}" if HTTP_CACHE_MAX_AGE > 0 else "private, no-cache"
+    return {"ETag": etag, "Cache-Control": control}
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers=cache_headers(etag))
+
+def conditional_response(request: Request, content: Any, etag: str) -> Response:
+    """304 when the client already has this version, otherwise the JSON body"""
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    return FastJSONResponse(content, headers=cache_headers(etag))
@@ -1,47 +1,53 @@
-from fastapi import APIRouter, HTTPException
-from typing import List
-from models import Account, AccountCreate, AccountUpdate, MessageResponse
-from database import db_manager
+from typing import List, Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, Request
+from starlette.concurrency import run_in_threadpool
+from models import Account, AccountCreate, AccountUpdate, LookupResult, MessageResponse, Page
+from async_database import async_db_manager
+from cache import delete_cascading, entity_key, fetch_cached_row, invalidate_rows
+from entities import ENTITIES, fields_query
+from lookup import lookup_ids, lookup_response
+from pagination import PageParams, page_response
+from responses import conditional_response
 
 router = APIRouter(prefix="/accounts", tags=["accounts"])
 
-@router.get("/", response_model=List[Account])
-def get_accounts():
-    """Get all accounts"""
-    rows, cur = db_manager.execute_query("SELECT * FROM accounts ORDER BY created_at DESC")
-    
-    accounts = []
-    for row in rows:
-        account = db_manager.row_to_dict(row, cur)
-        accounts.append(Account(**account))
-    return accounts
+@router.get("/", response_model=Union[Page[Account], LookupResult[Account]])
+async def get_accounts(
+    page: PageParams = Depends(),
+    ids: Optional[List[int]] = Depends(lookup_ids),
+    fields: Optional[str] = Depends(fields_query),
+):
+    """Get a page of accounts, newest first, or the accounts with the given ids"""
+    if ids is not None:
+        return await lookup_response(ENTITIES["accounts"], ids, fields)
+    return await page_response(ENTITIES["accounts"], page, fields=fields)
 
 @router.get("/{account_id}", response_model=Account)
-def get_account(account_id: int):
+async def get_account(account_id: int, request: Request, fields: Optional[str] = Depends(fields_query)):
     """Get a specific account by ID"""
-    row, cur = db_manager.execute_single("SELECT * FROM accounts WHERE id = %s", (account_id,))
+    account = await fetch_cached_row(entity_key("accounts", account_id), ENTITIES["accounts"], "id", account_id, fields)
     
-    if row is None:
+    if account is None:
         raise HTTPException(status_code=404, detail="Account not found")
     
-    account = db_manager.row_to_dict(row, cur)
-    return Account(**account)
+    return conditional_response(request, account.row, account.etag)
 
 @router.post("/", response_model=Account)
-def create_account(account: AccountCreate):
+async def create_account(account: AccountCreate):
     """Create a new account"""
-    row, cur = db_manager.execute_insert(
+    row, cur = await async_db_manager.execute_insert(
         "INSERT INTO accounts (name, industry, plan, status) VALUES (%s, %s, %s, %s) RETURNING *",
         (account.name, account.industry, account.plan, account.status)
     )
     
-    created_account = db_manager.row_to_dict(row, cur)
+    created_account = async_db_manager.row_to_dict(row, cur)
+    invalidate_rows(ENTITIES["accounts"], [created_account])
     return Account(**created_account)
 
 @router.put("/{account_id}", response_model=Account)
-def update_account(account_id: int, account: AccountUpdate):
+async def update_account(account_id: int, account: AccountUpdate):
     """Update an existing account"""
-    row, cur = db_manager.execute_update(
+    row, cur = await async_db_manager.execute_update(
         "UPDATE accounts SET name = %s, industry = %s, plan = %s, status = %s WHERE id = %s RETURNING *",
         (account.name, account.industry, account.plan, account.status, account_id)
     )
@@ -49,15 +55,16 @@ def update_account(account_id: int, account: AccountUpdate):
     if row is None:
         raise HTTPException(status_code=404, detail="Account not found")
     
-    updated_account = db_manager.row_to_dict(row, cur)
+    updated_account = async_db_manager.row_to_dict(row, cur)
+    invalidate_rows(ENTITIES["accounts"], [updated_account])
     return Account(**updated_account)
 
 @router.delete("/{account_id}", response_model=MessageResponse)
-def delete_account(account_id: int):
+async def delete_account(account_id: int):
     """Delete an account"""
-    row_count = db_manager.execute_delete("DELETE FROM accounts WHERE id = %s", (account_id,))
+    deleted = await run_in_threadpool(delete_cascading, ENTITIES["accounts"], account_id)
     
-    if row_count == 0:
+    if not deleted:
         raise HTTPException(status_code=404, detail="Account not found")
     
     return MessageResponse(message="Account deleted successfully") 
\ No newline at end of file
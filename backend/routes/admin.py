@@ -0,0 +1,26 @@
+from fastapi import APIRouter
+from models import MessageResponse, SlowQueryLogView, SlowQuerySettings, SlowQuerySettingsUpdate
+from slow_queries import slow_query_log
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+@router.get("/slow-queries", response_model=SlowQueryLogView)
+def get_slow_queries():
+    """Slow-query log settings and the recorded statements, newest first.
+
+    The log is per process: with several workers this is the log of the
+    worker that answered, and PATCH/DELETE only change that worker.
+    """
+    return {"settings": slow_query_log.settings(), "queries": slow_query_log.entries()}
+
+@router.patch("/slow-queries", response_model=SlowQuerySettings)
+def update_slow_query_settings(update: SlowQuerySettingsUpdate):
+    """Turn the slow-query log on or off, or change its threshold and EXPLAIN sample rate"""
+    slow_query_log.configure(**update.model_dump())
+    return slow_query_log.settings()
+
+@router.delete("/slow-queries", response_model=MessageResponse)
+def clear_slow_queries():
+    """Empty the slow-query buffer"""
+    slow_query_log.clear()
+    return {"message": "Slow-query log cleared"}
@@ -0,0 +1,76 @@
+from datetime import date
+from typing import Any, Dict, Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from models import AccountCallStats, AccountEmailStats
+from async_database import async_db_manager
+
+router = APIRouter(prefix="/analytics", tags=["analytics"])
+
+# Both queries read the trigger-maintained rollups of migration 0005 for the
+# account's contacts, never the calls or emails themselves. Starting from
+# accounts makes an unknown account come back without rows.
+CALL_STATS_QUERY = """
+    SELECT GROUPING(s.call_type, s.outcome) AS grouping, s.call_type, s.outcome,
+           count(a.id) AS accounts,
+           coalesce(sum(s.calls), 0) AS calls,
+           coalesce(sum(s.timed_calls), 0) AS timed_calls,
+           coalesce(sum(s.total_duration), 0) AS total_duration
+    FROM accounts a
+    LEFT JOIN contacts c ON c.account_id = a.id
+    LEFT JOIN call_stats s ON s.contact_id = c.id AND s.calls > 0
+    WHERE a.id = %s
+    GROUP BY GROUPING SETS ((s.call_type), (s.outcome), ())
+    ORDER BY grouping, calls DESC, s.call_type, s.outcome
+"""
+
+EMAIL_STATS_QUERY = """
+    SELECT w.week, coalesce(sum(w.emails), 0) AS emails
+    FROM accounts a
+    LEFT JOIN contacts c ON c.account_id = a.id
+    LEFT JOIN email_weekly_stats w ON w.contact_id = c.id AND w.emails > 0
+        AND w.week >= coalesce(%s::date, '-infinity') AND w.week <= coalesce(%s::date, 'infinity')
+    WHERE a.id = %s
+    GROUP BY w.week
+    ORDER BY w.week
+"""
+
+def _group(row: Dict[str, Any]) -> Dict[str, Any]:
+    timed = row["timed_calls"]
+    return {
+        "calls": row["calls"],
+        "total_duration": row["total_duration"],
+        "average_duration": row["total_duration"] / timed if timed else None,
+    }
+
+@router.get("/accounts/{account_id}/calls", response_model=AccountCallStats)
+async def account_call_stats(account_id: int):
+    """Call counts and durations of an account's contacts, overall, by call type and by outcome"""
+    rows, cur = await async_db_manager.execute_query(CALL_STATS_QUERY, (account_id,))
+    rows = async_db_manager.rows_to_dicts(rows, cur)
+    # GROUPING() is 1 for the per-type groups, 2 for per-outcome, 3 for the total
+    total = next(row for row in rows if row["grouping"] == 3)
+    if not total["accounts"]:
+        raise HTTPException(status_code=404, detail="Account not found")
+    groups = [row for row in rows if row["calls"]]
+    return {
+        "account_id": account_id,
+        **_group(total),
+        "by_type": [{"call_type": row["call_type"], **_group(row)} for row in groups if row["grouping"] == 1],
+        "by_outcome": [{"outcome": row["outcome"], **_group(row)} for row in groups if row["grouping"] == 2],
+    }
+
+@router.get("/accounts/{account_id}/emails", response_model=AccountEmailStats)
+async def account_email_stats(
+    account_id: int,
+    since: Optional[date] = Query(None, description="First week to include (any day of it)"),
+    until: Optional[date] = Query(None, description="Last week to include (any day of it)"),
+):
+    """Emails sent to an account's contacts per ISO week, oldest first; weeks without email are left out"""
+    # Weeks are stored by their Monday, so round the bounds down to theirs
+    since = since and date.fromordinal(since.toordinal() - since.weekday())
+    rows, cur = await async_db_manager.execute_query(EMAIL_STATS_QUERY, (since, until, account_id))
+    if not rows:
+        raise HTTPException(status_code=404, detail="Account not found")
+    weeks = [{"week": row["week"], "emails": row["emails"]} for row in async_db_manager.rows_to_dicts(rows, cur) if row["week"]]
+    return {"account_id": account_id, "emails": sum(week["emails"] for week in weeks), "weeks": weeks}
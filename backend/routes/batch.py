@@ -0,0 +1,171 @@
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Union
+
+import psycopg2
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel, ValidationError
+from starlette.concurrency import run_in_threadpool
+from models import BatchOperation, BatchRequest, BatchResponse, BatchResult, BulkRowError
+from cache import delete_row_cascading, entity_cache, invalidate_rows
+from database import db_manager
+from entities import ENTITIES, Entity
+from routes.bulk import format_validation_error
+
+router = APIRouter(tags=["batch"])
+
+# Upper bound on operations accepted by a single batch
+MAX_BATCH_OPERATIONS = 1000
+
+# Updates replace the whole row, as PUT does. New transcript text is stored
+# inline, so (as in PUT /call-transcripts/{id}) any streamed body is dropped.
+UPDATE_ASSIGNMENTS = {"call-transcripts": ("compression = NULL",)}
+UPDATE_CLEANUP = {"call-transcripts": "DELETE FROM call_transcript_chunks WHERE transcript_id = %s"}
+
+class Step(NamedTuple):
+    """A validated operation; ``row_id`` and the parent column may still be ``$ref`` strings"""
+    index: int
+    operation: BatchOperation
+    entity: Entity
+    row_id: Union[int, str, None]
+    model: Optional[BaseModel]
+    parent_ref: Optional[str]
+
+def _fail(status_code: int, index: int, detail: str):
+    raise HTTPException(status_code=status_code, detail=BulkRowError(index=index, detail=detail).model_dump())
+
+def _check_ref(value: Any, defined: Set[str], index: int, field: str):
+    if isinstance(value, str):
+        if not value.startswith("$") or value[1:] not in defined:
+            _fail(422, index, f"{field}: {value!r} is not an id or the $ref of an earlier create")
+
+def plan_batch(operations: List[BatchOperation]) -> List[Step]:
+    """Validate every operation before anything is written.
+
+    Only ``id`` and the entity's parent column (``account_id``,
+    ``contact_id``, ``call_id``) may hold ``$ref`` strings; while
+    validating, references stand in as id 0.
+    """
+    steps, defined = [], set()
+    for index, operation in enumerate(operations):
+        entity = ENTITIES.get(operation.entity)
+        if entity is None:
+            _fail(422, index, f"Unknown entity '{operation.entity}'")
+        if operation.ref is not None:
+            if operation.op != "create":
+                _fail(422, index, "ref is only allowed on create")
+            if operation.ref in defined:
+                _fail(422, index, f"ref '{operation.ref}' is already defined")
+
+        row_id = operation.id
+        if operation.op == "create":
+            row_id = None
+        elif row_id is None:
+            _fail(422, index, f"id is required to {operation.op}")
+        else:
+            _check_ref(row_id, defined, index, "id")
+
+        model, parent_ref = None, None
+        if operation.op != "delete":
+            data = dict(operation.data or {})
+            if entity.parent_column and isinstance(data.get(entity.parent_column), str):
+                parent_ref = data[entity.parent_column]
+                _check_ref(parent_ref, defined, index, entity.parent_column)
+                data[entity.parent_column] = 0
+            model_class = entity.create_model if operation.op == "create" else entity.update_model
+            try:
+                model = model_class.model_validate(data)
+            except ValidationError as e:
+                _fail(422, index, format_validation_error(e))
+
+        if operation.ref is not None:
+            defined.add(operation.ref)
+        steps.append(Step(index, operation, entity, row_id, model, parent_ref))
+    return steps
+
+def _values(step: Step, columns, refs: Dict[str, int]) -> tuple:
+    values = step.model.model_dump()
+    if step.parent_ref is not None:
+        values[step.entity.parent_column] = refs[step.parent_ref[1:]]
+    return tuple(values[column] for column in columns)
+
+def _execute(cur, step: Step, refs: Dict[str, int]) -> Dict[str, Any]:
+    """Run one step; returns its row (None for deletes) plus what to invalidate"""
+    entity = step.entity
+    row_id = refs[step.row_id[1:]] if isinstance(step.row_id, str) else step.row_id
+    columns = entity.select_sql(entity.columns, qualified=True)
+
+    if step.operation.op == "create":
+        insert_columns = entity.insert_columns
+        cur.execute(
+            f"INSERT INTO {entity.table} ({', '.join(insert_columns)}) "
+            f"VALUES ({', '.join(['%s'] * len(insert_columns))}) RETURNING {columns}",
+            _values(step, insert_columns, refs)
+        )
+        row = db_manager.row_to_dict(cur.fetchone(), cur)
+        return {"id": row["id"], "row": row, "previous_parents": []}
+
+    if step.operation.op == "update":
+        update_columns = tuple(entity.update_model.model_fields)
+        assignments = [f"{column} = %s" for column in update_columns] + list(UPDATE_ASSIGNMENTS.get(entity.name, ()))
+        previous = f"previous.{entity.parent_column}" if entity.parent_column else "NULL"
+        cur.execute(
+            f"UPDATE {entity.table} SET {', '.join(assignments)} FROM {entity.table} AS previous "
+            f"WHERE {entity.table}.id = %s AND previous.id = {entity.table}.id "
+            f"RETURNING {columns}, {previous} AS previous_parent",
+            (*_values(step, update_columns, refs), row_id)
+        )
+        found = cur.fetchone()
+        if found is None:
+            _fail(404, step.index, f"{entity.label} {row_id} not found")
+        row = db_manager.row_to_dict(found, cur)
+        if entity.name in UPDATE_CLEANUP:
+            cur.execute(UPDATE_CLEANUP[entity.name], (row_id,))
+        return {"id": row_id, "row": row, "previous_parents": [row.pop("previous_parent")]}
+
+    deleted = delete_row_cascading(cur, entity, row_id)
+    if deleted is None:
+        _fail(404, step.index, f"{entity.label} {row_id} not found")
+    return {"id": row_id, "row": None, "deleted": deleted}
+
+def run_batch(operations: List[BatchOperation]) -> BatchResponse:
+    """Run the operations in order in one transaction: all of them or none"""
+    steps = plan_batch(operations)
+    refs: Dict[str, int] = {}
+    outcomes = []
+    with db_manager.transaction() as cur:
+        for step in steps:
+            try:
+                outcome = _execute(cur, step, refs)
+            except psycopg2.IntegrityError as e:
+                _fail(409, step.index, e.diag.message_primary or str(e))
+            except psycopg2.DataError as e:
+                _fail(422, step.index, e.diag.message_primary or str(e))
+            if step.operation.ref is not None:
+                refs[step.operation.ref] = outcome["id"]
+            outcomes.append(outcome)
+
+    # Committed: now drop what the batch made stale
+    for step, outcome in zip(steps, outcomes):
+        if outcome["row"] is not None:
+            invalidate_rows(step.entity, [outcome["row"]], outcome["previous_parents"])
+        else:
+            entity_cache.invalidate(*outcome["deleted"])
+
+    return BatchResponse(
+        results=[
+            BatchResult(index=step.index, op=step.operation.op, entity=step.entity.name, id=outcome["id"], row=outcome["row"])
+            for step, outcome in zip(steps, outcomes)
+        ],
+        refs=refs,
+    )
+
+@router.post("/batch", response_model=BatchResponse)
+async def batch(request: BatchRequest):
+    """Run create, update and delete operations across entities in one transaction.
+
+    Operations run in order; a create with ``ref`` lets later operations use
+    ``"$<ref>"`` as an ``id`` or parent id. If any operation fails, nothing is
+    written and the error names its ``index``.
+    """
+    if len(request.operations) > MAX_BATCH_OPERATIONS:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BATCH_OPERATIONS} operations per batch")
+    return await run_in_threadpool(run_batch, request.operations)
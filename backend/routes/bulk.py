@@ -0,0 +1,133 @@
+import json
+from typing import Any, Dict, List
+
+import psycopg2
+from fastapi import APIRouter, HTTPException, Request
+from pydantic import ValidationError
+from starlette.concurrency import run_in_threadpool
+from models import BulkCreateResult, BulkRowError
+from cache import invalidate_rows
+from database import db_manager
+from entities import Entity, get_entity
+
+router = APIRouter(tags=["bulk"])
+
+# Upper bound on rows accepted by a single bulk request
+MAX_BULK_ROWS = 50000
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+def parse_bulk_body(body: bytes, content_type: str) -> List[Any]:
+    """Decode a JSON array or NDJSON body into a list of items.
+
+    A malformed NDJSON line becomes an ``Exception`` item so it can be
+    reported against its row instead of failing the whole request.
+    """
+    if content_type.split(";")[0].strip() in NDJSON_CONTENT_TYPES:
+        try:
+            text = body.decode("utf-8")
+        except UnicodeDecodeError:
+            raise HTTPException(status_code=400, detail="NDJSON body must be UTF-8")
+        items = []
+        for line in text.splitlines():
+            if not line.strip():
+                continue
+            try:
+                items.append(json.loads(line))
+            except ValueError as e:
+                items.append(ValueError(f"Invalid JSON: {e}"))
+        return items
+
+    try:
+        items = json.loads(body)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON")
+    if not isinstance(items, list):
+        raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON")
+    return items
+
+def format_validation_error(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in detail['loc']) or 'row'}: {detail['msg']}"
+        for detail in error.errors()
+    )
+
+def bulk_create(entity: Entity, items: List[Any]) -> BulkCreateResult:
+    """Validate items in batch and insert the valid ones in one transaction"""
+    errors: Dict[int, str] = {}
+    valid = {}
+    for index, item in enumerate(items):
+        if isinstance(item, Exception):
+            errors[index] = str(item)
+            continue
+        try:
+            valid[index] = entity.create_model.model_validate(item)
+        except ValidationError as e:
+            errors[index] = format_validation_error(e)
+
+    # Check foreign keys and unique columns with one query each instead of
+    # letting a single bad row abort the whole insert. These read the
+    # primary: a replica may not have a parent that was just committed.
+    if entity.parent_column and valid:
+        parent_ids = {getattr(model, entity.parent_column) for model in valid.values()}
+        rows, _ = db_manager.execute_query(
+            f"SELECT id FROM {entity.parent_table} WHERE id = ANY(%s)", (list(parent_ids),), primary=True
+        )
+        existing = {row[0] for row in rows}
+        for index, model in list(valid.items()):
+            parent_id = getattr(model, entity.parent_column)
+            if parent_id not in existing:
+                errors[index] = f"{entity.parent_column}: {parent_id} does not exist"
+                del valid[index]
+
+    for column in entity.unique_columns:
+        seen = {}
+        for index, model in list(valid.items()):
+            value = getattr(model, column)
+            if value in seen:
+                errors[index] = f"{column}: duplicates row {seen[value]}"
+                del valid[index]
+            else:
+                seen[value] = index
+        if seen:
+            rows, _ = db_manager.execute_query(
+                f"SELECT {column} FROM {entity.table} WHERE {column} = ANY(%s)", (list(seen),), primary=True
+            )
+            for (value,) in rows:
+                index = seen[value]
+                errors[index] = f"{column}: {value!r} already exists"
+                del valid[index]
+
+    ids: List[Any] = [None] * len(items)
+    if valid:
+        columns = entity.insert_columns
+        indexes = list(valid)
+        values = [tuple(getattr(valid[index], column) for column in columns) for index in indexes]
+        try:
+            returned = db_manager.execute_values(
+                f"INSERT INTO {entity.table} ({', '.join(columns)}) VALUES %s RETURNING id", values
+            )
+        except psycopg2.IntegrityError as e:
+            # A concurrent write invalidated the pre-checks; nothing was inserted
+            raise HTTPException(status_code=409, detail=f"Bulk insert rolled back: {e.diag.message_primary}")
+        for index, (row_id,) in zip(indexes, returned):
+            ids[index] = row_id
+        invalidate_rows(entity, [{"id": ids[index], **valid[index].model_dump()} for index in indexes])
+
+    return BulkCreateResult(
+        created=len(valid),
+        ids=ids,
+        errors=[BulkRowError(index=index, detail=detail) for index, detail in sorted(errors.items())]
+    )
+
+@router.post("/{entity}/bulk", response_model=BulkCreateResult)
+async def bulk_create_entities(entity: str, request: Request):
+    """Create many rows of an entity from a JSON array or NDJSON body.
+
+    Invalid rows are reported by index and skipped; the valid rows are
+    inserted together in a single transaction.
+    """
+    config = get_entity(entity)
+    items = parse_bulk_body(await request.body(), request.headers.get("content-type", ""))
+    if len(items) > MAX_BULK_ROWS:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BULK_ROWS} rows per bulk request")
+    return await run_in_threadpool(bulk_create, config, items)
@@ -1,63 +1,71 @@
-from fastapi import APIRouter, HTTPException
-from typing import List
-from models import Call, CallCreate, CallUpdate, MessageResponse
-from database import db_manager
+from typing import List, Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, Request
+from starlette.concurrency import run_in_threadpool
+from models import Call, CallCreate, CallUpdate, LookupResult, MessageResponse, Page
+from async_database import async_db_manager
+from cache import delete_cascading, entity_key, fetch_cached_row, invalidate_rows
+from entities import ENTITIES, fields_query
+from lookup import lookup_ids, lookup_response
+from pagination import PageParams, page_response
+from responses import conditional_response
 
 router = APIRouter(prefix="/calls", tags=["calls"])
 
-@router.get("/", response_model=List[Call])
-def get_calls():
-    """Get all calls"""
-    rows, cur = db_manager.execute_query("SELECT * FROM calls ORDER BY created_at DESC")
-    
-    calls = []
-    for row in rows:
-        call = db_manager.row_to_dict(row, cur)
-        calls.append(Call(**call))
-    return calls
+@router.get("/", response_model=Union[Page[Call], LookupResult[Call]])
+async def get_calls(
+    page: PageParams = Depends(),
+    ids: Optional[List[int]] = Depends(lookup_ids),
+    fields: Optional[str] = Depends(fields_query),
+):
+    """Get a page of calls, newest first, or the calls with the given ids"""
+    if ids is not None:
+        return await lookup_response(ENTITIES["calls"], ids, fields)
+    return await page_response(ENTITIES["calls"], page, fields=fields)
 
 @router.get("/{call_id}", response_model=Call)
-def get_call(call_id: int):
+async def get_call(call_id: int, request: Request, fields: Optional[str] = Depends(fields_query)):
     """Get a specific call by ID"""
-    row, cur = db_manager.execute_single("SELECT * FROM calls WHERE id = %s", (call_id,))
+    call = await fetch_cached_row(entity_key("calls", call_id), ENTITIES["calls"], "id", call_id, fields)
     
-    if row is None:
+    if call is None:
         raise HTTPException(status_code=404, detail="Call not found")
     
-    call = db_manager.row_to_dict(row, cur)
-    return Call(**call)
+    return conditional_response(request, call.row, call.etag)
 
 @router.post("/", response_model=Call)
-def create_call(call: CallCreate):
+async def create_call(call: CallCreate):
     """Create a new call"""
-    row, cur = db_manager.execute_insert(
+    row, cur = await async_db_manager.execute_insert(
         "INSERT INTO calls (contact_id, call_type, duration, outcome) VALUES (%s, %s, %s, %s) RETURNING *",
         (call.contact_id, call.call_type, call.duration, call.outcome)
     )
     
-    created_call = db_manager.row_to_dict(row, cur)
+    created_call = async_db_manager.row_to_dict(row, cur)
+    invalidate_rows(ENTITIES["calls"], [created_call])
     return Call(**created_call)
 
 @router.put("/{call_id}", response_model=Call)
-def update_call(call_id: int, call: CallUpdate):
+async def update_call(call_id: int, call: CallUpdate):
     """Update an existing call"""
-    row, cur = db_manager.execute_update(
-        "UPDATE calls SET contact_id = %s, call_type = %s, duration = %s, outcome = %s WHERE id = %s RETURNING *",
+    row, cur = await async_db_manager.execute_update(
+        "UPDATE calls SET contact_id = %s, call_type = %s, duration = %s, outcome = %s FROM calls AS previous "
+        "WHERE calls.id = %s AND previous.id = calls.id RETURNING calls.*, previous.contact_id AS previous_contact_id",
         (call.contact_id, call.call_type, call.duration, call.outcome, call_id)
     )
     
     if row is None:
         raise HTTPException(status_code=404, detail="Call not found")
     
-    updated_call = db_manager.row_to_dict(row, cur)
+    updated_call = async_db_manager.row_to_dict(row, cur)
+    invalidate_rows(ENTITIES["calls"], [updated_call], [updated_call.pop("previous_contact_id")])
     return Call(**updated_call)
 
 @router.delete("/{call_id}", response_model=MessageResponse)
-def delete_call(call_id: int):
+async def delete_call(call_id: int):
     """Delete a call"""
-    row_count = db_manager.execute_delete("DELETE FROM calls WHERE id = %s", (call_id,))
+    deleted = await run_in_threadpool(delete_cascading, ENTITIES["calls"], call_id)
     
-    if row_count == 0:
+    if not deleted:
         raise HTTPException(status_code=404, detail="Call not found")
     
     return MessageResponse(message="Call deleted successfully") 
\ No newline at end of file
@@ -1,63 +1,71 @@
-from fastapi import APIRouter, HTTPException
-from typing import List
-from models import Contact, ContactCreate, ContactUpdate, MessageResponse
-from database import db_manager
+from typing import List, Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, Request
+from starlette.concurrency import run_in_threadpool
+from models import Contact, ContactCreate, ContactUpdate, LookupResult, MessageResponse, Page
+from async_database import async_db_manager
+from cache import delete_cascading, entity_key, fetch_cached_row, invalidate_rows
+from entities import ENTITIES, fields_query
+from lookup import lookup_ids, lookup_response
+from pagination import PageParams, page_response
+from responses import conditional_response
 
 router = APIRouter(prefix="/contacts", tags=["contacts"])
 
-@router.get("/", response_model=List[Contact])
-def get_contacts():
-    """Get all contacts"""
-    rows, cur = db_manager.execute_query("SELECT * FROM contacts ORDER BY created_at DESC")
-    
-    contacts = []
-    for row in rows:
-        contact = db_manager.row_to_dict(row, cur)
-        contacts.append(Contact(**contact))
-    return contacts
+@router.get("/", response_model=Union[Page[Contact], LookupResult[Contact]])
+async def get_contacts(
+    page: PageParams = Depends(),
+    ids: Optional[List[int]] = Depends(lookup_ids),
+    fields: Optional[str] = Depends(fields_query),
+):
+    """Get a page of contacts, newest first, or the contacts with the given ids"""
+    if ids is not None:
+        return await lookup_response(ENTITIES["contacts"], ids, fields)
+    return await page_response(ENTITIES["contacts"], page, fields=fields)
 
 @router.get("/{contact_id}", response_model=Contact)
-def get_contact(contact_id: int):
+async def get_contact(contact_id: int, request: Request, fields: Optional[str] = Depends(fields_query)):
     """Get a specific contact by ID"""
-    row, cur = db_manager.execute_single("SELECT * FROM contacts WHERE id = %s", (contact_id,))
+    contact = await fetch_cached_row(entity_key("contacts", contact_id), ENTITIES["contacts"], "id", contact_id, fields)
     
-    if row is None:
+    if contact is None:
         raise HTTPException(status_code=404, detail="Contact not found")
     
-    contact = db_manager.row_to_dict(row, cur)
-    return Contact(**contact)
+    return conditional_response(request, contact.row, contact.etag)
 
 @router.post("/", response_model=Contact)
-def create_contact(contact: ContactCreate):
+async def create_contact(contact: ContactCreate):
     """Create a new contact"""
-    row, cur = db_manager.execute_insert(
+    row, cur = await async_db_manager.execute_insert(
         "INSERT INTO contacts (account_id, first_name, last_name, email, phone, title, role) VALUES (%s, %s, %s, %s, %s, %s, %s) RETURNING *",
         (contact.account_id, contact.first_name, contact.last_name, contact.email, contact.phone, contact.title, contact.role)
     )
     
-    created_contact = db_manager.row_to_dict(row, cur)
+    created_contact = async_db_manager.row_to_dict(row, cur)
+    invalidate_rows(ENTITIES["contacts"], [created_contact])
     return Contact(**created_contact)
 
 @router.put("/{contact_id}", response_model=Contact)
-def update_contact(contact_id: int, contact: ContactUpdate):
+async def update_contact(contact_id: int, contact: ContactUpdate):
     """Update an existing contact"""
-    row, cur = db_manager.execute_update(
-        "UPDATE contacts SET account_id = %s, first_name = %s, last_name = %s, email = %s, phone = %s, title = %s, role = %s WHERE id = %s RETURNING *",
+    row, cur = await async_db_manager.execute_update(
+        "UPDATE contacts SET account_id = %s, first_name = %s, last_name = %s, email = %s, phone = %s, title = %s, role = %s FROM contacts AS previous "
+        "WHERE contacts.id = %s AND previous.id = contacts.id RETURNING contacts.*, previous.account_id AS previous_account_id",
         (contact.account_id, contact.first_name, contact.last_name, contact.email, contact.phone, contact.title, contact.role, contact_id)
     )
     
     if row is None:
         raise HTTPException(status_code=404, detail="Contact not found")
     
-    updated_contact = db_manager.row_to_dict(row, cur)
+    updated_contact = async_db_manager.row_to_dict(row, cur)
+    invalidate_rows(ENTITIES["contacts"], [updated_contact], [updated_contact.pop("previous_account_id")])
     return Contact(**updated_contact)
 
 @router.delete("/{contact_id}", response_model=MessageResponse)
-def delete_contact(contact_id: int):
+async def delete_contact(contact_id: int):
     """Delete a contact"""
-    row_count = db_manager.execute_delete("DELETE FROM contacts WHERE id = %s", (contact_id,))
+    deleted = await run_in_threadpool(delete_cascading, ENTITIES["contacts"], contact_id)
     
-    if row_count == 0:
+    if not deleted:
         raise HTTPException(status_code=404, detail="Contact not found")
     
     return MessageResponse(message="Contact deleted successfully") 
\ No newline at end of file
@@ -1,63 +1,71 @@
-from fastapi import APIRouter, HTTPException
-from typing import List
-from models import Email, EmailCreate, EmailUpdate, MessageResponse
-from database import db_manager
+from typing import List, Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, Request
+from starlette.concurrency import run_in_threadpool
+from models import Email, EmailCreate, EmailUpdate, LookupResult, MessageResponse, Page
+from async_database import async_db_manager
+from cache import delete_cascading, entity_key, fetch_cached_row, invalidate_rows
+from entities import ENTITIES, fields_query
+from lookup import lookup_ids, lookup_response
+from pagination import PageParams, page_response
+from responses import conditional_response
 
 router = APIRouter(prefix="/emails", tags=["emails"])
 
-@router.get("/", response_model=List[Email])
-def get_emails():
-    """Get all emails"""
-    rows, cur = db_manager.execute_query("SELECT * FROM emails ORDER BY sent_at DESC")
-    
-    emails = []
-    for row in rows:
-        email = db_manager.row_to_dict(row, cur)
-        emails.append(Email(**email))
-    return emails
+@router.get("/", response_model=Union[Page[Email], LookupResult[Email]])
+async def get_emails(
+    page: PageParams = Depends(),
+    ids: Optional[List[int]] = Depends(lookup_ids),
+    fields: Optional[str] = Depends(fields_query),
+):
+    """Get a page of emails, newest first, or the emails with the given ids"""
+    if ids is not None:
+        return await lookup_response(ENTITIES["emails"], ids, fields)
+    return await page_response(ENTITIES["emails"], page, fields=fields)
 
 @router.get("/{email_id}", response_model=Email)
-def get_email(email_id: int):
+async def get_email(email_id: int, request: Request, fields: Optional[str] = Depends(fields_query)):
     """Get a specific email by ID"""
-    row, cur = db_manager.execute_single("SELECT * FROM emails WHERE id = %s", (email_id,))
+    email = await fetch_cached_row(entity_key("emails", email_id), ENTITIES["emails"], "id", email_id, fields)
     
-    if row is None:
+    if email is None:
         raise HTTPException(status_code=404, detail="Email not found")
     
-    email = db_manager.row_to_dict(row, cur)
-    return Email(**email)
+    return conditional_response(request, email.row, email.etag)
 
 @router.post("/", response_model=Email)
-def create_email(email: EmailCreate):
+async def create_email(email: EmailCreate):
     """Create a new email"""
-    row, cur = db_manager.execute_insert(
+    row, cur = await async_db_manager.execute_insert(
         "INSERT INTO emails (contact_id, subject, body) VALUES (%s, %s, %s) RETURNING *",
         (email.contact_id, email.subject, email.body)
     )
     
-    created_email = db_manager.row_to_dict(row, cur)
+    created_email = async_db_manager.row_to_dict(row, cur)
+    invalidate_rows(ENTITIES["emails"], [created_email])
     return Email(**created_email)
 
 @router.put("/{email_id}", response_model=Email)
-def update_email(email_id: int, email: EmailUpdate):
+async def update_email(email_id: int, email: EmailUpdate):
     """Update an existing email"""
-    row, cur = db_manager.execute_update(
-        "UPDATE emails SET contact_id = %s, subject = %s, body = %s WHERE id = %s RETURNING *",
+    row, cur = await async_db_manager.execute_update(
+        "UPDATE emails SET contact_id = %s, subject = %s, body = %s FROM emails AS previous "
+        "WHERE emails.id = %s AND previous.id = emails.id RETURNING emails.*, previous.contact_id AS previous_contact_id",
         (email.contact_id, email.subject, email.body, email_id)
     )
     
     if row is None:
         raise HTTPException(status_code=404, detail="Email not found")
     
-    updated_email = db_manager.row_to_dict(row, cur)
+    updated_email = async_db_manager.row_to_dict(row, cur)
+    invalidate_rows(ENTITIES["emails"], [updated_email], [updated_email.pop("previous_contact_id")])
     return Email(**updated_email)
 
 @router.delete("/{email_id}", response_model=MessageResponse)
-def delete_email(email_id: int):
+async def delete_email(email_id: int):
     """Delete an email"""
-    row_count = db_manager.execute_delete("DELETE FROM emails WHERE id = %s", (email_id,))
+    deleted = await run_in_threadpool(delete_cascading, ENTITIES["emails"], email_id)
     
-    if row_count == 0:
+    if not deleted:
         raise HTTPException(status_code=404, detail="Email not found")
     
     return MessageResponse(message="Email deleted successfully") 
\ No newline at end of file
@@ -0,0 +1,84 @@
+import csv
+import io
+from datetime import date, datetime
+from enum import Enum
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from database import db_manager
+from entities import fields_query, get_entity, select_columns
+from responses import dumps
+
+router = APIRouter(prefix="/export", tags=["export"])
+
+# Rows fetched per server-side cursor round trip, and rows per response chunk
+EXPORT_BATCH_SIZE = 2000
+EXPORT_CHUNK_ROWS = 500
+
+class ExportFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+def _ndjson_chunks(records):
+    lines = []
+    for record in records:
+        lines.append(dumps(record))
+        if len(lines) >= EXPORT_CHUNK_ROWS:
+            yield b"\n".join(lines) + b"\n"
+            lines = []
+    if lines:
+        yield b"\n".join(lines) + b"\n"
+
+def _csv_chunks(records):
+    buffer = io.StringIO()
+    writer = None
+    pending = 0
+    for record in records:
+        if writer is None:
+            writer = csv.DictWriter(buffer, fieldnames=list(record))
+            writer.writeheader()
+        writer.writerow({
+            key: value.isoformat() if isinstance(value, (datetime, date)) else value
+            for key, value in record.items()
+        })
+        pending += 1
+        if pending >= EXPORT_CHUNK_ROWS:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    if buffer.tell():
+        yield buffer.getvalue()
+
+@router.get("/{entity}")
+def export_entity(
+    entity: str,
+    format: ExportFormat = ExportFormat.ndjson,
+    since: Optional[datetime] = Query(None, description="Only export rows created (or sent) at or after this time"),
+    fields: Optional[str] = Depends(fields_query),
+):
+    """Stream every row of an entity as NDJSON or CSV, oldest first"""
+    config = get_entity(entity)
+
+    # Streamed transcripts are exported with their leading text, truncated
+    # and content_url, like other reads; the full text is at content_url
+    query = f"SELECT {config.select_sql(select_columns(config, fields))} FROM {config.table}"
+    params = ()
+    if since is not None:
+        query += f" WHERE {config.sort_column} >= %s"
+        params = (since,)
+    query += f" ORDER BY {config.sort_column}, id"
+
+    records = db_manager.iter_query(query, params, batch_size=EXPORT_BATCH_SIZE)
+    if format == ExportFormat.csv:
+        body, media_type = _csv_chunks(records), "text/csv"
+    else:
+        body, media_type = _ndjson_chunks(records), "application/x-ndjson"
+
+    filename = f"{config.table}.{format.value}"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
@@ -0,0 +1,16 @@
+from typing import Optional
+from fastapi import APIRouter, Depends
+from models import LookupRequest, LookupResult
+from entities import fields_query, get_entity
+from lookup import lookup_response, normalize_ids
+
+router = APIRouter(tags=["lookup"])
+
+@router.post("/{entity}/lookup", response_model=LookupResult)
+async def lookup_entities(entity: str, lookup: LookupRequest, fields: Optional[str] = Depends(fields_query)):
+    """Fetch many rows of an entity by id in one query, in request order.
+
+    Ids that do not exist are listed in ``missing``.
+    """
+    config = get_entity(entity)
+    return await lookup_response(config, normalize_ids(lookup.ids), fields)
@@ -1,62 +1,52 @@
-from fastapi import APIRouter, HTTPException
-from typing import List
-from models import Contact, Email, Call, CallTranscript
-from database import db_manager
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Request
+from models import Contact, Email, Call, CallTranscript, Page
+from cache import entity_cache, fetch_cached_row, list_tag
+from entities import ENTITIES, fields_query
+from pagination import PageParams, page_response
+from responses import conditional_response
 
 router = APIRouter(tags=["relationships"])
 
-@router.get("/accounts/{account_id}/contacts", response_model=List[Contact])
-def get_account_contacts(account_id: int):
-    """Get all contacts for a specific account"""
-    rows, cur = db_manager.execute_query(
-        "SELECT * FROM contacts WHERE account_id = %s ORDER BY created_at DESC", 
-        (account_id,)
+@router.get("/accounts/{account_id}/contacts", response_model=Page[Contact])
+async def get_account_contacts(account_id: int, page: PageParams = Depends(), fields: Optional[str] = Depends(fields_query)):
+    """Get a page of contacts for a specific account"""
+    return await page_response(
+        ENTITIES["contacts"], page,
+        where="account_id = %s", params=(account_id,),
+        cache_tag=list_tag("contacts", "account_id", account_id),
+        fields=fields
     )
-    
-    contacts = []
-    for row in rows:
-        contact = db_manager.row_to_dict(row, cur)
-        contacts.append(Contact(**contact))
-    return contacts
 
-@router.get("/contacts/{contact_id}/emails", response_model=List[Email])
-def get_contact_emails(contact_id: int):
-    """Get all emails for a specific contact"""
-    rows, cur = db_manager.execute_query(
-        "SELECT * FROM emails WHERE contact_id = %s ORDER BY sent_at DESC", 
-        (contact_id,)
+@router.get("/contacts/{contact_id}/emails", response_model=Page[Email])
+async def get_contact_emails(contact_id: int, page: PageParams = Depends(), fields: Optional[str] = Depends(fields_query)):
+    """Get a page of emails for a specific contact"""
+    return await page_response(
+        ENTITIES["emails"], page,
+        where="contact_id = %s", params=(contact_id,),
+        cache_tag=list_tag("emails", "contact_id", contact_id),
+        fields=fields
     )
-    
-    emails = []
-    for row in rows:
-        email = db_manager.row_to_dict(row, cur)
-        emails.append(Email(**email))
-    return emails
 
-@router.get("/contacts/{contact_id}/calls", response_model=List[Call])
-def get_contact_calls(contact_id: int):
-    """Get all calls for a specific contact"""
-    rows, cur = db_manager.execute_query(
-        "SELECT * FROM calls WHERE contact_id = %s ORDER BY created_at DESC", 
-        (contact_id,)
+@router.get("/contacts/{contact_id}/calls", response_model=Page[Call])
+async def get_contact_calls(contact_id: int, page: PageParams = Depends(), fields: Optional[str] = Depends(fields_query)):
+    """Get a page of calls for a specific contact"""
+    return await page_response(
+        ENTITIES["calls"], page,
+        where="contact_id = %s", params=(contact_id,),
+        cache_tag=list_tag("calls", "contact_id", contact_id),
+        fields=fields
     )
-    
-    calls = []
-    for row in rows:
-        call = db_manager.row_to_dict(row, cur)
-        calls.append(Call(**call))
-    return calls
 
 @router.get("/calls/{call_id}/transcript", response_model=CallTranscript)
-def get_call_transcript_by_call(call_id: int):
+async def get_call_transcript_by_call(call_id: int, request: Request, fields: Optional[str] = Depends(fields_query)):
     """Get the transcript for a specific call"""
-    row, cur = db_manager.execute_single(
-        "SELECT * FROM call_transcripts WHERE call_id = %s", 
-        (call_id,)
+    transcript = await fetch_cached_row(
+        entity_cache.page_key(list_tag("call_transcripts", "call_id", call_id)),
+        ENTITIES["call-transcripts"], "call_id", call_id, fields
     )
     
-    if row is None:
+    if transcript is None:
         raise HTTPException(status_code=404, detail="Call transcript not found")
     
-    transcript = db_manager.row_to_dict(row, cur)
-    return CallTranscript(**transcript) 
\ No newline at end of file
+    return conditional_response(request, transcript.row, transcript.etag) 
\ No newline at end of file
@@ -0,0 +1,113 @@
+from enum import Enum
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import APIRouter, Depends, Query
+from models import Page, SearchHit
+from async_database import async_db_manager
+from pagination import PageParams, decode_cursor, encode_cursor
+from responses import FastJSONResponse
+
+router = APIRouter(tags=["search"])
+
+# Text search configuration used by the search_vector columns (migration 0003)
+SEARCH_CONFIG = "english"
+HEADLINE_OPTIONS = "StartSel=<mark>, StopSel=</mark>, MaxWords=35, MinWords=15, MaxFragments=2"
+
+class SearchKind(str, Enum):
+    email = "email"
+    transcript = "transcript"
+
+# Per hit kind: the matching rows as (kind, id, contact_id, occurred_at, rank).
+# Only search_vector is read here, so bodies are never detoasted for ranking.
+SEARCH_BRANCHES = {
+    SearchKind.email: """
+        SELECT 'email' AS kind, e.id, e.contact_id, e.sent_at AS occurred_at,
+               ts_rank_cd(e.search_vector, q.query)::float8 AS rank
+        FROM emails e, q
+        WHERE e.search_vector @@ q.query {filter}""",
+    SearchKind.transcript: """
+        SELECT 'transcript' AS kind, t.id, ca.contact_id, t.created_at AS occurred_at,
+               ts_rank_cd(t.search_vector, q.query)::float8 AS rank
+        FROM call_transcripts t JOIN calls ca ON ca.id = t.call_id, q
+        WHERE t.search_vector @@ q.query {filter}""",
+}
+
+def search_query(
+    text: str,
+    limit: int,
+    cursor: Optional[str] = None,
+    kinds: Optional[List[SearchKind]] = None,
+    account_id: Optional[int] = None,
+    contact_id: Optional[int] = None,
+) -> Tuple[str, Dict[str, Any]]:
+    """Build the ranked search query.
+
+    Hits are ordered by ``(rank, occurred_at, kind, id)`` descending. Only
+    the page's hits are joined to their contact and account and run through
+    ``ts_headline``, which is the expensive part.
+    """
+    params = {"text": text, "config": SEARCH_CONFIG, "headline": HEADLINE_OPTIONS, "limit": limit + 1}
+    contact_filter = ""
+    if contact_id is not None:
+        contact_filter += " AND {contact} = %(contact_id)s"
+        params["contact_id"] = contact_id
+    if account_id is not None:
+        contact_filter += " AND {contact} IN (SELECT id FROM contacts WHERE account_id = %(account_id)s)"
+        params["account_id"] = account_id
+
+    branches = []
+    for kind in dict.fromkeys(kinds or SearchKind):
+        contact = "e.contact_id" if kind == SearchKind.email else "ca.contact_id"
+        branches.append(SEARCH_BRANCHES[kind].format(filter=contact_filter.format(contact=contact)))
+
+    position = ""
+    if cursor is not None:
+        occurred_at, row_id, kind, rank = decode_cursor(cursor, tiebreakers=2)
+        position = "WHERE (rank, occurred_at, kind, id) < (%(rank)s, %(occurred_at)s, %(kind)s, %(row_id)s)"
+        params.update(rank=float(rank), occurred_at=occurred_at, kind=str(kind), row_id=row_id)
+
+    query = f"""
+        WITH q AS (SELECT websearch_to_tsquery(%(config)s::regconfig, %(text)s) AS query),
+        hits AS ({" UNION ALL ".join(branches)}),
+        page AS (
+            SELECT * FROM hits {position}
+            ORDER BY rank DESC, occurred_at DESC, kind DESC, id DESC
+            LIMIT %(limit)s
+        )
+        SELECT page.kind, page.id, page.rank, page.occurred_at,
+               CASE WHEN page.kind = 'email'
+                    THEN ts_headline(%(config)s::regconfig, e.subject, q.query, 'HighlightAll=true, StartSel=<mark>, StopSel=</mark>')
+                    ELSE ca.call_type END AS title,
+               ts_headline(%(config)s::regconfig, COALESCE(e.body, t.transcript, ''), q.query, %(headline)s) AS highlight,
+               t.call_id,
+               c.id AS contact_id, c.first_name || ' ' || c.last_name AS contact_name,
+               a.id AS account_id, a.name AS account_name
+        FROM page
+        CROSS JOIN q
+        LEFT JOIN emails e ON page.kind = 'email' AND e.id = page.id
+        LEFT JOIN call_transcripts t ON page.kind = 'transcript' AND t.id = page.id
+        LEFT JOIN calls ca ON ca.id = t.call_id
+        JOIN contacts c ON c.id = page.contact_id
+        LEFT JOIN accounts a ON a.id = c.account_id
+        ORDER BY page.rank DESC, page.occurred_at DESC, page.kind DESC, page.id DESC
+    """
+    return query, params
+
+@router.get("/search", response_model=Page[SearchHit])
+async def search(
+    q: str = Query(..., min_length=1, description="Search terms; supports \"quoted phrases\", OR and -exclusions"),
+    page: PageParams = Depends(),
+    kinds: Optional[List[SearchKind]] = Query(None, description="Only search these kinds"),
+    account_id: Optional[int] = Query(None, description="Only hits for this account's contacts"),
+    contact_id: Optional[int] = Query(None, description="Only hits for this contact"),
+):
+    """Search email subjects/bodies and call transcripts, best matches first"""
+    query, params = search_query(q, page.limit, page.cursor, kinds, account_id, contact_id)
+    rows, cur = await async_db_manager.execute_query(query, params)
+
+    records = async_db_manager.rows_to_dicts(rows[:page.limit], cur)
+    next_cursor = None
+    if len(rows) > page.limit:
+        last = records[-1]
+        next_cursor = encode_cursor(last["occurred_at"], last["id"], last["kind"], last["rank"])
+    return FastJSONResponse({"items": records, "next_cursor": next_cursor})
@@ -0,0 +1,76 @@
+import asyncio
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+
+from change_feed import CHANGE_FEED_KEEPALIVE_SECONDS, CLOSED, RESET, change_feed, format_event, format_reset
+from entities import ENTITIES
+
+router = APIRouter(tags=["stream"])
+
+# Reconnect delay suggested to EventSource clients
+RETRY_MILLISECONDS = 2000
+
+def _event_id(value: Optional[str]) -> Optional[int]:
+    if value is None or not value.strip():
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        # Not an id we issued: the client can't be resumed
+        return -1
+
+async def _messages(subscription):
+    try:
+        yield f"retry: {RETRY_MILLISECONDS}\n\n"
+        if not subscription.resumed:
+            yield format_reset("last-event-id not in the event log")
+        for event in subscription.backlog:
+            yield format_event(event)
+        while True:
+            try:
+                item = await asyncio.wait_for(subscription.queue.get(), CHANGE_FEED_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            if item is CLOSED:
+                return
+            if item is RESET:
+                yield format_reset("events may have been missed")
+                return
+            yield format_event(item)
+    finally:
+        change_feed.unsubscribe(subscription)
+
+@router.get("/stream")
+async def stream_changes(
+    entities: Optional[str] = Query(None, description="Comma-separated entities to follow (default: all)"),
+    account_id: Optional[int] = Query(None, description="Only changes belonging to this account"),
+    last_event_id: Optional[str] = Query(None, description="Resume after this event (for clients that can't send the header)"),
+    last_event_id_header: Optional[str] = Header(None, alias="Last-Event-ID"),
+):
+    """Server-Sent Events stream of inserts, updates and deletes.
+
+    Each ``change`` event carries the entity, operation, row id and account.
+    Reconnecting with ``Last-Event-ID`` replays the events missed meanwhile;
+    a ``reset`` event means they can't be replayed and the client should
+    refetch what it shows.
+    """
+    followed = None
+    if entities is not None:
+        followed = frozenset(name.strip() for name in entities.split(",") if name.strip())
+        unknown = followed - set(ENTITIES)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown entities: {', '.join(sorted(unknown))}")
+
+    resume_from = _event_id(last_event_id_header if last_event_id_header is not None else last_event_id)
+    await run_in_threadpool(change_feed.start)
+    subscription = change_feed.subscribe(followed, account_id, resume_from)
+    return StreamingResponse(
+        _messages(subscription),
+        media_type="text/event-stream",
+        # Keep proxies from buffering or caching the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,110 @@
+from enum import Enum
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from models import Page, TimelineEvent
+from async_database import async_db_manager
+from pagination import PageParams, decode_cursor, encode_cursor
+from responses import conditional_response, make_etag
+
+router = APIRouter(tags=["timeline"])
+
+# Characters of email bodies and transcripts included in each event
+TIMELINE_SNIPPET_CHARS = 200
+
+class EventKind(str, Enum):
+    email = "email"
+    call = "call"
+    transcript = "transcript"
+
+# Per event kind: (sort expression, id expression, SELECT ... FROM ...) over
+# the account's contacts. Every branch returns the TimelineEvent columns in
+# the same order (any branch may come first), with the row version last.
+TIMELINE_BRANCHES = {
+    EventKind.email: ("e.sent_at", "e.id", """
+        SELECT 'email' AS kind, e.id, e.contact_id, c.name AS contact_name, NULL::integer AS call_id,
+               e.sent_at AS occurred_at, e.subject AS summary, left(e.body, %(snippet)s) AS snippet,
+               e.xmin::text AS row_version
+        FROM emails e JOIN account_contacts c ON c.id = e.contact_id"""),
+    EventKind.call: ("ca.created_at", "ca.id", """
+        SELECT 'call' AS kind, ca.id, ca.contact_id, c.name AS contact_name, ca.id AS call_id,
+               ca.created_at AS occurred_at, ca.call_type AS summary, ca.outcome AS snippet,
+               ca.xmin::text AS row_version
+        FROM calls ca JOIN account_contacts c ON c.id = ca.contact_id"""),
+    EventKind.transcript: ("t.created_at", "t.id", """
+        SELECT 'transcript' AS kind, t.id, ca.contact_id, c.name AS contact_name, t.call_id,
+               t.created_at AS occurred_at, ca.call_type AS summary, left(t.transcript, %(snippet)s) AS snippet,
+               t.xmin::text AS row_version
+        FROM call_transcripts t
+        JOIN calls ca ON ca.id = t.call_id
+        JOIN account_contacts c ON c.id = ca.contact_id"""),
+}
+
+def timeline_query(
+    account_id: int,
+    limit: int,
+    cursor: Optional[str] = None,
+    kinds: Optional[List[EventKind]] = None,
+) -> Tuple[str, Dict[str, Any]]:
+    """Build the merged activity query for one account.
+
+    Events are ordered by ``(occurred_at, kind, id)`` descending. The keyset
+    condition and the LIMIT are pushed into every UNION ALL branch, so each
+    branch reads at most one page from its index before the merge.
+    """
+    params = {"account_id": account_id, "snippet": TIMELINE_SNIPPET_CHARS, "limit": limit + 1}
+    position = None
+    if cursor is not None:
+        sort_value, row_id, kind = decode_cursor(cursor, tiebreakers=1)
+        if kind not in {k.value for k in EventKind}:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        position = (sort_value, row_id, kind)
+        params.update(sort_value=sort_value, row_id=row_id)
+
+    branches = []
+    for kind in dict.fromkeys(kinds or EventKind):
+        sort_expr, id_expr, select = TIMELINE_BRANCHES[kind]
+        where = f"{sort_expr} IS NOT NULL"
+        if position is not None:
+            # Same-instant events of a "smaller" kind come after the cursor
+            if kind.value == position[2]:
+                where = f"({sort_expr}, {id_expr}) < (%(sort_value)s, %(row_id)s)"
+            elif kind.value < position[2]:
+                where = f"{sort_expr} <= %(sort_value)s"
+            else:
+                where = f"{sort_expr} < %(sort_value)s"
+        branches.append(
+            f"({select}\n        WHERE {where}\n        ORDER BY {sort_expr} DESC, {id_expr} DESC LIMIT %(limit)s)"
+        )
+
+    query = f"""
+        WITH account_contacts AS (
+            SELECT id, first_name || ' ' || last_name AS name FROM contacts WHERE account_id = %(account_id)s
+        )
+        SELECT * FROM ({" UNION ALL ".join(branches)}) AS timeline
+        ORDER BY occurred_at DESC, kind DESC, id DESC
+        LIMIT %(limit)s
+    """
+    return query, params
+
+@router.get("/accounts/{account_id}/timeline", response_model=Page[TimelineEvent])
+async def get_account_timeline(
+    account_id: int,
+    page: PageParams = Depends(),
+    kinds: Optional[List[EventKind]] = Query(None, description="Only include these event kinds"),
+):
+    """Get a page of an account's emails, calls and transcripts, newest first"""
+    query, params = timeline_query(account_id, page.limit, page.cursor, kinds)
+    rows, cur = await async_db_manager.execute_query(query, params)
+
+    records, versions = async_db_manager.rows_to_versioned_dicts(rows[:page.limit], cur)
+    next_cursor = None
+    if len(rows) > page.limit:
+        last = records[-1]
+        next_cursor = encode_cursor(last["occurred_at"], last["id"], last["kind"])
+    etag = make_etag(
+        "timeline", account_id,
+        [(record["kind"], record["id"], version, record["contact_name"]) for record, version in zip(records, versions)],
+        next_cursor,
+    )
+    return conditional_response(page.request, {"items": records, "next_cursor": next_cursor}, etag)
@@ -1,63 +1,140 @@
-from fastapi import APIRouter, HTTPException
-from typing import List
-from models import CallTranscript, CallTranscriptCreate, CallTranscriptUpdate, MessageResponse
-from database import db_manager
+from typing import List, Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from models import (
+    CallTranscript, CallTranscriptCreate, CallTranscriptSummary, CallTranscriptUpdate, LookupResult, MessageResponse, Page
+)
+from async_database import async_db_manager
+from cache import delete_cascading, entity_key, fetch_cached_row, invalidate_rows
+from entities import ENTITIES, fields_query
+from lookup import lookup_ids, lookup_response
+from pagination import PageParams, page_response
+from responses import accepted_encodings, cache_headers, conditional_response, etag_matches, not_modified
+from transcript_storage import (
+    DEFAULT_COMPRESSION, Compression, content_chunks, iterate_from_thread, open_transcript_content, store_transcript
+)
 
 router = APIRouter(prefix="/call-transcripts", tags=["call-transcripts"])
 
-@router.get("/", response_model=List[CallTranscript])
-def get_call_transcripts():
-    """Get all call transcripts"""
-    rows, cur = db_manager.execute_query("SELECT * FROM call_transcripts ORDER BY created_at DESC")
-    
-    transcripts = []
-    for row in rows:
-        transcript = db_manager.row_to_dict(row, cur)
-        transcripts.append(CallTranscript(**transcript))
-    return transcripts
+@router.get("/", response_model=Union[Page[CallTranscriptSummary], LookupResult[CallTranscript]])
+async def get_call_transcripts(
+    page: PageParams = Depends(),
+    ids: Optional[List[int]] = Depends(lookup_ids),
+    fields: Optional[str] = Depends(fields_query),
+):
+    """Get a page of call transcript previews, newest first, or the call transcripts with the given ids"""
+    if ids is not None:
+        return await lookup_response(ENTITIES["call-transcripts"], ids, fields)
+    return await page_response(ENTITIES["call-transcripts"], page, fields=fields)
 
 @router.get("/{transcript_id}", response_model=CallTranscript)
-def get_call_transcript(transcript_id: int):
+async def get_call_transcript(transcript_id: int, request: Request, fields: Optional[str] = Depends(fields_query)):
     """Get a specific call transcript by ID"""
-    row, cur = db_manager.execute_single("SELECT * FROM call_transcripts WHERE id = %s", (transcript_id,))
+    transcript = await fetch_cached_row(entity_key("call_transcripts", transcript_id), ENTITIES["call-transcripts"], "id", transcript_id, fields)
     
-    if row is None:
+    if transcript is None:
         raise HTTPException(status_code=404, detail="Call transcript not found")
     
-    transcript = db_manager.row_to_dict(row, cur)
-    return CallTranscript(**transcript)
+    return conditional_response(request, transcript.row, transcript.etag)
 
 @router.post("/", response_model=CallTranscript)
-def create_call_transcript(transcript: CallTranscriptCreate):
+async def create_call_transcript(transcript: CallTranscriptCreate):
     """Create a new call transcript"""
-    row, cur = db_manager.execute_insert(
+    row, cur = await async_db_manager.execute_insert(
         "INSERT INTO call_transcripts (call_id, transcript) VALUES (%s, %s) RETURNING *",
         (transcript.call_id, transcript.transcript)
     )
     
-    created_transcript = db_manager.row_to_dict(row, cur)
+    created_transcript = async_db_manager.row_to_dict(row, cur)
+    invalidate_rows(ENTITIES["call-transcripts"], [created_transcript])
     return CallTranscript(**created_transcript)
 
 @router.put("/{transcript_id}", response_model=CallTranscript)
-def update_call_transcript(transcript_id: int, transcript: CallTranscriptUpdate):
+async def update_call_transcript(transcript_id: int, transcript: CallTranscriptUpdate):
     """Update an existing call transcript"""
-    row, cur = db_manager.execute_update(
-        "UPDATE call_transcripts SET call_id = %s, transcript = %s WHERE id = %s RETURNING *",
-        (transcript.call_id, transcript.transcript, transcript_id)
+    # The new text is stored inline, replacing any streamed body
+    row, cur = await async_db_manager.execute_update(
+        "WITH dropped AS (DELETE FROM call_transcript_chunks WHERE transcript_id = %s) "
+        "UPDATE call_transcripts SET call_id = %s, transcript = %s, compression = NULL FROM call_transcripts AS previous "
+        "WHERE call_transcripts.id = %s AND previous.id = call_transcripts.id RETURNING call_transcripts.*, previous.call_id AS previous_call_id",
+        (transcript_id, transcript.call_id, transcript.transcript, transcript_id)
     )
     
     if row is None:
         raise HTTPException(status_code=404, detail="Call transcript not found")
     
-    updated_transcript = db_manager.row_to_dict(row, cur)
+    updated_transcript = async_db_manager.row_to_dict(row, cur)
+    invalidate_rows(ENTITIES["call-transcripts"], [updated_transcript], [updated_transcript.pop("previous_call_id")])
     return CallTranscript(**updated_transcript)
 
 @router.delete("/{transcript_id}", response_model=MessageResponse)
-def delete_call_transcript(transcript_id: int):
+async def delete_call_transcript(transcript_id: int):
     """Delete a call transcript"""
-    row_count = db_manager.execute_delete("DELETE FROM call_transcripts WHERE id = %s", (transcript_id,))
+    deleted = await run_in_threadpool(delete_cascading, ENTITIES["call-transcripts"], transcript_id)
     
-    if row_count == 0:
+    if not deleted:
         raise HTTPException(status_code=404, detail="Call transcript not found")
     
-    return MessageResponse(message="Call transcript deleted successfully") 
\ No newline at end of file
+    return MessageResponse(message="Call transcript deleted successfully")
+
+@router.post("/upload", response_model=CallTranscript)
+async def upload_call_transcript(
+    request: Request,
+    call_id: int = Query(..., description="Call the transcript belongs to"),
+    compression: Compression = Query(Compression(DEFAULT_COMPRESSION), description="How to store the text at rest"),
+):
+    """Create a call transcript from a streamed UTF-8 text body"""
+    created = await run_in_threadpool(
+        store_transcript, iterate_from_thread(request.stream()), compression, call_id=call_id
+    )
+    invalidate_rows(ENTITIES["call-transcripts"], [created])
+    return CallTranscript(**created)
+
+@router.put("/{transcript_id}/content", response_model=CallTranscript)
+async def replace_call_transcript_content(
+    transcript_id: int,
+    request: Request,
+    compression: Compression = Query(Compression(DEFAULT_COMPRESSION), description="How to store the text at rest"),
+):
+    """Replace a call transcript's text with a streamed UTF-8 text body"""
+    updated = await run_in_threadpool(
+        store_transcript, iterate_from_thread(request.stream()), compression, transcript_id=transcript_id
+    )
+
+    if updated is None:
+        raise HTTPException(status_code=404, detail="Call transcript not found")
+
+    invalidate_rows(ENTITIES["call-transcripts"], [updated])
+    return CallTranscript(**updated)
+
+@router.get("/{transcript_id}/content", response_class=StreamingResponse)
+async def download_call_transcript(transcript_id: int, request: Request):
+    """Stream a call transcript's full text.
+
+    Compressed transcripts are sent as stored, with Content-Encoding, to
+    clients that accept that encoding.
+    """
+    opened = await run_in_threadpool(open_transcript_content, transcript_id)
+
+    if opened is None:
+        raise HTTPException(status_code=404, detail="Call transcript not found")
+
+    first, rows = opened
+    encoding = first["compression"]
+    passthrough = encoding not in (None, Compression.none.value) and encoding in accepted_encodings(request)
+    etag = f'"{first["checksum"]}-{encoding}"' if passthrough else f'"{first["checksum"]}"'
+    if etag_matches(request, etag):
+        await run_in_threadpool(rows.close)
+        return not_modified(etag)
+
+    headers = {
+        **cache_headers(etag),
+        "Content-Length": str(first["stored_length"] if passthrough else first["byte_length"]),
+        "Vary": "Accept-Encoding",
+    }
+    if passthrough:
+        headers["Content-Encoding"] = encoding
+    return StreamingResponse(
+        content_chunks(first, rows, decode=not passthrough), media_type="text/plain; charset=utf-8", headers=headers
+    )
@@ -6,28 +6,32 @@ Test runner script for the CRM API
 import subprocess
 import sys
 import os
+import time
 
 def run_tests():
     """Run the test suite"""
     print("🧪 Running CRM API Test Suite...")
     print("=" * 50)
     
-    # Ensure we're in the parent directory
+    # Run from the backend directory, where pytest.ini and conftest.py live
     os.chdir(os.path.dirname(os.path.abspath(__file__)))
     
-    # Run pytest with coverage on the backend package
+    # Run pytest with coverage on the backend package, spread over one
+    # worker per CPU (TEST_WORKERS=0 runs everything in this process)
     cmd = [
         sys.executable, "-m", "pytest",
-        "backend/tests/",
-        "--cov=backend",
+        "tests/",
+        "-n", os.getenv("TEST_WORKERS", "auto"),
+        "--cov=.",
         "--cov-report=html",
         "--cov-report=term-missing",
         "-v"
     ]
     
+    started = time.perf_counter()
     try:
         result = subprocess.run(cmd, check=True)
-        print("\n✅ All tests passed!")
+        print(f"\n✅ All tests passed in {time.perf_counter() - started:.1f}s!")
         print("📊 Coverage report generated in htmlcov/index.html")
         return result.returncode
     except subprocess.CalledProcessError as e:
@@ -39,12 +43,9 @@ def run_specific_test(test_path):
     print(f"🧪 Running specific test: {test_path}")
     print("=" * 50)
     
+    # Test paths are relative to the backend directory, e.g. tests/test_accounts.py
     os.chdir(os.path.dirname(os.path.abspath(__file__)))
     
-    # Ensure test path is relative to backend if not already
-    if not test_path.startswith("backend/"):
-        test_path = f"backend/{test_path}"
-    
     cmd = [sys.executable, "-m", "pytest", test_path, "-v"]
     
     try:
@@ -55,8 +56,27 @@ def run_specific_test(test_path):
         print(f"\n❌ Test {test_path} failed with return code: {e.returncode}")
         return e.returncode
 
+def run_load_tests(args):
+    """Run the HTTP load test and compare it against the stored baseline"""
+    print("🚦 Running CRM API load test...")
+    print("=" * 50)
+
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+    cmd = [sys.executable, "loadtest.py", *args]
+
+    result = subprocess.run(cmd)
+    if result.returncode == 0:
+        print("\n✅ Load test passed!")
+    else:
+        print(f"\n❌ Load test failed with return code: {result.returncode}")
+    return result.returncode
+
 if __name__ == "__main__":
-    if len(sys.argv) > 1:
+    if len(sys.argv) > 1 and sys.argv[1] == "load":
+        # Run the load test, passing the remaining arguments through
+        sys.exit(run_load_tests(sys.argv[2:]))
+    elif len(sys.argv) > 1:
         # Run specific test
         test_path = sys.argv[1]
         sys.exit(run_specific_test(test_path))
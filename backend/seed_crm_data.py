@@ -1,72 +1,278 @@
+#!/usr/bin/env python3
+"""
+Synthetic CRM data generator for development and load testing.
+
+Rows are generated in parallel worker processes as CSV chunks and streamed
+into Postgres with COPY, so production-sized datasets load in minutes:
+
+    python seed_crm_data.py --size xl --workers 8 --truncate
+    python seed_crm_data.py --accounts 5000 --emails 200000 --skew 2.0 --seed 7
+
+Output is deterministic for a given seed and set of sizes, regardless of
+the number of workers. Connection settings come from database.DB_CONFIG.
+"""
+
+import argparse
+import csv
+import io
+import json
+import multiprocessing
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
 import psycopg2
 from faker import Faker
-import random
 
-DB_CONFIG = dict(
-    host="localhost",
-    port=5432,
-    user="crmuser",
-    password="crmsecret",
-    dbname="crm"
-)
-
-NUM_ACCOUNTS = 10
-NUM_CONTACTS = 30
-NUM_EMAILS = 60
-
-fake = Faker()
-
-conn = psycopg2.connect(**DB_CONFIG)
-cur = conn.cursor()
-
-# Insert accounts
-def seed_accounts():
-    account_ids = []
-    for _ in range(NUM_ACCOUNTS):
-        name = fake.company()
-        industry = fake.job()
-        cur.execute(
-            "INSERT INTO accounts (name, industry) VALUES (%s, %s) RETURNING id;",
-            (name, industry)
-        )
-        account_ids.append(cur.fetchone()[0])
-    return account_ids
-
-# Insert contacts
-def seed_contacts(account_ids):
-    contact_ids = []
-    for _ in range(NUM_CONTACTS):
-        account_id = random.choice(account_ids)
-        first = fake.first_name()
-        last = fake.last_name()
-        email = fake.unique.email()
-        phone = fake.phone_number()
-        cur.execute(
-            "INSERT INTO contacts (account_id, first_name, last_name, email, phone) VALUES (%s, %s, %s, %s, %s) RETURNING id;",
-            (account_id, first, last, email, phone)
-        )
-        contact_ids.append(cur.fetchone()[0])
-    return contact_ids
-
-# Insert emails
-def seed_emails(contact_ids):
-    for _ in range(NUM_EMAILS):
-        contact_id = random.choice(contact_ids)
-        subject = fake.sentence(nb_words=6)
-        body = fake.paragraph(nb_sentences=3)
-        cur.execute(
-            "INSERT INTO emails (contact_id, subject, body) VALUES (%s, %s, %s);",
-            (contact_id, subject, body)
-        )
+from change_feed import CHANNEL
+from database import DB_CONFIG
 
-if __name__ == "__main__":
-    print("Seeding accounts...")
-    account_ids = seed_accounts()
-    print("Seeding contacts...")
-    contact_ids = seed_contacts(account_ids)
-    print("Seeding emails...")
-    seed_emails(contact_ids)
+# Named dataset sizes: (accounts, contacts, emails, calls)
+SIZES = {
+    "small": (10, 30, 60, 40),
+    "medium": (1_000, 5_000, 50_000, 10_000),
+    "large": (10_000, 50_000, 500_000, 100_000),
+    "xl": (100_000, 500_000, 5_000_000, 1_000_000),
+}
+
+TABLE_COLUMNS = {
+    "accounts": ("id", "name", "industry", "plan", "status", "created_at"),
+    "contacts": ("id", "account_id", "first_name", "last_name", "email", "phone", "title", "role", "created_at"),
+    "emails": ("id", "contact_id", "subject", "body", "sent_at"),
+    "calls": ("id", "contact_id", "call_type", "duration", "outcome", "created_at"),
+    "call_transcripts": ("id", "call_id", "transcript", "created_at"),
+}
+
+INDUSTRIES = ["Software", "Healthcare", "Finance", "Retail", "Manufacturing", "Education", "Logistics", "Media"]
+PLANS = ["Free", "Starter", "Pro", "Enterprise"]
+PLAN_WEIGHTS = [40, 30, 20, 10]
+STATUSES = ["Active", "Trial", "Churned", "Paused"]
+STATUS_WEIGHTS = [70, 15, 10, 5]
+ROLES = ["Decision Maker", "Champion", "Influencer", "End User", "Blocker"]
+CALL_TYPES = ["discovery", "demo", "follow-up", "negotiation", "support", "renewal"]
+OUTCOMES = ["Interested", "Not interested", "Follow-up scheduled", "Closed won", "Closed lost", "Voicemail", None]
+
+# Per-worker state built once by _init_worker
+_fake = None
+_sentences = None
+_names = None
+
+def _init_worker(seed: int):
+    """Pre-generate text pools so rows are composed without calling Faker per field"""
+    global _fake, _sentences, _names
+    _fake = Faker()
+    _fake.seed_instance(seed)
+    rng = random.Random(seed)
+    _sentences = [_fake.sentence(nb_words=rng.randint(6, 16)) for _ in range(4000)]
+    _names = {
+        "company": [_fake.company() for _ in range(5000)],
+        "first": [_fake.first_name() for _ in range(2000)],
+        "last": [_fake.last_name() for _ in range(2000)],
+        "job": [_fake.job() for _ in range(1000)],
+        "domain": [_fake.domain_name() for _ in range(500)],
+    }
+
+class Timeline:
+    """Maps row indexes onto creation times so ids grow with time"""
+
+    def __init__(self, end: datetime, days: int):
+        self.end = end
+        self.start = end - timedelta(days=days)
+        self.span = (self.end - self.start).total_seconds()
+
+    def at(self, index: int, total: int) -> datetime:
+        return self.start + timedelta(seconds=self.span * index / max(total, 1))
+
+    def after(self, moment: datetime, rng: random.Random) -> datetime:
+        remaining = max((self.end - moment).total_seconds(), 1.0)
+        return moment + timedelta(seconds=remaining * rng.random())
+
+def skewed_index(rng: random.Random, n: int, skew: float) -> int:
+    """Pick an index in [0, n) where low indexes are favoured as skew grows (1.0 = uniform)"""
+    return min(int(n * rng.random() ** skew), n - 1)
+
+def _paragraph(rng: random.Random, sentences: int) -> str:
+    return " ".join(rng.choice(_sentences) for _ in range(sentences))
+
+def _csv_text(rows) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue()
+
+def generate_chunk(task):
+    """Generate one chunk of rows; returns [(table, csv_text, row_count), ...]"""
+    table, chunk_index, start, count, plan = task
+    rng = random.Random(f"{plan['seed']}:{table}:{chunk_index}")
+    timeline = Timeline(plan["end"], plan["days"])
+    sizes = plan["sizes"]
+    skew = plan["skew"]
+    rows = []
+
+    if table == "accounts":
+        for i in range(start, start + count):
+            rows.append((
+                plan["base"]["accounts"] + i + 1,
+                rng.choice(_names["company"]),
+                rng.choice(INDUSTRIES),
+                rng.choices(PLANS, PLAN_WEIGHTS)[0],
+                rng.choices(STATUSES, STATUS_WEIGHTS)[0],
+                timeline.at(i, sizes["accounts"]),
+            ))
+        return [("accounts", _csv_text(rows), len(rows))]
+
+    if table == "contacts":
+        for i in range(start, start + count):
+            account = skewed_index(rng, sizes["accounts"], skew)
+            first, last = rng.choice(_names["first"]), rng.choice(_names["last"])
+            contact_id = plan["base"]["contacts"] + i + 1
+            rows.append((
+                contact_id,
+                plan["base"]["accounts"] + account + 1,
+                first,
+                last,
+                f"{first}.{last}.{contact_id}@{rng.choice(_names['domain'])}".lower(),
+                f"555-{rng.randint(0, 9999):04d}",
+                rng.choice(_names["job"])[:100],
+                rng.choice(ROLES),
+                timeline.after(timeline.at(account, sizes["accounts"]), rng),
+            ))
+        return [("contacts", _csv_text(rows), len(rows))]
+
+    if table == "emails":
+        for i in range(start, start + count):
+            contact = skewed_index(rng, sizes["contacts"], skew)
+            rows.append((
+                plan["base"]["emails"] + i + 1,
+                plan["base"]["contacts"] + contact + 1,
+                rng.choice(_sentences)[:255],
+                _paragraph(rng, rng.randint(2, 12)),
+                timeline.after(timeline.at(contact, sizes["contacts"]), rng),
+            ))
+        return [("emails", _csv_text(rows), len(rows))]
+
+    # Calls, each with a transcript for a fraction of them
+    transcripts = []
+    for i in range(start, start + count):
+        contact = skewed_index(rng, sizes["contacts"], skew)
+        call_id = plan["base"]["calls"] + i + 1
+        created_at = timeline.after(timeline.at(contact, sizes["contacts"]), rng)
+        duration = max(1, int(rng.lognormvariate(3.0, 0.8)))
+        rows.append((
+            call_id,
+            plan["base"]["contacts"] + contact + 1,
+            rng.choice(CALL_TYPES),
+            duration,
+            rng.choice(OUTCOMES),
+            created_at,
+        ))
+        if rng.random() < plan["transcript_ratio"]:
+            transcripts.append((
+                plan["base"]["call_transcripts"] + i + 1,
+                call_id,
+                _paragraph(rng, min(400, duration * rng.randint(2, 5))),
+                created_at + timedelta(minutes=duration),
+            ))
+    return [
+        ("calls", _csv_text(rows), len(rows)),
+        ("call_transcripts", _csv_text(transcripts), len(transcripts)),
+    ]
+
+def build_tasks(sizes, chunk_size, plan):
+    """Split every table into chunk tasks, parents before children"""
+    tasks = []
+    for table in ("accounts", "contacts", "emails", "calls"):
+        total = sizes[table]
+        for chunk_index, start in enumerate(range(0, total, chunk_size)):
+            tasks.append((table, chunk_index, start, min(chunk_size, total - start), plan))
+    return tasks
+
+def next_ids(cur):
+    """Current max id per table, so new rows never collide with existing ones"""
+    base = {}
+    for table in TABLE_COLUMNS:
+        cur.execute(f"SELECT COALESCE(MAX(id), 0) FROM {table}")
+        base[table] = cur.fetchone()[0]
+    return base
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Seed the CRM database with synthetic data")
+    parser.add_argument("--size", choices=sorted(SIZES), default="small", help="Preset dataset size")
+    parser.add_argument("--accounts", type=int, help="Number of accounts (overrides --size)")
+    parser.add_argument("--contacts", type=int, help="Number of contacts (overrides --size)")
+    parser.add_argument("--emails", type=int, help="Number of emails (overrides --size)")
+    parser.add_argument("--calls", type=int, help="Number of calls (overrides --size)")
+    parser.add_argument("--transcript-ratio", type=float, default=0.6, help="Fraction of calls with a transcript")
+    parser.add_argument("--skew", type=float, default=1.5,
+                        help="Fan-out skew; 1.0 spreads children evenly, higher values concentrate them on a few parents")
+    parser.add_argument("--days", type=int, default=730, help="History length in days")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for deterministic output")
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count(), help="Generator processes")
+    parser.add_argument("--chunk-size", type=int, default=20_000, help="Rows generated per task and per COPY")
+    parser.add_argument("--truncate", action="store_true", help="Empty all CRM tables before seeding")
+    return parser.parse_args(argv)
+
+def seed(args):
+    accounts, contacts, emails, calls = SIZES[args.size]
+    sizes = {
+        "accounts": args.accounts if args.accounts is not None else accounts,
+        "contacts": args.contacts if args.contacts is not None else contacts,
+        "emails": args.emails if args.emails is not None else emails,
+        "calls": args.calls if args.calls is not None else calls,
+    }
+    if sizes["accounts"] < 1 or (sizes["contacts"] < 1 and (sizes["emails"] or sizes["calls"])):
+        raise SystemExit("Need at least one account, and one contact when seeding emails or calls")
+
+    conn = psycopg2.connect(**DB_CONFIG)
+    cur = conn.cursor()
+    # Skip the per-statement change feed notifications (migration 0006);
+    # listeners get a single reset once the load is done
+    cur.execute("SET crm.change_feed = off")
+    if args.truncate:
+        cur.execute("TRUNCATE call_transcripts, calls, emails, contacts, accounts RESTART IDENTITY CASCADE")
+
+    plan = {
+        "seed": args.seed,
+        "sizes": sizes,
+        "skew": args.skew,
+        "days": args.days,
+        "transcript_ratio": args.transcript_ratio,
+        # Fixed end date keeps timestamps deterministic for a given seed
+        "end": datetime(2025, 1, 1),
+        "base": next_ids(cur),
+    }
+    tasks = build_tasks(sizes, args.chunk_size, plan)
+    loaded = dict.fromkeys(TABLE_COLUMNS, 0)
+    started = time.monotonic()
+
+    with multiprocessing.Pool(args.workers, initializer=_init_worker, initargs=(args.seed,)) as pool:
+        # imap keeps task order, so parents are always copied before children
+        for results in pool.imap(generate_chunk, tasks):
+            for table, text, count in results:
+                if count:
+                    cur.copy_expert(
+                        f"COPY {table} ({', '.join(TABLE_COLUMNS[table])}) FROM STDIN WITH (FORMAT csv)",
+                        io.StringIO(text)
+                    )
+                loaded[table] += count
+            conn.commit()
+            progress = ", ".join(f"{table}={count:,}" for table, count in loaded.items())
+            print(f"\r{progress}", end="", flush=True)
+    print()
+
+    # Explicit ids bypass the SERIAL sequences, so move them past the new rows
+    for table in TABLE_COLUMNS:
+        cur.execute(f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), COALESCE(MAX(id), 0) + 1, false) FROM {table}")
+    cur.execute("ANALYZE")
+    cur.execute("SELECT pg_notify(%s, %s)", (CHANNEL, json.dumps({"reset": "bulk load"})))
     conn.commit()
     cur.close()
     conn.close()
-    print("Done!")
+
+    elapsed = time.monotonic() - started
+    total = sum(loaded.values())
+    print(f"Loaded {total:,} rows in {elapsed:.1f}s ({total / max(elapsed, 1e-9):,.0f} rows/s)")
+    return loaded
+
+if __name__ == "__main__":
+    seed(parse_args(sys.argv[1:]))
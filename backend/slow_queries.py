@@ -0,0 +1,201 @@
+import contextvars
+import logging
+import os
+import queue
+import random
+import re
+import threading
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from metrics import route_template
+
+# Opt-in: record statements slower than the threshold (adjustable at runtime
+# through /admin/slow-queries)
+SLOW_QUERY_LOG_ENABLED = os.getenv("SLOW_QUERY_LOG", "false").lower() in ("1", "true", "yes")
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "200"))
+# Fraction of slow statements explained (read-only ones under EXPLAIN ANALYZE)
+SLOW_QUERY_EXPLAIN_SAMPLE_RATE = float(os.getenv("SLOW_QUERY_EXPLAIN_SAMPLE_RATE", "0.1"))
+# Slow statements kept for /admin/slow-queries; older ones are dropped
+SLOW_QUERY_BUFFER_SIZE = int(os.getenv("SLOW_QUERY_BUFFER_SIZE", "100"))
+# statement_timeout for the EXPLAIN re-run
+SLOW_QUERY_EXPLAIN_TIMEOUT_MS = int(os.getenv("SLOW_QUERY_EXPLAIN_TIMEOUT_MS", "10000"))
+
+MAX_STATEMENT_CHARS = 4000
+# EXPLAIN requests waiting for the background worker; more are skipped
+EXPLAIN_QUEUE_SIZE = 16
+EXPLAINABLE = ("select", "insert", "update", "delete", "with", "values", "table", "merge")
+# Only statements that merely read are re-run under ANALYZE; anything that may
+# write or lock rows (DML anywhere, including data-modifying CTEs, or SELECT
+# ... FOR UPDATE) gets a plain EXPLAIN so nothing runs, fires triggers or
+# consumes sequence values
+READ_ONLY = ("select", "with", "values", "table")
+WRITE_KEYWORDS = re.compile(r"\b(insert|update|delete|merge|nextval|setval)\b")
+
+logger = logging.getLogger("crm.slow_queries")
+
+# ASGI scope of the request being served, for labelling statements with their route
+current_request: contextvars.ContextVar[Optional[dict]] = contextvars.ContextVar("current_request", default=None)
+
+def statement_text(query, truncate: bool = True) -> str:
+    """The statement as sent, with whitespace collapsed and long ones truncated"""
+    if isinstance(query, bytes):
+        query = query.decode("utf-8", "replace")
+    elif not isinstance(query, str):
+        # psycopg.sql.Composed and friends
+        query = query.as_string(None)
+    text = re.sub(r"\s+", " ", query).strip()
+    return text if not truncate or len(text) <= MAX_STATEMENT_CHARS else text[:MAX_STATEMENT_CHARS] + "…"
+
+def is_read_only(query) -> bool:
+    """Whether ``query`` only reads, so running it again under EXPLAIN ANALYZE is harmless"""
+    statement = statement_text(query, truncate=False).lower()
+    return statement.startswith(READ_ONLY) and not WRITE_KEYWORDS.search(statement)
+
+def _value_shape(value) -> str:
+    if isinstance(value, (str, bytes, bytearray, memoryview, list, tuple)):
+        return f"{type(value).__name__}[{len(value)}]"
+    return type(value).__name__
+
+def param_shape(params):
+    """Types (and lengths) of the parameters, never their values"""
+    if params is None:
+        return None
+    if isinstance(params, dict):
+        return {name: _value_shape(value) for name, value in params.items()}
+    return [_value_shape(value) for value in params]
+
+class SlowQueryLog:
+    """Ring buffer of statements slower than ``threshold_ms``.
+
+    Each slow statement is logged with its template, parameter shape,
+    duration and the route that issued it. A ``sample_rate`` fraction of them
+    is explained by a background thread and the plan is attached to the
+    entry: read-only statements are re-run under ``EXPLAIN (ANALYZE,
+    BUFFERS)`` inside a transaction that is rolled back, writes only get
+    ``EXPLAIN``. ``explainer(statement, params, analyze)`` returns the plan text.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = SLOW_QUERY_LOG_ENABLED,
+        threshold_ms: float = SLOW_QUERY_THRESHOLD_MS,
+        sample_rate: float = SLOW_QUERY_EXPLAIN_SAMPLE_RATE,
+        max_entries: int = SLOW_QUERY_BUFFER_SIZE,
+    ):
+        self.enabled = enabled
+        self.threshold_ms = threshold_ms
+        self.sample_rate = sample_rate
+        self.explainer: Optional[Callable[[Any, Any, bool], str]] = None
+        self._entries = deque(maxlen=max_entries)
+        self._lock = threading.Lock()
+        self._next_id = 1
+        self._queue = queue.Queue(maxsize=EXPLAIN_QUEUE_SIZE)
+        self._worker = None
+
+    def settings(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "threshold_ms": self.threshold_ms,
+            "sample_rate": self.sample_rate,
+            "max_entries": self._entries.maxlen,
+        }
+
+    def configure(self, enabled: Optional[bool] = None, threshold_ms: Optional[float] = None,
+                  sample_rate: Optional[float] = None):
+        """Change the settings of the running process"""
+        if enabled is not None:
+            self.enabled = enabled
+        if threshold_ms is not None:
+            self.threshold_ms = threshold_ms
+        if sample_rate is not None:
+            self.sample_rate = sample_rate
+
+    def observe(self, query, params, elapsed: float, driver: str):
+        """Record ``query`` if it took longer than the threshold (called by the timed cursors)"""
+        if not self.enabled or elapsed * 1000 < self.threshold_ms:
+            return
+        scope = current_request.get()
+        entry = {
+            "recorded_at": datetime.now(timezone.utc),
+            "duration_ms": round(elapsed * 1000, 3),
+            "route": f"{scope['method']} {route_template(scope)}" if scope else None,
+            "driver": driver,
+            "statement": statement_text(query),
+            "params": param_shape(params),
+            "plan_status": "not_sampled",
+            "plan": None,
+            "plan_analyzed": False,
+        }
+        logger.warning(
+            "slow query %.1f ms route=%s params=%s: %s",
+            entry["duration_ms"], entry["route"], entry["params"], entry["statement"]
+        )
+        if self.explainer is not None and random.random() < self.sample_rate:
+            entry["plan_status"] = self._request_plan(entry, query, params)
+        with self._lock:
+            entry["id"] = self._next_id
+            self._next_id += 1
+            self._entries.append(entry)
+
+    def _request_plan(self, entry: Dict[str, Any], query, params) -> str:
+        if not entry["statement"].lower().startswith(EXPLAINABLE):
+            return "unsupported"
+        try:
+            self._queue.put_nowait((entry, query, params))
+        except queue.Full:
+            return "skipped"
+        self._ensure_worker()
+        return "pending"
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._explain_forever, name="slow-query-explain", daemon=True)
+                self._worker.start()
+
+    def _explain_forever(self):
+        while True:
+            entry, query, params = self._queue.get()
+            try:
+                analyze = is_read_only(query)
+                entry["plan"] = self.explainer(query, params, analyze)
+                entry["plan_analyzed"] = analyze
+                entry["plan_status"] = "captured"
+            except Exception as e:
+                entry["plan"] = str(e).strip()
+                entry["plan_status"] = "failed"
+            finally:
+                self._queue.task_done()
+
+    def wait_for_plans(self):
+        """Block until every queued EXPLAIN has finished"""
+        self._queue.join()
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """Recorded slow statements, newest first"""
+        with self._lock:
+            return [dict(entry) for entry in reversed(self._entries)]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+slow_query_log = SlowQueryLog()
+
+class QueryContextMiddleware:
+    """ASGI middleware exposing the current request to the database layer"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = current_request.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_request.reset(token)
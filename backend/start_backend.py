@@ -1,22 +1,112 @@
 #!/usr/bin/env python3
 """
 FastAPI CRM Server Startup Script
+
+Runs uvicorn with auto-reload for development, or with ``--production``
+(or SERVER_MODE=production) as several worker processes on uvloop and
+httptools when they are installed.
 """
 
+import argparse
+import os
+import sys
+from typing import Any, Dict
+
 import uvicorn
-from api import app
 
-if __name__ == "__main__":
+try:
+    import uvloop
+except ImportError:  # pragma: no cover - uvloop is optional
+    uvloop = None
+
+try:
+    import httptools
+except ImportError:  # pragma: no cover - httptools is optional
+    httptools = None
+
+SERVER_MODE = os.getenv("SERVER_MODE", "development")
+SERVER_HOST = os.getenv("SERVER_HOST", "0.0.0.0")
+SERVER_PORT = int(os.getenv("SERVER_PORT", "8000"))
+# Worker processes in production mode; 0 means one per CPU
+SERVER_WORKERS = int(os.getenv("SERVER_WORKERS", "0"))
+# Seconds an idle keep-alive connection is held open
+SERVER_KEEPALIVE_SECONDS = int(os.getenv("SERVER_KEEPALIVE_SECONDS", "5"))
+# Pending connections the listening socket queues
+SERVER_BACKLOG = int(os.getenv("SERVER_BACKLOG", "2048"))
+# Concurrent connections per worker before new requests get a 503; 0 means no limit
+SERVER_LIMIT_CONCURRENCY = int(os.getenv("SERVER_LIMIT_CONCURRENCY", "0"))
+# Seconds in-flight requests (and open /stream connections) get to finish on shutdown
+SERVER_GRACEFUL_SHUTDOWN_SECONDS = int(os.getenv("SERVER_GRACEFUL_SHUTDOWN_SECONDS", "30"))
+
+def production_options(workers: int = SERVER_WORKERS) -> Dict[str, Any]:
+    """uvicorn settings for production: no reload, one worker per CPU by default"""
+    return {
+        "workers": workers or os.cpu_count() or 1,
+        "loop": "uvloop" if uvloop is not None else "asyncio",
+        "http": "httptools" if httptools is not None else "h11",
+        "timeout_keep_alive": SERVER_KEEPALIVE_SECONDS,
+        "backlog": SERVER_BACKLOG,
+        "limit_concurrency": SERVER_LIMIT_CONCURRENCY or None,
+        "timeout_graceful_shutdown": SERVER_GRACEFUL_SHUTDOWN_SECONDS,
+        "access_log": False,
+        "log_level": "info",
+    }
+
+def check_cache_for_workers(workers: int, cache_config: Dict[str, Any]):
+    """Refuse several workers with a per-process entity cache.
+
+    Nothing invalidates a local cache across processes, so after a write
+    handled by one worker the others would serve (and 304 on) the old row
+    until their entries expire, even to the client that wrote it.
+    """
+    if workers > 1 and cache_config["enabled"] and cache_config["backend"] != "redis":
+        raise SystemExit(
+            f"{workers} workers need a shared entity cache: set CACHE_BACKEND=redis, "
+            f"CACHE_ENABLED=false or SERVER_WORKERS=1 (CACHE_BACKEND is {cache_config['backend']!r})"
+        )
+
+def development_options() -> Dict[str, Any]:
+    return {
+        "reload": True,  # Auto-reload on code changes
+        "log_level": "info",
+    }
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Start the CRM API server")
+    parser.add_argument("--production", action="store_true", default=SERVER_MODE == "production",
+                        help="Run without reload, as several tuned worker processes")
+    parser.add_argument("--workers", type=int, default=SERVER_WORKERS, help="Production worker processes (0 = one per CPU)")
+    parser.add_argument("--host", default=SERVER_HOST)
+    parser.add_argument("--port", type=int, default=SERVER_PORT)
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
     print("🚀 Starting CRM FastAPI Server...")
-    print("📖 API Documentation: http://localhost:8000/docs")
-    print("🔍 Alternative docs: http://localhost:8000/redoc")
-    print("⚡ Server running on: http://localhost:8000")
+    print(f"📖 API Documentation: http://localhost:{args.port}/docs")
+    print(f"🔍 Alternative docs: http://localhost:{args.port}/redoc")
+    print(f"⚡ Server running on: http://localhost:{args.port}")
+
+    if not args.production:
+        print("-" * 50)
+        uvicorn.run("api:app", host=args.host, port=args.port, **development_options())
+        return
+
+    # Import the app once here so configuration errors fail fast, before any
+    # worker is started; each worker then opens its pools and warms up in its
+    # lifespan and only reports /ready afterwards
+    from api import app
+    from cache import CACHE_CONFIG
+    from database import db_manager
+
+    options = production_options(args.workers)
+    check_cache_for_workers(options["workers"], CACHE_CONFIG)
+    pool_size = db_manager.pool_config["max_size"] if db_manager.pooled else 1
+    print(f"🏭 Production: {options['workers']} worker(s), {options['loop']} loop, {options['http']} HTTP parser")
+    print(f"🔌 Up to {options['workers'] * pool_size} database connections ({pool_size} per worker)")
     print("-" * 50)
-    
-    uvicorn.run(
-        "api:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True,  # Auto-reload on code changes
-        log_level="info"
-    ) 
\ No newline at end of file
+    # uvicorn needs an import string to start several workers
+    uvicorn.run(app if options["workers"] == 1 else "api:app", host=args.host, port=args.port, **options)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -18,7 +18,7 @@ def test_get_accounts_empty(client):
     """Test getting accounts when none exist"""
     response = client.get("/accounts/")
     assert response.status_code == status.HTTP_200_OK
-    assert response.json() == []
+    assert response.json() == {"items": [], "next_cursor": None}
 
 def test_get_accounts_with_data(client, sample_account_data):
     """Test getting accounts with existing data"""
@@ -28,7 +28,7 @@ def test_get_accounts_with_data(client, sample_account_data):
     response = client.get("/accounts/")
     assert response.status_code == status.HTTP_200_OK
     
-    data = response.json()
+    data = response.json()["items"]
     assert len(data) == 1
     assert data[0]["name"] == sample_account_data["name"]
 
@@ -0,0 +1,77 @@
+from datetime import date, timedelta
+from fastapi import status
+
+from database import db_manager
+
+def _contact(client, account_id, email):
+    return client.post("/contacts/", json={
+        "account_id": account_id, "first_name": "Jane", "last_name": "Doe", "email": email
+    }).json()["id"]
+
+def test_account_call_stats(client, sample_account_data):
+    """Test call rollups across creates, updates, bulk inserts, deletes and contact moves"""
+    account_id = client.post("/accounts/", json=sample_account_data).json()["id"]
+    other_id = client.post("/accounts/", json={"name": "Other Co"}).json()["id"]
+    contact_id = _contact(client, account_id, "jane@test.com")
+    mover_id = _contact(client, account_id, "mover@test.com")
+
+    client.post("/calls/", json={"contact_id": contact_id, "call_type": "discovery", "duration": 30, "outcome": "Interested"})
+    call_id = client.post("/calls/", json={"contact_id": contact_id, "call_type": "demo", "duration": 60, "outcome": "Interested"}).json()["id"]
+    client.post("/calls/bulk", json=[
+        {"contact_id": contact_id, "call_type": "discovery", "outcome": "Voicemail"},
+        {"contact_id": mover_id, "call_type": "demo", "duration": 10},
+        # Same key with a NULL outcome: merged into one rollup row
+        {"contact_id": mover_id, "call_type": "demo"},
+    ])
+
+    response = client.get(f"/analytics/accounts/{account_id}/calls")
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data["calls"] == 5
+    assert data["total_duration"] == 100
+    # The call without a duration doesn't drag the average down
+    assert data["average_duration"] == 100 / 3
+    assert [(group["call_type"], group["calls"]) for group in data["by_type"]] == [("demo", 3), ("discovery", 2)]
+    assert {group["outcome"]: group["calls"] for group in data["by_outcome"]} == {"Interested": 2, "Voicemail": 1, None: 2}
+
+    client.put(f"/calls/{call_id}", json={"contact_id": contact_id, "call_type": "demo", "duration": 90, "outcome": "Closed"})
+    client.put(f"/contacts/{mover_id}", json={
+        "account_id": other_id, "first_name": "Jane", "last_name": "Doe", "email": "mover@test.com"
+    })
+    data = client.get(f"/analytics/accounts/{account_id}/calls").json()
+    assert (data["calls"], data["total_duration"]) == (3, 120)
+    assert {group["outcome"]: group["calls"] for group in data["by_outcome"]} == {"Interested": 1, "Closed": 1, "Voicemail": 1}
+    assert client.get(f"/analytics/accounts/{other_id}/calls").json()["calls"] == 2
+
+    client.delete(f"/calls/{call_id}")
+    client.delete(f"/contacts/{contact_id}")
+    data = client.get(f"/analytics/accounts/{account_id}/calls").json()
+    assert data == {"account_id": account_id, "calls": 0, "total_duration": 0, "average_duration": None, "by_type": [], "by_outcome": []}
+
+    assert client.get("/analytics/accounts/999/calls").status_code == status.HTTP_404_NOT_FOUND
+
+def test_account_email_stats(client, sample_account_data):
+    """Test weekly email counts with week-rounded bounds"""
+    account_id = client.post("/accounts/", json=sample_account_data).json()["id"]
+    contact_id = _contact(client, account_id, "jane@test.com")
+    for _ in range(2):
+        client.post("/emails/", json={"contact_id": contact_id, "subject": "Hello"})
+    old_id = client.post("/emails/", json={"contact_id": contact_id, "subject": "Old news"}).json()["id"]
+    db_manager.execute_update("UPDATE emails SET sent_at = sent_at - interval '14 days' WHERE id = %s RETURNING id", (old_id,))
+
+    today = date.today()
+    this_week = today - timedelta(days=today.weekday())
+    data = client.get(f"/analytics/accounts/{account_id}/emails").json()
+    assert data["emails"] == 3
+    assert data["weeks"] == [
+        {"week": str(this_week - timedelta(days=14)), "emails": 1},
+        {"week": str(this_week), "emails": 2},
+    ]
+
+    # Any day of a week selects the whole week
+    data = client.get(f"/analytics/accounts/{account_id}/emails", params={"since": str(today)}).json()
+    assert data["emails"] == 2
+    data = client.get(f"/analytics/accounts/{account_id}/emails", params={"until": str(this_week - timedelta(days=1))}).json()
+    assert [week["emails"] for week in data["weeks"]] == [1]
+
+    assert client.get("/analytics/accounts/999/emails").status_code == status.HTTP_404_NOT_FOUND
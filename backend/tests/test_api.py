@@ -1,6 +1,13 @@
+import asyncio
+import os
+import signal
 import pytest
 from fastapi import status
 
+from lifecycle import drain_on_signal, readiness
+from metrics import DB_LATENCY, DB_ROWS, HTTP_LATENCY, HTTP_REQUESTS
+from start_backend import check_cache_for_workers, production_options
+
 def test_root_endpoint(client):
     """Test the root endpoint"""
     response = client.get("/")
@@ -22,6 +29,35 @@ def test_health_check(client):
     assert data["status"] == "healthy"
     assert data["version"] == "2.0.0"
 
+def test_metrics_endpoint(client, sample_account_data):
+    """Test that request and database metrics move and are exposed for Prometheus"""
+    not_found = HTTP_REQUESTS.value("GET", "/accounts/{account_id}", "404")
+    timed = HTTP_LATENCY.count("GET", "/accounts/{account_id}")
+    executed, fetched = DB_LATENCY.count("psycopg2", "execute"), DB_ROWS.count("psycopg2")
+
+    client.get("/accounts/123456")
+    client.get("/accounts/654321")
+    client.post("/accounts/", json=sample_account_data)
+
+    # Requests are labelled by route template, not by concrete path
+    assert HTTP_REQUESTS.value("GET", "/accounts/{account_id}", "404") == not_found + 2
+    assert HTTP_LATENCY.count("GET", "/accounts/{account_id}") == timed + 2
+    assert HTTP_REQUESTS.value("POST", "/accounts/", "200") >= 1
+    assert DB_LATENCY.count("psycopg2", "execute") >= executed + 3
+    assert DB_ROWS.count("psycopg2") >= fetched + 3
+
+    response = client.get("/metrics")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = response.text
+    assert "# TYPE http_request_duration_seconds histogram" in body
+    assert 'http_requests_total{method="GET",route="/accounts/{account_id}",status="404"}' in body
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/accounts/{account_id}",le="+Inf"}' in body
+    assert 'db_operation_duration_seconds_count{driver="psycopg2",operation="connect"}' in body
+    assert 'http_requests_in_progress{method="GET",route="/metrics"} 1' in body
+    assert 'entity_cache_events_total{event="misses"}' in body
+    assert "/accounts/123456" not in body
+
 def test_openapi_docs(client):
     """Test that OpenAPI docs are accessible"""
     response = client.get("/docs")
@@ -42,4 +78,63 @@ def test_cors_headers(client):
     """Test that CORS headers are present"""
     response = client.options("/")
     # FastAPI handles CORS automatically, so we just check that OPTIONS is allowed
-    assert response.status_code in [status.HTTP_200_OK, status.HTTP_405_METHOD_NOT_ALLOWED] 
\ No newline at end of file
+    assert response.status_code in [status.HTTP_200_OK, status.HTTP_405_METHOD_NOT_ALLOWED]
+
+
+def test_readiness_probe(client):
+    """Test that /ready reports ready once startup warm-up ran, and 503 when stopping"""
+    response = client.get("/ready")
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data["status"] == "ready" and data["warmup_failures"] == []
+    assert data["warmup_ms"] > 0
+
+    readiness.mark_stopping()
+    try:
+        assert client.get("/ready").status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    finally:
+        readiness.state = "ready"
+
+
+def test_drain_on_signal():
+    """Test that SIGTERM flips readiness at once and reaches uvicorn's handler after the drain delay"""
+    received = []
+
+    class Server:
+        def handle_exit(self, sig, frame):
+            received.append(sig)
+
+    async def run():
+        drain_on_signal(0.2)
+        os.kill(os.getpid(), signal.SIGTERM)
+        await asyncio.sleep(0.05)
+        during = (readiness.state, list(received))
+        await asyncio.sleep(0.3)
+        return during
+
+    previous = signal.signal(signal.SIGTERM, Server().handle_exit)
+    try:
+        readiness.state = "ready"
+        assert asyncio.run(run()) == ("stopping", [])
+        assert received == [signal.SIGTERM]
+    finally:
+        signal.signal(signal.SIGTERM, previous)
+        readiness.state = "ready"
+
+
+def test_production_options():
+    """Test the production launcher's uvicorn settings"""
+    options = production_options(workers=0)
+    assert options["workers"] == (os.cpu_count() or 1)
+    assert options["loop"] in ("uvloop", "asyncio") and options["http"] in ("httptools", "h11")
+    assert "reload" not in options and options["timeout_graceful_shutdown"] > 0
+    assert production_options(workers=3)["workers"] == 3
+
+
+def test_workers_need_a_shared_cache():
+    """Test that several workers refuse to start with a per-process entity cache"""
+    with pytest.raises(SystemExit, match="CACHE_BACKEND=redis"):
+        check_cache_for_workers(2, {"enabled": True, "backend": "local"})
+    check_cache_for_workers(2, {"enabled": True, "backend": "redis"})
+    check_cache_for_workers(2, {"enabled": False, "backend": "local"})
+    check_cache_for_workers(1, {"enabled": True, "backend": "local"})
@@ -0,0 +1,73 @@
+import asyncio
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+from api import app
+from async_database import AsyncDatabaseManager, async_db_manager
+from metrics import DB_LATENCY, DB_ROWS
+
+@pytest.fixture
+def native_client(client):
+    """Test client whose routers run on the native async driver"""
+    original_driver = async_db_manager.driver
+    async_db_manager.driver = "native"
+    try:
+        with TestClient(app) as native_test_client:
+            yield native_test_client
+    finally:
+        async_db_manager.driver = original_driver
+
+def test_native_manager_executes_queries(test_db_manager):
+    """Test the native driver's execute_* helpers"""
+    async def run():
+        manager = AsyncDatabaseManager(test_db_manager, driver="native")
+        try:
+            row, cur = await manager.execute_insert(
+                "INSERT INTO accounts (name) VALUES (%s) RETURNING *", ("Async Co",)
+            )
+            created = manager.row_to_dict(row, cur)
+
+            rows, cur = await manager.execute_query("SELECT * FROM accounts WHERE id = %s", (created["id"],))
+            fetched = [manager.row_to_dict(r, cur) for r in rows]
+
+            deleted = await manager.execute_delete("DELETE FROM accounts WHERE id = %s", (created["id"],))
+            return created, fetched, deleted
+        finally:
+            await manager.close()
+
+    created, fetched, deleted = asyncio.run(run())
+    assert created["name"] == "Async Co"
+    assert fetched == [created]
+    assert deleted == 1
+
+def test_unknown_driver_rejected(test_db_manager):
+    """Test that an unknown driver name is refused"""
+    with pytest.raises(ValueError):
+        AsyncDatabaseManager(test_db_manager, driver="gevent")
+
+@pytest.mark.committed
+def test_native_driver_crud(native_client, sample_account_data, sample_contact_data):
+    """Test the routers end to end on the native async driver"""
+    executed, fetched_rows = DB_LATENCY.count("psycopg", "execute"), DB_ROWS.total("psycopg")
+    response = native_client.post("/accounts/", json=sample_account_data)
+    assert response.status_code == status.HTTP_200_OK
+    account_id = response.json()["id"]
+
+    contact_data = sample_contact_data.copy()
+    contact_data["account_id"] = account_id
+    contact_id = native_client.post("/contacts/", json=contact_data).json()["id"]
+
+    response = native_client.get(f"/accounts/{account_id}/contacts")
+    assert [contact["id"] for contact in response.json()["items"]] == [contact_id]
+
+    response = native_client.delete(f"/accounts/{account_id}")
+    assert response.status_code == status.HTTP_200_OK
+    assert native_client.get(f"/contacts/{contact_id}").status_code == status.HTTP_404_NOT_FOUND
+
+    health = native_client.get("/health").json()
+    assert health["db_driver"] == "native"
+    assert health["db_pool"]["pool_max"] >= 1
+    # The native driver's cursors and pool checkouts are timed too
+    assert DB_LATENCY.count("psycopg", "execute") > executed
+    assert DB_LATENCY.count("psycopg", "connect") > 0
+    assert DB_ROWS.total("psycopg") > fetched_rows
@@ -0,0 +1,55 @@
+from fastapi import status
+
+def test_batch_with_references(client, sample_account_data):
+    """Test creates that reference earlier ones, plus an update and a delete, in one batch"""
+    existing_id = client.post("/accounts/", json={"name": "Old Co"}).json()["id"]
+    assert client.get(f"/accounts/{existing_id}").status_code == status.HTTP_200_OK
+
+    response = client.post("/batch", json={"operations": [
+        {"op": "create", "entity": "accounts", "ref": "acme", "data": sample_account_data},
+        {"op": "create", "entity": "contacts", "ref": "jane", "data": {
+            "account_id": "$acme", "first_name": "Jane", "last_name": "Doe", "email": "jane@acme.com"
+        }},
+        {"op": "create", "entity": "calls", "ref": "intro", "data": {"contact_id": "$jane", "call_type": "discovery", "duration": 30}},
+        {"op": "update", "entity": "calls", "id": "$intro", "data": {"contact_id": "$jane", "call_type": "discovery", "duration": 45, "outcome": "Interested"}},
+        {"op": "delete", "entity": "accounts", "id": existing_id},
+    ]})
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    refs = data["refs"]
+    assert [(result["op"], result["id"]) for result in data["results"]] == [
+        ("create", refs["acme"]), ("create", refs["jane"]), ("create", refs["intro"]),
+        ("update", refs["intro"]), ("delete", existing_id),
+    ]
+    assert data["results"][1]["row"]["account_id"] == refs["acme"]
+    assert data["results"][4]["row"] is None
+
+    assert client.get(f"/calls/{refs['intro']}").json()["outcome"] == "Interested"
+    assert [contact["id"] for contact in client.get(f"/accounts/{refs['acme']}/contacts").json()["items"]] == [refs["jane"]]
+    # The batch invalidated the cached account it deleted
+    assert client.get(f"/accounts/{existing_id}").status_code == status.HTTP_404_NOT_FOUND
+
+def test_batch_is_all_or_nothing(client, sample_account_data):
+    """Test that a failing operation rolls back the whole batch and is reported by index"""
+    create_account = {"op": "create", "entity": "accounts", "ref": "acme", "data": sample_account_data}
+
+    response = client.post("/batch", json={"operations": [
+        create_account,
+        {"op": "create", "entity": "contacts", "data": {"account_id": 999, "first_name": "A", "last_name": "B", "email": "a@b.com"}},
+    ]})
+    assert response.status_code == status.HTTP_409_CONFLICT
+    assert response.json()["detail"]["index"] == 1
+
+    response = client.post("/batch", json={"operations": [create_account, {"op": "delete", "entity": "calls", "id": 999}]})
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert client.get("/accounts/").json()["items"] == []
+
+    # Rejected before anything runs: unknown references and invalid data
+    response = client.post("/batch", json={"operations": [
+        create_account,
+        {"op": "create", "entity": "contacts", "data": {"account_id": "$nope", "first_name": "A", "last_name": "B", "email": "a@b.com"}},
+    ]})
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+    assert response.json()["detail"] == {"index": 1, "detail": "account_id: '$nope' is not an id or the $ref of an earlier create"}
+    response = client.post("/batch", json={"operations": [{"op": "create", "entity": "calls", "data": {"contact_id": 1}}]})
+    assert response.json()["detail"]["detail"] == "call_type: Field required"
@@ -0,0 +1,76 @@
+import json
+from fastapi import status
+
+def test_bulk_create_accounts(client):
+    """Test creating accounts from a JSON array"""
+    rows = [{"name": f"Company {i}", "industry": "Software"} for i in range(3)]
+    response = client.post("/accounts/bulk", json=rows)
+    assert response.status_code == status.HTTP_200_OK
+
+    data = response.json()
+    assert data["created"] == 3
+    assert data["errors"] == []
+    for row_id, row in zip(data["ids"], rows):
+        assert client.get(f"/accounts/{row_id}").json()["name"] == row["name"]
+
+def test_bulk_create_ndjson(client, sample_account_data):
+    """Test creating emails from an NDJSON body with a malformed line"""
+    account_id = client.post("/accounts/", json=sample_account_data).json()["id"]
+    contact_id = client.post("/contacts/", json={
+        "account_id": account_id, "first_name": "Jane", "last_name": "Doe", "email": "jane@test.com"
+    }).json()["id"]
+
+    body = "\n".join([
+        json.dumps({"contact_id": contact_id, "subject": "Hello"}),
+        "{not json",
+        json.dumps({"contact_id": contact_id, "subject": "Follow up", "body": "Checking in"}),
+    ])
+    response = client.post("/emails/bulk", content=body, headers={"Content-Type": "application/x-ndjson"})
+    data = response.json()
+    assert data["created"] == 2
+    assert data["ids"][1] is None
+    assert data["errors"][0]["index"] == 1
+    assert data["errors"][0]["detail"].startswith("Invalid JSON")
+
+    emails = client.get(f"/contacts/{contact_id}/emails").json()["items"]
+    assert {email["subject"] for email in emails} == {"Hello", "Follow up"}
+
+def test_bulk_create_reports_row_errors(client, sample_account_data, sample_contact_data):
+    """Test per-row validation, foreign key and uniqueness errors"""
+    account_id = client.post("/accounts/", json=sample_account_data).json()["id"]
+    existing = sample_contact_data.copy()
+    existing["account_id"] = account_id
+    client.post("/contacts/", json=existing)
+
+    def contact(email, **overrides):
+        return {"account_id": account_id, "first_name": "A", "last_name": "B", "email": email, **overrides}
+
+    rows = [
+        contact("ok@test.com"),
+        contact("missing-name@test.com", first_name=None),
+        contact("orphan@test.com", account_id=999),
+        contact(existing["email"]),
+        contact("ok@test.com"),
+    ]
+    data = client.post("/contacts/bulk", json=rows).json()
+    assert data["created"] == 1
+    assert data["ids"][0] is not None
+    assert data["ids"][1:] == [None, None, None, None]
+
+    errors = {error["index"]: error["detail"] for error in data["errors"]}
+    assert errors[1].startswith("first_name")
+    assert errors[2] == "account_id: 999 does not exist"
+    assert errors[3] == f"email: '{existing['email']}' already exists"
+    assert errors[4] == "email: duplicates row 0"
+
+def test_bulk_create_rejects_non_array(client):
+    """Test that a JSON object body and non-UTF-8 NDJSON are rejected"""
+    response = client.post("/calls/bulk", json={"contact_id": 1})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    response = client.post("/calls/bulk", content=b'{"contact_id": 1}\n\xff\n', headers={"Content-Type": "application/x-ndjson"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+def test_bulk_create_unknown_entity(client):
+    """Test bulk creating an unknown entity"""
+    response = client.post("/widgets/bulk", json=[])
+    assert response.status_code == status.HTTP_404_NOT_FOUND
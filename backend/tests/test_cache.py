@@ -0,0 +1,100 @@
+import asyncio
+import time
+from fastapi import status
+from cache import MISSING, EntityCache, LRUCache, entity_cache, rows_tag
+
+def test_lru_cache_evicts_and_expires():
+    """Test LRU eviction order and TTL expiry"""
+    cache = LRUCache(max_entries=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is MISSING
+    assert cache.get("a") == 1
+    assert cache.evictions == 1
+
+    cache.set("d", 4, ttl=0.01)
+    time.sleep(0.02)
+    assert cache.get("d") is MISSING
+    assert cache.expirations == 1
+
+def test_shared_backend_and_tag_invalidation():
+    """Test the two-tier cache with the in-memory shared backend"""
+    first = EntityCache({"backend": "memory", "ttl": 30, "local_ttl": 30})
+    second = EntityCache({"backend": "memory", "ttl": 30, "local_ttl": 30})
+    second.shared = first.shared
+
+    first.set("accounts:1", {"id": 1})
+    assert second.get("accounts:1") == {"id": 1}
+
+    key = first.page_key("contacts:account_id=1", 50, None)
+    first.set(key, ["page"])
+    second.invalidate(tags=["contacts:account_id=1"])
+    assert first.page_key("contacts:account_id=1", 50, None) != key
+    assert first.stats()["hits"] == 0
+    assert second.stats()["hits"] == 1
+
+def test_load_racing_an_invalidation_is_not_cached():
+    """Test that a row read before a concurrent write's invalidation is returned but not cached"""
+    cache = EntityCache({"backend": "local", "ttl": 30})
+
+    async def stale_load():
+        # The write commits and invalidates while this read is in flight
+        cache.invalidate(keys=["accounts:1"])
+        return {"id": 1, "name": "Old"}
+
+    async def fresh_load():
+        return {"id": 1, "name": "New"}
+
+    assert asyncio.run(cache.get_or_load("accounts:1", stale_load, rows_tag("accounts")))["name"] == "Old"
+    assert cache.get("accounts:1") is MISSING
+    asyncio.run(cache.get_or_load("accounts:1", fresh_load, rows_tag("accounts")))
+    assert cache.get("accounts:1")["name"] == "New"
+
+def test_by_id_reads_are_cached_and_invalidated(client, sample_account_data):
+    """Test that updates and deletes are visible through the cache"""
+    account_id = client.post("/accounts/", json=sample_account_data).json()["id"]
+    client.get(f"/accounts/{account_id}")
+    hits = entity_cache.hits
+    assert client.get(f"/accounts/{account_id}").json()["name"] == "Test Company"
+    assert entity_cache.hits == hits + 1
+
+    client.put(f"/accounts/{account_id}", json={"name": "Renamed"})
+    assert client.get(f"/accounts/{account_id}").json()["name"] == "Renamed"
+
+    client.delete(f"/accounts/{account_id}")
+    assert client.get(f"/accounts/{account_id}").status_code == status.HTTP_404_NOT_FOUND
+
+def test_relationship_lists_are_invalidated(client, sample_account_data):
+    """Test moving a contact between accounts refreshes both lists"""
+    first = client.post("/accounts/", json=sample_account_data).json()["id"]
+    second = client.post("/accounts/", json={"name": "Other Company"}).json()["id"]
+    contact = client.post("/contacts/", json={
+        "account_id": first, "first_name": "Jane", "last_name": "Doe", "email": "jane@test.com"
+    }).json()
+    assert len(client.get(f"/accounts/{first}/contacts").json()["items"]) == 1
+    assert client.get(f"/accounts/{second}/contacts").json()["items"] == []
+
+    client.put(f"/contacts/{contact['id']}", json={**contact, "account_id": second})
+    assert client.get(f"/accounts/{first}/contacts").json()["items"] == []
+    assert [c["id"] for c in client.get(f"/accounts/{second}/contacts").json()["items"]] == [contact["id"]]
+
+def test_cascading_delete_invalidates_descendants(client, sample_account_data):
+    """Test deleting an account drops its cached contacts, calls and transcripts"""
+    account_id = client.post("/accounts/", json=sample_account_data).json()["id"]
+    contact_id = client.post("/contacts/", json={
+        "account_id": account_id, "first_name": "Jane", "last_name": "Doe", "email": "jane@test.com"
+    }).json()["id"]
+    call_id = client.post("/calls/", json={"contact_id": contact_id, "call_type": "demo"}).json()["id"]
+    client.post("/call-transcripts/", json={"call_id": call_id, "transcript": "Hello"})
+
+    assert client.get(f"/contacts/{contact_id}").status_code == status.HTTP_200_OK
+    assert len(client.get(f"/contacts/{contact_id}/calls").json()["items"]) == 1
+    assert client.get(f"/calls/{call_id}/transcript").status_code == status.HTTP_200_OK
+
+    assert client.delete(f"/accounts/{account_id}").status_code == status.HTTP_200_OK
+    assert client.get(f"/contacts/{contact_id}").status_code == status.HTTP_404_NOT_FOUND
+    assert client.get(f"/contacts/{contact_id}/calls").json()["items"] == []
+    assert client.get(f"/calls/{call_id}/transcript").status_code == status.HTTP_404_NOT_FOUND
+    assert client.get("/health").json()["cache"]["invalidations"] > 0
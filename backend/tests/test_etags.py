@@ -0,0 +1,57 @@
+from fastapi import status
+from cache import entity_cache
+
+def test_entity_etag_and_not_modified(client, sample_account_data):
+    """Test ETag, Cache-Control and 304 handling on a by-id read"""
+    account_id = client.post("/accounts/", json=sample_account_data).json()["id"]
+    response = client.get(f"/accounts/{account_id}")
+    etag = response.headers["etag"]
+    assert etag.startswith('"')
+    assert "no-cache" in response.headers["cache-control"]
+
+    response = client.get(f"/accounts/{account_id}", headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+
+    client.put(f"/accounts/{account_id}", json={"name": "Renamed"})
+    response = client.get(f"/accounts/{account_id}", headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["etag"] != etag
+
+def test_list_etag_tracks_changes(client, sample_account_data):
+    """Test that a relationship list's ETag changes on insert, update and delete"""
+    account_id = client.post("/accounts/", json=sample_account_data).json()["id"]
+    contact = client.post("/contacts/", json={
+        "account_id": account_id, "first_name": "Jane", "last_name": "Doe", "email": "jane@test.com"
+    }).json()
+    url = f"/accounts/{account_id}/contacts"
+    seen = [client.get(url).headers["etag"]]
+
+    # Answered from the cached page, then from the version-only query
+    assert client.get(url, headers={"If-None-Match": seen[-1]}).status_code == status.HTTP_304_NOT_MODIFIED
+    entity_cache.clear()
+    assert client.get(url, headers={"If-None-Match": seen[-1]}).status_code == status.HTTP_304_NOT_MODIFIED
+
+    client.put(f"/contacts/{contact['id']}", json={**contact, "title": "CTO"})
+    seen.append(client.get(url).headers["etag"])
+    client.post("/contacts/", json={
+        "account_id": account_id, "first_name": "John", "last_name": "Doe", "email": "john@test.com"
+    })
+    seen.append(client.get(url).headers["etag"])
+    client.delete(f"/contacts/{contact['id']}")
+    entity_cache.clear()
+    response = client.get(url, headers={"If-None-Match": seen[-1]})
+    assert response.status_code == status.HTTP_200_OK
+    seen.append(response.headers["etag"])
+    assert len(set(seen)) == 4
+
+def test_list_etag_matches_version_query(client):
+    """Test that full reads and version-only checks agree across pages"""
+    for i in range(3):
+        client.post("/accounts/", json={"name": f"Company {i}"})
+    first = client.get("/accounts/", params={"limit": 2})
+    second_url = f"/accounts/?limit=2&cursor={first.json()['next_cursor']}"
+    etag = client.get(second_url).headers["etag"]
+    assert etag != first.headers["etag"]
+    assert client.get(second_url, headers={"If-None-Match": f'W/{etag}, "other"'}).status_code == status.HTTP_304_NOT_MODIFIED
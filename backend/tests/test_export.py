@@ -0,0 +1,71 @@
+import csv
+import io
+import json
+import pytest
+from fastapi import status
+
+@pytest.fixture
+def emails(client, sample_account_data, sample_contact_data, test_db_manager):
+    """Three emails for one contact, sent on consecutive days"""
+    account_id = client.post("/accounts/", json=sample_account_data).json()["id"]
+    contact_data = sample_contact_data.copy()
+    contact_data["account_id"] = account_id
+    contact_id = client.post("/contacts/", json=contact_data).json()["id"]
+
+    with test_db_manager.get_cursor() as cur:
+        cur.execute(
+            "INSERT INTO emails (contact_id, subject, body, sent_at) "
+            "SELECT %s, 'Subject ' || n, 'Body, \"quoted\" ' || n, '2024-01-01'::timestamp + n * interval '1 day' "
+            "FROM generate_series(1, 3) n",
+            (contact_id,)
+        )
+    return contact_id
+
+def test_export_ndjson(client, emails):
+    """Test exporting emails as NDJSON, oldest first"""
+    response = client.get("/export/emails")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert [record["subject"] for record in records] == ["Subject 1", "Subject 2", "Subject 3"]
+    assert records[0]["sent_at"] == "2024-01-02T00:00:00"
+    assert records[0]["contact_id"] == emails
+
+def test_export_csv(client, emails):
+    """Test exporting emails as CSV"""
+    response = client.get("/export/emails", params={"format": "csv"})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("text/csv")
+
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == 3
+    assert set(rows[0]) == {"id", "contact_id", "subject", "body", "sent_at"}
+    assert rows[2]["body"] == 'Body, "quoted" 3'
+
+def test_export_since(client, emails):
+    """Test that since filters on the entity's timestamp column"""
+    response = client.get("/export/emails", params={"since": "2024-01-03T00:00:00"})
+    subjects = [json.loads(line)["subject"] for line in response.text.splitlines()]
+    assert subjects == ["Subject 2", "Subject 3"]
+
+def test_export_empty_table(client):
+    """Test exporting an empty table"""
+    response = client.get("/export/call-transcripts")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.text == ""
+
+def test_export_unknown_entity(client):
+    """Test exporting an entity that does not exist"""
+    response = client.get("/export/widgets")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+@pytest.mark.committed
+def test_iter_query_streams_in_batches(test_db_manager):
+    """Test that iter_query yields every row across several fetchmany batches"""
+    rows = test_db_manager.iter_query("SELECT n AS value FROM generate_series(1, 25) n ORDER BY n", batch_size=4)
+    assert [row["value"] for row in rows] == list(range(1, 26))
+
+    # The borrowed connection goes back to the pool in autocommit mode
+    with test_db_manager.connection() as conn:
+        assert conn.autocommit is True
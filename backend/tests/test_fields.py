@@ -0,0 +1,54 @@
+from fastapi import status
+
+def create_emails(client, sample_account_data, count=3):
+    account_id = client.post("/accounts/", json=sample_account_data).json()["id"]
+    contact_id = client.post("/contacts/", json={
+        "account_id": account_id, "first_name": "Jane", "last_name": "Doe", "email": "jane@test.com"
+    }).json()["id"]
+    ids = [
+        client.post("/emails/", json={"contact_id": contact_id, "subject": f"Subject {i}", "body": "x" * 5000}).json()["id"]
+        for i in range(count)
+    ]
+    return contact_id, ids
+
+def test_list_fields(client, sample_account_data):
+    """Test sparse fieldsets on entity and relationship lists"""
+    contact_id, ids = create_emails(client, sample_account_data)
+    full = client.get("/emails/")
+    sparse = client.get("/emails/", params={"fields": "subject"})
+    assert sparse.status_code == status.HTTP_200_OK
+    # id and the sort key are always included so pagination keeps working
+    assert list(sparse.json()["items"][0]) == ["id", "subject", "sent_at"]
+    assert len(sparse.content) * 10 < len(full.content)
+    assert sparse.headers["etag"] != full.headers["etag"]
+
+    pages = client.get(f"/contacts/{contact_id}/emails", params={"fields": "subject", "limit": 2}).json()
+    assert [set(item) for item in pages["items"]] == [{"id", "subject", "sent_at"}] * 2
+    rest = client.get(f"/contacts/{contact_id}/emails", params={"fields": "subject", "cursor": pages["next_cursor"]})
+    assert [item["id"] for item in rest.json()["items"]] == [ids[0]]
+    full_page = client.get(f"/contacts/{contact_id}/emails").json()["items"]
+    assert "body" in full_page[0]
+
+def test_by_id_and_lookup_fields(client, sample_account_data):
+    """Test projections on by-id reads (cached and uncached) and lookups"""
+    _, ids = create_emails(client, sample_account_data, count=2)
+    assert client.get(f"/emails/{ids[0]}", params={"fields": "subject,contact_id"}).json() == {
+        "id": ids[0], "contact_id": 1, "subject": "Subject 0"
+    }
+    client.get(f"/emails/{ids[1]}")
+    assert client.get(f"/emails/{ids[1]}", params={"fields": "subject"}).json() == {"id": ids[1], "subject": "Subject 1"}
+
+    data = client.get("/emails/", params={"ids": f"{ids[1]},{ids[0]}", "fields": "subject"}).json()
+    assert data["items"] == [{"id": ids[1], "subject": "Subject 1"}, {"id": ids[0], "subject": "Subject 0"}]
+    data = client.post("/emails/lookup", params={"fields": "sent_at"}, json={"ids": [ids[0]]}).json()
+    assert set(data["items"][0]) == {"id", "sent_at"}
+
+    response = client.get("/emails/", params={"fields": "subject,password"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert "password" in response.json()["detail"]
+
+def test_export_fields(client, sample_account_data):
+    """Test sparse fieldsets on CSV export"""
+    create_emails(client, sample_account_data, count=1)
+    response = client.get("/export/emails", params={"format": "csv", "fields": "subject"})
+    assert response.text.splitlines() == ["id,subject", "1,Subject 0"]
@@ -0,0 +1,56 @@
+import asyncio
+import os
+
+import httpx
+import pytest
+
+from api import app
+from loadtest import OPERATIONS, SUBSCRIBED_ROUTERS, compare, percentile, preflight, sample_context
+
+def test_percentile_and_compare():
+    """Test nearest-rank percentiles and the regression gate"""
+    values = [i / 1000 for i in range(1, 101)]
+    assert percentile(values, 0.5) == 0.05
+    assert percentile(values, 0.99) == 0.099
+    assert percentile([0.2], 0.95) == 0.2
+
+    settings = {"concurrency": 4}
+    baseline = {"settings": settings, "total": {"rps": 100.0},
+                "endpoints": {"GET /a": {"count": 500, "p95_ms": 10.0}, "GET /b": {"count": 500, "p95_ms": 10.0}}}
+    report = {"settings": settings, "total": {"rps": 95.0}, "endpoints": {
+        "GET /a": {"count": 500, "p95_ms": 14.0, "errors": 0},
+        "GET /b": {"count": 500, "p95_ms": 11.0, "errors": 2},
+    }}
+    assert compare(baseline, report, threshold=0.25, min_delta_ms=2) == [
+        "GET /a: p95 14.0 ms vs baseline 10.0 ms", "GET /b: 2 failed request(s)"
+    ]
+    assert compare(baseline, report, threshold=0.25, min_delta_ms=2, min_samples=1000) == ["GET /b: 2 failed request(s)"]
+    report["total"]["rps"] = 50.0
+    assert "throughput 50.0 req/s vs baseline 100.0 req/s" in compare(baseline, report, 0.25, 2)
+    assert "re-record" in compare({**baseline, "settings": {"concurrency": 8}}, report, 0.25, 2)[0]
+
+def test_operations_cover_every_router():
+    """Test that the request mix drives every module in routes/"""
+    routes_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "routes")
+    modules = {name[:-3] for name in os.listdir(routes_dir) if name.endswith(".py") and name != "__init__.py"}
+    assert {operation.router for operation in OPERATIONS} | set(SUBSCRIBED_ROUTERS) == modules
+
+@pytest.mark.committed
+def test_preflight_runs_every_operation(client, test_db, sample_account_data):
+    """Test that every operation of the mix succeeds against a small dataset"""
+    account_id = client.post("/accounts/", json=sample_account_data).json()["id"]
+    contact_id = client.post("/contacts/", json={
+        "account_id": account_id, "first_name": "Jane", "last_name": "Doe", "email": "jane@test.com"
+    }).json()["id"]
+    client.post("/emails/", json={"contact_id": contact_id, "subject": "Pricing proposal", "body": "Details"})
+    call_id = client.post("/calls/", json={"contact_id": contact_id, "call_type": "demo"}).json()["id"]
+    client.post("/call-transcripts/", json={"call_id": call_id, "transcript": "Agent: hello"})
+
+    context = sample_context(test_db)
+    assert context.words == ["pricing", "proposal"]
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as http:
+            return await preflight(http, context)
+
+    assert asyncio.run(run()) == []
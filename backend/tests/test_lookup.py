@@ -0,0 +1,40 @@
+from fastapi import status
+import lookup
+
+def test_lookup_by_ids_query(client):
+    """Test ?ids= preserves request order and reports missing ids"""
+    ids = [client.post("/accounts/", json={"name": f"Company {i}"}).json()["id"] for i in range(3)]
+    client.get(f"/accounts/{ids[1]}")  # one of them comes from the cache
+
+    response = client.get("/accounts/", params={"ids": f"{ids[2]},999,{ids[0]}", "limit": 1})
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert [item["id"] for item in data["items"]] == [ids[2], ids[0]]
+    assert data["missing"] == [999]
+
+    data = client.get("/accounts/", params=[("ids", str(ids[1])), ("ids", f"{ids[0]},{ids[1]}")]).json()
+    assert [item["id"] for item in data["items"]] == [ids[1], ids[0]]
+    assert client.get("/accounts/", params={"ids": "1,x"}).status_code == status.HTTP_400_BAD_REQUEST
+
+def test_lookup_post(client, sample_account_data, sample_call_data):
+    """Test POST /{entity}/lookup on a child entity"""
+    account_id = client.post("/accounts/", json=sample_account_data).json()["id"]
+    contact_id = client.post("/contacts/", json={
+        "account_id": account_id, "first_name": "Jane", "last_name": "Doe", "email": "jane@test.com"
+    }).json()["id"]
+    call_ids = [client.post("/calls/", json={**sample_call_data, "contact_id": contact_id}).json()["id"] for _ in range(2)]
+
+    response = client.post("/calls/lookup", json={"ids": [call_ids[1], 12345, call_ids[0]]})
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert [item["id"] for item in data["items"]] == [call_ids[1], call_ids[0]]
+    assert data["items"][0]["call_type"] == sample_call_data["call_type"]
+    assert data["missing"] == [12345]
+    assert client.post("/widgets/lookup", json={"ids": [1]}).status_code == status.HTTP_404_NOT_FOUND
+
+def test_lookup_cap(client, monkeypatch):
+    """Test that oversized batches are rejected"""
+    monkeypatch.setattr(lookup, "MAX_LOOKUP_IDS", 2)
+    response = client.post("/contacts/lookup", json={"ids": [1, 2, 3]})
+    assert response.status_code == status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    assert client.get("/contacts/", params={"ids": "1,2,2,1"}).status_code == status.HTTP_200_OK
@@ -0,0 +1,96 @@
+import psycopg2
+import pytest
+from migrate import apply_migrations, discover_migrations, migration_status, rollback_migrations
+
+@pytest.fixture
+def scratch_db(test_db):
+    """An empty database for exercising the migrations themselves"""
+    admin_config = dict(test_db, dbname="postgres")
+    scratch_config = dict(test_db, dbname=f"{test_db['dbname']}_migrations")
+
+    conn = psycopg2.connect(**admin_config)
+    conn.autocommit = True
+    conn.cursor().execute(f"DROP DATABASE IF EXISTS {scratch_config['dbname']}")
+    conn.cursor().execute(f"CREATE DATABASE {scratch_config['dbname']}")
+    yield scratch_config
+    conn.cursor().execute(f"DROP DATABASE IF EXISTS {scratch_config['dbname']}")
+    conn.close()
+
+def list_tables(config):
+    conn = psycopg2.connect(**config)
+    try:
+        cur = conn.cursor()
+        cur.execute("SELECT tablename FROM pg_tables WHERE schemaname = 'public' ORDER BY tablename")
+        return [row[0] for row in cur.fetchall()]
+    finally:
+        conn.close()
+
+def test_migrations_are_numbered_and_reversible():
+    """Test that every migration has a unique version and a down script"""
+    migrations = discover_migrations()
+    versions = [migration.version for migration in migrations]
+    assert versions == sorted(set(versions))
+    assert all(migration.down_path for migration in migrations)
+
+def test_apply_and_roll_back(scratch_db):
+    """Test applying, rolling back and re-applying every migration"""
+    latest = discover_migrations()[-1].version
+
+    applied = apply_migrations(scratch_db)
+    assert [migration.version for migration in applied][-1] == latest
+    assert apply_migrations(scratch_db) == []
+    assert all(row["applied"] for row in migration_status(scratch_db))
+    assert "accounts" in list_tables(scratch_db)
+
+    # Default rollback only undoes the latest migration
+    assert [migration.version for migration in rollback_migrations(scratch_db)] == [latest]
+    assert not migration_status(scratch_db)[-1]["applied"]
+
+    rollback_migrations(scratch_db, target=0)
+    assert list_tables(scratch_db) == ["schema_migrations"]
+
+    apply_migrations(scratch_db, target=1)
+    assert [row["applied"] for row in migration_status(scratch_db)][:2] == [True, False]
+    apply_migrations(scratch_db)
+    assert all(row["applied"] for row in migration_status(scratch_db))
+
+def test_invalid_index_is_rebuilt(scratch_db):
+    """Test that an index left invalid by a failed concurrent build is rebuilt on the next run"""
+    apply_migrations(scratch_db, target=1)
+    conn = psycopg2.connect(**scratch_db)
+    conn.autocommit = True
+    cur = conn.cursor()
+    cur.execute("INSERT INTO accounts (name) VALUES ('Twin'), ('Twin')")
+    with pytest.raises(psycopg2.errors.UniqueViolation):
+        cur.execute("CREATE UNIQUE INDEX CONCURRENTLY accounts_created_at_id_idx ON accounts (name)")
+
+    apply_migrations(scratch_db, target=2)
+    cur.execute(
+        "SELECT indisvalid, pg_get_indexdef(indexrelid) FROM pg_index "
+        "WHERE indexrelid = 'accounts_created_at_id_idx'::regclass"
+    )
+    valid, definition = cur.fetchone()
+    conn.close()
+    assert valid and "created_at DESC, id DESC" in definition
+
+@pytest.mark.parametrize("query, index", [
+    ("SELECT * FROM contacts WHERE account_id = 1 ORDER BY created_at DESC, id DESC LIMIT 51",
+     "contacts_account_id_created_at_id_idx"),
+    ("SELECT * FROM emails WHERE contact_id = 1 ORDER BY sent_at DESC, id DESC LIMIT 51",
+     "emails_contact_id_sent_at_id_idx"),
+    ("SELECT * FROM calls WHERE contact_id = 1 ORDER BY created_at DESC, id DESC LIMIT 51",
+     "calls_contact_id_created_at_id_idx"),
+    ("SELECT * FROM call_transcripts WHERE call_id = 1", "call_transcripts_call_id_idx"),
+    ("SELECT * FROM emails WHERE (sent_at, id) < ('2024-01-01'::timestamp, 10) ORDER BY sent_at DESC, id DESC LIMIT 51",
+     "emails_sent_at_id_idx"),
+])
+def test_queries_use_indexes(test_db_manager, query, index):
+    """Test that list and relationship queries are served by an index"""
+    with test_db_manager.transaction() as cur:
+        # Empty test tables would otherwise always favour a sequential scan
+        cur.execute("SET LOCAL enable_seqscan = off")
+        cur.execute("SET LOCAL enable_bitmapscan = off")
+        cur.execute(f"EXPLAIN {query}")
+        plan = "\n".join(row[0] for row in cur.fetchall())
+    assert index in plan
+    assert "Sort" not in plan
@@ -0,0 +1,67 @@
+import pytest
+from fastapi import status
+from pagination import MAX_PAGE_SIZE, decode_cursor, encode_cursor
+
+def walk_pages(client, url, limit):
+    """Follow next_cursor until exhausted and return the pages"""
+    pages = []
+    cursor = None
+    while True:
+        params = {"limit": limit}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get(url, params=params)
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        pages.append([item["id"] for item in data["items"]])
+        cursor = data["next_cursor"]
+        if cursor is None:
+            return pages
+
+def test_cursor_round_trip():
+    """Test that cursors decode back to their keyset position"""
+    from datetime import datetime
+    sort_value = datetime(2024, 5, 1, 12, 30, 15, 123456)
+    assert decode_cursor(encode_cursor(sort_value, 42)) == (sort_value, 42)
+
+def test_accounts_pagination(client):
+    """Test walking the account list page by page"""
+    ids = [client.post("/accounts/", json={"name": f"Company {i}"}).json()["id"] for i in range(5)]
+
+    pages = walk_pages(client, "/accounts/", limit=2)
+    assert [len(page) for page in pages] == [2, 2, 1]
+    assert [account_id for page in pages for account_id in page] == ids[::-1]
+
+def test_pagination_breaks_timestamp_ties_by_id(client, test_db_manager):
+    """Test that rows sharing created_at are neither skipped nor repeated"""
+    with test_db_manager.get_cursor() as cur:
+        cur.execute("INSERT INTO accounts (name, created_at) SELECT 'Tied ' || n, '2024-01-01' FROM generate_series(1, 7) n")
+
+    pages = walk_pages(client, "/accounts/", limit=3)
+    seen = [account_id for page in pages for account_id in page]
+    assert seen == sorted(seen, reverse=True)
+    assert len(set(seen)) == 7
+
+def test_relationship_pagination(client, sample_account_data, sample_contact_data):
+    """Test that relationship lists are paginated too"""
+    account_id = client.post("/accounts/", json=sample_account_data).json()["id"]
+    for i in range(3):
+        contact_data = sample_contact_data.copy()
+        contact_data["account_id"] = account_id
+        contact_data["email"] = f"contact{i}@test.com"
+        client.post("/contacts/", json=contact_data)
+
+    pages = walk_pages(client, f"/accounts/{account_id}/contacts", limit=2)
+    assert [len(page) for page in pages] == [2, 1]
+
+def test_invalid_cursor(client):
+    """Test that a malformed cursor is rejected"""
+    response = client.get("/emails/", params={"cursor": "not-a-cursor"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.json()["detail"] == "Invalid cursor"
+
+@pytest.mark.parametrize("limit", [0, MAX_PAGE_SIZE + 1])
+def test_limit_out_of_range(client, limit):
+    """Test that page sizes outside the allowed range are rejected"""
+    response = client.get("/calls/", params={"limit": limit})
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
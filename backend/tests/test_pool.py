@@ -0,0 +1,92 @@
+import pytest
+from database import DatabaseManager
+from pool import ConnectionPool, PoolTimeoutError
+
+def test_pool_reuses_connections(test_db):
+    """Test that returned connections are handed out again"""
+    pool = ConnectionPool(test_db, min_size=0, max_size=2)
+    try:
+        with pool.connection() as conn:
+            first_pid = conn.get_backend_pid()
+        with pool.connection() as conn:
+            assert conn.get_backend_pid() == first_pid
+
+        stats = pool.stats()
+        assert stats["connections_created"] == 1
+        assert stats["acquired"] == 2
+        assert stats["idle"] == 1
+        assert stats["in_use"] == 0
+    finally:
+        pool.close()
+
+def test_pool_open_warms_min_size(test_db):
+    """Test that open() creates the minimum number of connections"""
+    pool = ConnectionPool(test_db, min_size=2, max_size=4)
+    try:
+        pool.open()
+        assert pool.stats()["size"] == 2
+        assert pool.stats()["idle"] == 2
+    finally:
+        pool.close()
+
+def test_pool_acquire_timeout(test_db):
+    """Test that acquiring from an exhausted pool times out"""
+    pool = ConnectionPool(test_db, min_size=0, max_size=1, timeout=0.1)
+    try:
+        conn = pool.getconn()
+        with pytest.raises(PoolTimeoutError):
+            pool.getconn()
+        assert pool.stats()["timeouts"] == 1
+        pool.putconn(conn)
+    finally:
+        pool.close()
+
+def test_pool_replaces_dead_connections(test_db):
+    """Test that a connection killed while idle is health-checked and replaced"""
+    pool = ConnectionPool(test_db, min_size=0, max_size=2, health_check_interval=0)
+    try:
+        with pool.connection() as conn:
+            dead_pid = conn.get_backend_pid()
+
+        # Terminate the idle backend from another session
+        with DatabaseManager(test_db, {"enabled": False}).get_cursor() as cur:
+            cur.execute("SELECT pg_terminate_backend(%s)", (dead_pid,))
+
+        with pool.connection() as conn:
+            assert conn.get_backend_pid() != dead_pid
+        assert pool.stats()["health_checks_failed"] == 1
+    finally:
+        pool.close()
+
+def test_pool_rolls_back_open_transactions(test_db):
+    """Test that a connection returned mid-transaction is reset"""
+    pool = ConnectionPool(test_db, min_size=0, max_size=1)
+    try:
+        conn = pool.getconn()
+        conn.autocommit = False
+        conn.cursor().execute("SELECT 1")
+        pool.putconn(conn)
+
+        with pool.connection() as conn:
+            assert conn.autocommit is True
+            assert conn.info.transaction_status == 0
+    finally:
+        pool.close()
+
+@pytest.mark.committed
+def test_database_manager_uses_pool(test_db_manager):
+    """Test that execute_* helpers borrow pooled connections"""
+    test_db_manager.execute_query("SELECT 1")
+    test_db_manager.execute_single("SELECT 1")
+
+    stats = test_db_manager.pool_stats()
+    assert stats["connections_created"] == 1
+    assert stats["acquired"] >= 2
+
+@pytest.mark.committed
+def test_health_reports_pool_stats(client):
+    """Test that /health exposes pool statistics"""
+    client.get("/accounts/")
+    data = client.get("/health").json()
+    assert data["db_pool"]["max_size"] >= 1
+    assert data["db_pool"]["acquired"] >= 1
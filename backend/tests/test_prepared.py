@@ -0,0 +1,51 @@
+from database import DatabaseManager
+from prepared import prepared_stats, server_placeholders
+
+def test_server_placeholders():
+    """Test numbering psycopg2 placeholders for PREPARE"""
+    assert server_placeholders("SELECT * FROM t WHERE a = %s AND b LIKE 'x%%' AND c = %s") == (
+        "SELECT * FROM t WHERE a = $1 AND b LIKE 'x%' AND c = $2"
+    )
+    assert server_placeholders("SELECT %(name)s") is None
+
+def test_prepared_statement_cache(test_db):
+    """Test preparing hot statements, LRU eviction and the fallbacks"""
+    manager = DatabaseManager(test_db, {"enabled": True, "min_size": 1, "max_size": 1}, prepared_statements=True)
+    prepared_stats.clear()
+    try:
+        manager.execute_delete("CREATE TEMP TABLE items (id int, name text)")
+        manager.execute_delete("INSERT INTO items VALUES (1, 'one'), (2, 'two')")
+        query = "SELECT * FROM items WHERE id = %s"
+        results = [manager.execute_single(query, (i,))[0] for i in (1, 2, 1)]
+        assert results == [(1, "one"), (2, "two"), (1, "one")]
+        stats = prepared_stats.snapshot()
+        assert (stats["prepared"], stats["hits"], stats["misses"]) == (1, 1, 4)
+
+        # A column added under SELECT * forces a fresh plan
+        manager.execute_delete("ALTER TABLE items ADD COLUMN extra int DEFAULT 0")
+        row, cur = manager.execute_single(query, (2,))
+        assert row == (2, "two", 0)
+
+        # Postgres can't infer the parameter type here, so it runs unprepared
+        for _ in range(2):
+            assert manager.execute_single("SELECT %s IS NULL", (None,))[0] == (True,)
+        assert prepared_stats.snapshot()["failures"] == 1
+
+        with manager.connection() as conn:
+            conn.max_prepared = 1
+        for statement in ("SELECT name FROM items WHERE id = %s", "SELECT id FROM items WHERE name = %s"):
+            for _ in range(2):
+                manager.execute_single(statement, ("1",))
+        assert prepared_stats.snapshot()["evictions"] == 1
+        rows, _ = manager.execute_query("SELECT statement FROM pg_prepared_statements")
+        # Only the most recent statement is still prepared on the server
+        assert [row[0].split(" AS ")[1] for row in rows] == ["SELECT id FROM items WHERE name = $1"]
+
+        # Transactions run their statements unprepared
+        before = prepared_stats.snapshot()
+        with manager.transaction() as cur:
+            cur.execute(query, (1,))
+        assert prepared_stats.snapshot() == before
+    finally:
+        manager.close()
+        prepared_stats.clear()
@@ -16,7 +16,7 @@ def test_get_account_contacts(client, sample_account_data, sample_contact_data):
     response = client.get(f"/accounts/{account_id}/contacts")
     assert response.status_code == status.HTTP_200_OK
     
-    data = response.json()
+    data = response.json()["items"]
     assert len(data) == 1
     assert data[0]["account_id"] == account_id
     assert data[0]["first_name"] == sample_contact_data["first_name"]
@@ -30,7 +30,7 @@ def test_get_account_contacts_empty(client, sample_account_data):
     # Get contacts for the account
     response = client.get(f"/accounts/{account_id}/contacts")
     assert response.status_code == status.HTTP_200_OK
-    assert response.json() == []
+    assert response.json()["items"] == []
 
 def test_get_contact_emails(client, sample_account_data, sample_contact_data, sample_email_data):
     """Test getting all emails for a contact"""
@@ -53,7 +53,7 @@ def test_get_contact_emails(client, sample_account_data, sample_contact_data, sa
     response = client.get(f"/contacts/{contact_id}/emails")
     assert response.status_code == status.HTTP_200_OK
     
-    data = response.json()
+    data = response.json()["items"]
     assert len(data) == 1
     assert data[0]["contact_id"] == contact_id
     assert data[0]["subject"] == sample_email_data["subject"]
@@ -79,7 +79,7 @@ def test_get_contact_calls(client, sample_account_data, sample_contact_data, sam
     response = client.get(f"/contacts/{contact_id}/calls")
     assert response.status_code == status.HTTP_200_OK
     
-    data = response.json()
+    data = response.json()["items"]
     assert len(data) == 1
     assert data[0]["contact_id"] == contact_id
     assert data[0]["call_type"] == sample_call_data["call_type"]
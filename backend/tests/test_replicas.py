@@ -0,0 +1,71 @@
+import psycopg2
+import pytest
+
+from database import db_manager
+from migrate import apply_migrations
+from replicas import STICKY_COOKIE, parse_replicas
+
+@pytest.fixture
+def replica_db(test_db):
+    """A second database standing in for a read replica, with a row the primary doesn't have"""
+    config = {**test_db, "dbname": f"{test_db['dbname']}_replica"}
+    admin = psycopg2.connect(**{**test_db, "dbname": "postgres"})
+    admin.autocommit = True
+    with admin.cursor() as cur:
+        cur.execute(f"DROP DATABASE IF EXISTS {config['dbname']}")
+        cur.execute(f"CREATE DATABASE {config['dbname']}")
+    apply_migrations(config)
+    conn = psycopg2.connect(**config)
+    with conn, conn.cursor() as cur:
+        cur.execute("INSERT INTO accounts (name) VALUES ('Replica Co')")
+    conn.close()
+    yield config
+    with admin.cursor() as cur:
+        cur.execute(f"DROP DATABASE IF EXISTS {config['dbname']} WITH (FORCE)")
+    admin.close()
+
+def test_parse_replicas():
+    """Test that replica DSNs inherit unset settings from the primary and may override the timeouts"""
+    primary = {"host": "db", "port": 5432, "user": "crm", "password": "secret", "dbname": "crm"}
+    timeouts = {"connect_timeout": 3, "options": "-c statement_timeout=30000"}
+    assert parse_replicas("host=r1 port=5433, postgresql://r2/crm_ro?connect_timeout=10", primary) == [
+        {**primary, **timeouts, "host": "r1", "port": 5433},
+        {**primary, **timeouts, "host": "r2", "dbname": "crm_ro", "connect_timeout": 10},
+    ]
+
+@pytest.mark.committed
+def test_read_replica_routing(client, replica_db, sample_account_data):
+    """Test replica reads, read-your-writes stickiness and ejection of a dead replica"""
+    dead = {**replica_db, "port": 1}
+    db_manager.set_replicas([dead, replica_db])
+    try:
+        response = client.post("/accounts/", json=sample_account_data)
+        assert STICKY_COOKIE in response.cookies
+        writer_cookies = dict(client.cookies)
+
+        # Another client's by-id read fills the cache, so it comes from the
+        # primary rather than the replica's stale row...
+        client.cookies.clear()
+        assert client.get("/accounts/1").json()["name"] == "Test Company"
+        # ...and the writer's cache hit is its own write
+        assert client.get("/accounts/1", cookies=writer_cookies).json()["name"] == "Test Company"
+
+        # Uncached reads by everyone else go to a replica
+        assert [item["name"] for item in client.get("/accounts/").json()["items"]] == ["Replica Co"]
+        assert [item["name"] for item in client.get("/accounts/", cookies=writer_cookies).json()["items"]] == ["Test Company"]
+
+        stats = client.get("/health").json()["db_replicas"]
+        assert [(replica["healthy"], replica["failures"]) for replica in stats["replicas"]] == [(False, 1), (True, 0)]
+        assert stats["replicas"][1]["reads"] >= 1
+
+        # A read cancelled by the replica's statement_timeout is retried on the primary
+        db_manager.set_replicas([{**replica_db, "options": "-c statement_timeout=1"}])
+        rows, _ = db_manager.execute_query("SELECT (SELECT name FROM accounts LIMIT 1), pg_sleep(0.1)")
+        assert rows[0][0] == "Test Company"
+        assert client.get("/health").json()["db_replicas"]["replicas"][0]["healthy"]
+
+        # With every replica down, reads fall back to the primary
+        db_manager.set_replicas([dead])
+        assert [item["name"] for item in client.get("/accounts/").json()["items"]] == ["Test Company"]
+    finally:
+        db_manager.set_replicas([])
@@ -0,0 +1,59 @@
+from fastapi import status
+
+def create_searchable_data(client, sample_account_data):
+    account_id = client.post("/accounts/", json=sample_account_data).json()["id"]
+    contact_id = client.post("/contacts/", json={
+        "account_id": account_id, "first_name": "Jane", "last_name": "Doe", "email": "jane@test.com"
+    }).json()["id"]
+    emails = [
+        client.post("/emails/", json={"contact_id": contact_id, "subject": subject, "body": body}).json()["id"]
+        for subject, body in [
+            ("Renewal pricing", "Can we discuss the renewal discount before Friday?"),
+            ("Lunch", "Are you free for lunch next week?"),
+            ("Security review", "Our security team needs the pricing sheet and the SOC 2 report."),
+        ]
+    ]
+    call_id = client.post("/calls/", json={"contact_id": contact_id, "call_type": "negotiation"}).json()["id"]
+    client.post("/call-transcripts/", json={
+        "call_id": call_id, "transcript": "Customer said the pricing is too high compared to the competitor."
+    })
+    return account_id, contact_id, emails, call_id
+
+def test_search_ranked_hits_with_context(client, sample_account_data):
+    """Test ranking, highlighting and account/contact context"""
+    account_id, contact_id, emails, call_id = create_searchable_data(client, sample_account_data)
+    response = client.get("/search", params={"q": "pricing"})
+    assert response.status_code == status.HTTP_200_OK
+
+    hits = response.json()["items"]
+    assert len(hits) == 3
+    # The subject match is weighted above body and transcript matches
+    assert (hits[0]["kind"], hits[0]["id"]) == ("email", emails[0])
+    assert hits[0]["title"] == "Renewal <mark>pricing</mark>"
+    assert hits[0]["contact_name"] == "Jane Doe"
+    assert hits[0]["account_id"] == account_id
+    transcript = next(hit for hit in hits if hit["kind"] == "transcript")
+    assert transcript["call_id"] == call_id
+    assert "<mark>pricing</mark>" in transcript["highlight"]
+
+    assert client.get("/search", params={"q": "pricing -security", "kinds": "email"}).json()["items"][0]["id"] == emails[0]
+    assert client.get("/search", params={"q": "pricing", "contact_id": contact_id + 1}).json()["items"] == []
+
+def test_search_pagination_and_updates(client, sample_account_data):
+    """Test paging through hits and that updates are searchable immediately"""
+    _, contact_id, emails, _ = create_searchable_data(client, sample_account_data)
+    full = [(hit["kind"], hit["id"]) for hit in client.get("/search", params={"q": "pricing"}).json()["items"]]
+    walked, cursor = [], None
+    while True:
+        params = {"q": "pricing", "limit": 1, **({"cursor": cursor} if cursor else {})}
+        data = client.get("/search", params=params).json()
+        walked += [(hit["kind"], hit["id"]) for hit in data["items"]]
+        cursor = data["next_cursor"]
+        if cursor is None:
+            break
+    assert walked == full
+
+    client.put(f"/emails/{emails[1]}", json={"contact_id": contact_id, "subject": "Lunch", "body": "Pricing over lunch?"})
+    assert len(client.get("/search", params={"q": "pricing"}).json()["items"]) == 4
+    assert "search_vector" not in client.get(f"/emails/{emails[1]}").json()
+    assert client.get("/search", params={"q": ""}).status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
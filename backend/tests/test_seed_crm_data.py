@@ -0,0 +1,50 @@
+import random
+from datetime import datetime
+import seed_crm_data
+
+def make_plan(**overrides):
+    plan = {
+        "seed": 7,
+        "sizes": {"accounts": 5, "contacts": 20, "emails": 50, "calls": 30},
+        "skew": 1.5,
+        "days": 30,
+        "transcript_ratio": 0.5,
+        "end": datetime(2025, 1, 1),
+        "base": dict.fromkeys(seed_crm_data.TABLE_COLUMNS, 0),
+    }
+    plan.update(overrides)
+    return plan
+
+def test_skewed_index_concentrates_on_low_indexes():
+    """Test that higher skew puts more children on the first parents"""
+    def share_of_first_tenth(skew):
+        rng = random.Random(1)
+        picks = [seed_crm_data.skewed_index(rng, 100, skew) for _ in range(10000)]
+        assert all(0 <= pick < 100 for pick in picks)
+        return sum(pick < 10 for pick in picks) / len(picks)
+
+    assert 0.08 < share_of_first_tenth(1.0) < 0.12
+    assert share_of_first_tenth(3.0) > 0.4
+
+def test_chunks_are_deterministic():
+    """Test that a chunk depends only on the seed and its position"""
+    seed_crm_data._init_worker(7)
+    plan = make_plan()
+    first = seed_crm_data.generate_chunk(("calls", 0, 0, 30, plan))
+
+    seed_crm_data._init_worker(7)
+    assert seed_crm_data.generate_chunk(("calls", 0, 0, 30, plan)) == first
+
+    (calls, _, call_count), (transcripts, _, transcript_count) = first
+    assert (calls, call_count) == ("calls", 30)
+    assert transcripts == "call_transcripts"
+    assert 0 < transcript_count < 30
+
+def test_build_tasks_orders_parents_first():
+    """Test that tasks cover every row and parents precede children"""
+    plan = make_plan()
+    tasks = seed_crm_data.build_tasks(plan["sizes"], 8, plan)
+    tables = [task[0] for task in tasks]
+    assert tables == sorted(tables, key=["accounts", "contacts", "emails", "calls"].index)
+    for table, total in plan["sizes"].items():
+        assert sum(task[3] for task in tasks if task[0] == table) == total
@@ -0,0 +1,32 @@
+import json
+from datetime import datetime
+from database import compile_row_mapper
+from models import Account
+from responses import dumps
+
+def test_row_mapper_is_cached_per_shape():
+    """Test that mappers are compiled once per column tuple"""
+    mapper = compile_row_mapper(("id", "name"))
+    assert compile_row_mapper(("id", "name")) is mapper
+    assert compile_row_mapper(("name", "id")) is not mapper
+    assert mapper((1, "Acme")) == {"id": 1, "name": "Acme"}
+
+def test_row_mapper_handles_awkward_column_names():
+    """Test that column names are quoted safely in the generated code"""
+    mapper = compile_row_mapper(("?column?", "it's", 'say "hi"'))
+    assert mapper((1, 2, 3)) == {"?column?": 1, "it's": 2, 'say "hi"': 3}
+
+def test_fast_json_matches_pydantic_output():
+    """Test that the fast path renders rows exactly like the response models"""
+    row = {
+        "id": 1, "name": "Acme", "industry": None, "plan": "Pro", "status": "Active",
+        "created_at": datetime(2024, 5, 1, 12, 30, 15, 123456),
+    }
+    assert json.loads(dumps(row)) == json.loads(Account(**row).model_dump_json())
+
+def test_fast_path_response(client, sample_account_data):
+    """Test that by-id and list responses keep the model's fields"""
+    created = client.post("/accounts/", json=sample_account_data).json()
+
+    assert client.get(f"/accounts/{created['id']}").json() == created
+    assert client.get("/accounts/").json()["items"] == [created]
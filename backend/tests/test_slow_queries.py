@@ -0,0 +1,41 @@
+import pytest
+from fastapi import status
+
+from slow_queries import is_read_only, param_shape, slow_query_log
+
+@pytest.mark.committed
+def test_slow_query_log(client, sample_account_data):
+    """Test capturing slow statements with their route, parameter shape and plan"""
+    settings = slow_query_log.settings()
+    try:
+        response = client.patch("/admin/slow-queries", json={"enabled": True, "threshold_ms": 0, "sample_rate": 1})
+        assert response.json()["threshold_ms"] == 0
+        client.delete("/admin/slow-queries")
+
+        account_id = client.post("/accounts/", json=sample_account_data).json()["id"]
+        client.get(f"/accounts/{account_id}")
+        slow_query_log.wait_for_plans()
+        client.patch("/admin/slow-queries", json={"enabled": False})
+
+        queries = client.get("/admin/slow-queries").json()["queries"]
+        by_route = {query["route"]: query for query in queries}
+        read = by_route["GET /accounts/{account_id}"]
+        assert read["statement"].startswith("SELECT") and read["params"] == ["int"]
+        assert read["plan_status"] == "captured" and "actual time" in read["plan"] and read["plan_analyzed"]
+        insert = by_route["POST /accounts/"]
+        assert insert["params"] == ["str[12]", "str[8]", "str[10]", "str[6]"]
+        # Writes are only EXPLAINed, never run again
+        assert insert["plan_status"] == "captured" and "actual time" not in insert["plan"] and not insert["plan_analyzed"]
+        assert len(client.get("/accounts/").json()["items"]) == 1
+    finally:
+        slow_query_log.configure(**{name: settings[name] for name in ("enabled", "threshold_ms", "sample_rate")})
+        slow_query_log.clear()
+
+def test_slow_query_settings_validation(client):
+    """Test that out-of-range settings are rejected"""
+    response = client.patch("/admin/slow-queries", json={"sample_rate": 2})
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+    assert param_shape({"ids": [1, 2, 3], "q": None}) == {"ids": "list[3]", "q": "NoneType"}
+    assert is_read_only("WITH recent AS (SELECT 1) SELECT * FROM recent")
+    assert not is_read_only("WITH gone AS (DELETE FROM calls RETURNING id) SELECT count(*) FROM gone")
+    assert not is_read_only("SELECT * FROM accounts WHERE id = 1 FOR UPDATE")
@@ -0,0 +1,101 @@
+import asyncio
+import json
+import psycopg2
+import pytest
+from fastapi import status
+
+from api import app
+
+async def _read_stream(query: str, count: int, write=None, last_event_id=None):
+    """Collect SSE messages from /stream until ``count`` of them arrived, running ``write`` once it is open"""
+    headers = [(b"last-event-id", str(last_event_id).encode())] if last_event_id is not None else []
+    scope = {
+        "type": "http", "http_version": "1.1", "method": "GET", "scheme": "http", "path": "/stream",
+        "raw_path": b"/stream", "query_string": query.encode(), "headers": headers,
+        "client": ("test", 1), "server": ("test", 80), "root_path": "",
+    }
+    messages = []
+    done = asyncio.Event()
+    buffer = ""
+    requested = False
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal buffer
+        if message["type"] == "http.response.start" and write is not None:
+            asyncio.get_running_loop().run_in_executor(None, write)
+        if message["type"] == "http.response.body":
+            buffer += message.get("body", b"").decode()
+            while "\n\n" in buffer:
+                block, buffer = buffer.split("\n\n", 1)
+                fields = dict(line.split(":", 1) for line in block.split("\n") if not line.startswith(":"))
+                if "event" in fields:
+                    messages.append((fields["event"].strip(), json.loads(fields["data"])))
+            if len(messages) >= count:
+                done.set()
+
+    await asyncio.wait_for(app(scope, receive, send), 10)
+    return messages
+
+@pytest.mark.committed
+def test_stream_filters_live_changes(client, sample_account_data):
+    """Test that subscribers only get the changes matching their entity and account filters"""
+    account_id = client.post("/accounts/", json=sample_account_data).json()["id"]
+    other_id = client.post("/accounts/", json={"name": "Other Co"}).json()["id"]
+
+    def write():
+        client.post("/contacts/", json={"account_id": other_id, "first_name": "A", "last_name": "B", "email": "a@test.com"})
+        contact_id = client.post("/contacts/", json={
+            "account_id": account_id, "first_name": "C", "last_name": "D", "email": "c@test.com"
+        }).json()["id"]
+        client.post("/calls/", json={"contact_id": contact_id, "call_type": "demo"})
+        client.put(f"/contacts/{contact_id}", json={
+            "account_id": account_id, "first_name": "C", "last_name": "E", "email": "c@test.com"
+        })
+
+    messages = asyncio.run(_read_stream(f"entities=contacts&account_id={account_id}", 2, write))
+    assert [(event, data["entity"], data["op"], data["account_id"]) for event, data in messages] == [
+        ("change", "contacts", "insert", account_id),
+        ("change", "contacts", "update", account_id),
+    ]
+
+    response = client.get("/stream", params={"entities": "contacts,widgets"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+@pytest.mark.committed
+def test_stream_resumes_from_last_event_id(client, sample_account_data):
+    """Test replay after Last-Event-ID, and a reset for ids no longer in the log"""
+    def create_account():
+        client.post("/accounts/", json=sample_account_data)
+
+    [(_, first)] = asyncio.run(_read_stream("entities=accounts", 1, create_account))
+
+    # Written while the client is away
+    names = [client.post("/accounts/", json={"name": f"Missed {i}"}).json()["id"] for i in range(2)]
+
+    messages = asyncio.run(_read_stream("entities=accounts", 2, last_event_id=first["id"]))
+    assert [data["entity_id"] for _, data in messages] == names
+
+    messages = asyncio.run(_read_stream("", 1, last_event_id=10**12))
+    assert messages[0][0] == "reset"
+
+@pytest.mark.committed
+def test_stream_resets_after_bulk_load(client, test_db, sample_account_data):
+    """Test that sessions with the change feed off notify nothing, and a reset notification reaches subscribers"""
+    def bulk_load():
+        conn = psycopg2.connect(**test_db)
+        with conn, conn.cursor() as cur:
+            cur.execute("SET crm.change_feed = off")
+            cur.execute("INSERT INTO accounts (name) VALUES ('Seeded Co')")
+            cur.execute("SELECT pg_notify('crm_changes', %s)", (json.dumps({"reset": "bulk load"}),))
+        conn.close()
+
+    messages = asyncio.run(_read_stream("", 1, bulk_load))
+    assert messages == [("reset", {"reason": "events may have been missed"})]
@@ -0,0 +1,72 @@
+from fastapi import status
+
+def create_account_activity(client, test_db_manager, sample_account_data):
+    """Two contacts with emails, calls and a transcript, several at the same instant"""
+    account_id = client.post("/accounts/", json=sample_account_data).json()["id"]
+    contacts = [
+        client.post("/contacts/", json={
+            "account_id": account_id, "first_name": name, "last_name": "Doe", "email": f"{name}@test.com"
+        }).json()["id"]
+        for name in ("jane", "john")
+    ]
+    with test_db_manager.get_cursor() as cur:
+        cur.execute(
+            "INSERT INTO emails (contact_id, subject, body, sent_at) VALUES "
+            "(%s, 'Intro', 'Hello there', '2024-01-01 10:00'), (%s, 'Pricing', 'See attached', '2024-01-03 10:00'), "
+            "(%s, 'Same time', 'Tie', '2024-01-02 09:00')",
+            (contacts[0], contacts[1], contacts[0])
+        )
+        cur.execute(
+            "INSERT INTO calls (contact_id, call_type, duration, outcome, created_at) VALUES "
+            "(%s, 'demo', 30, 'Interested', '2024-01-02 09:00') RETURNING id",
+            (contacts[1],)
+        )
+        call_id = cur.fetchone()[0]
+        cur.execute(
+            "INSERT INTO call_transcripts (call_id, transcript, created_at) VALUES (%s, %s, '2024-01-02 09:30')",
+            (call_id, "word " * 100)
+        )
+    # Activity of another account must not leak in
+    other = client.post("/accounts/", json={"name": "Other"}).json()["id"]
+    other_contact = client.post("/contacts/", json={
+        "account_id": other, "first_name": "x", "last_name": "y", "email": "x@test.com"
+    }).json()["id"]
+    client.post("/emails/", json={"contact_id": other_contact, "subject": "Elsewhere"})
+    return account_id
+
+def test_account_timeline_merges_events(client, test_db_manager, sample_account_data):
+    """Test the merged, newest-first feed across contacts"""
+    account_id = create_account_activity(client, test_db_manager, sample_account_data)
+    response = client.get(f"/accounts/{account_id}/timeline")
+    assert response.status_code == status.HTTP_200_OK
+
+    items = response.json()["items"]
+    assert [(item["kind"], item["summary"]) for item in items] == [
+        ("email", "Pricing"),
+        ("transcript", "demo"),
+        ("email", "Same time"),
+        ("call", "demo"),
+        ("email", "Intro"),
+    ]
+    assert items[0]["contact_name"] == "john Doe"
+    assert items[1]["call_id"] == items[3]["id"]
+    assert len(items[1]["snippet"]) == 200
+
+def test_account_timeline_pagination_and_kinds(client, test_db_manager, sample_account_data):
+    """Test walking the feed one event per page and filtering by kind"""
+    account_id = create_account_activity(client, test_db_manager, sample_account_data)
+    url = f"/accounts/{account_id}/timeline"
+    full = [(item["kind"], item["id"]) for item in client.get(url).json()["items"]]
+
+    walked, cursor = [], None
+    while True:
+        data = client.get(url, params={"limit": 1, **({"cursor": cursor} if cursor else {})}).json()
+        walked += [(item["kind"], item["id"]) for item in data["items"]]
+        cursor = data["next_cursor"]
+        if cursor is None:
+            break
+    assert walked == full
+
+    kinds = client.get(url, params={"kinds": ["call", "transcript"]}).json()["items"]
+    assert [item["kind"] for item in kinds] == ["transcript", "call"]
+    assert client.get(url, params={"cursor": "bad"}).status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,138 @@
+import hashlib
+import json
+from contextlib import contextmanager
+
+from fastapi import status
+
+import transcript_storage
+from database import db_manager
+
+def create_call(client, sample_account_data):
+    account_id = client.post("/accounts/", json=sample_account_data).json()["id"]
+    contact_id = client.post("/contacts/", json={
+        "account_id": account_id, "first_name": "Jane", "last_name": "Doe", "email": "jane@test.com"
+    }).json()["id"]
+    return client.post("/calls/", json={"contact_id": contact_id, "call_type": "demo"}).json()["id"]
+
+def transcript_lines(count):
+    return [f"[{i:05d}] Agent: Thanks for joining, let's review pricing — ünïcode ok.\n".encode() for i in range(count)]
+
+def test_streamed_upload_and_download(client, sample_account_data, monkeypatch):
+    """Test chunked upload, compressed chunk storage, previews and streaming download"""
+    monkeypatch.setattr(transcript_storage, "CHUNK_BYTES", 512)
+    monkeypatch.setattr(transcript_storage, "INLINE_CHARS", 1000)
+    call_id = create_call(client, sample_account_data)
+    lines = transcript_lines(2000)
+    body = b"".join(lines)
+
+    response = client.post("/call-transcripts/upload", params={"call_id": call_id}, content=iter(lines))
+    assert response.status_code == status.HTTP_200_OK
+    created = response.json()
+    assert created["compression"] == "gzip"
+    assert created["byte_length"] == len(body)
+    assert created["checksum"] == hashlib.sha256(body).hexdigest()
+    assert created["stored_length"] * 10 < len(body)
+    assert created["transcript"] == body.decode()[:1000]
+
+    url = f"/call-transcripts/{created['id']}/content"
+    download = client.get(url, headers={"Accept-Encoding": "identity"})
+    assert download.content == body
+    assert download.headers["content-length"] == str(len(body))
+    revalidated = client.get(url, headers={"Accept-Encoding": "identity", "If-None-Match": download.headers["etag"]})
+    assert revalidated.status_code == status.HTTP_304_NOT_MODIFIED
+
+    # Clients that accept gzip get the stored bytes as they are
+    raw = client.get(url, headers={"Accept-Encoding": "gzip"})
+    assert raw.headers["content-encoding"] == "gzip"
+    assert raw.headers["content-length"] == str(created["stored_length"])
+    assert raw.content == body
+
+    listed = client.get("/call-transcripts/").json()["items"][0]
+    assert set(listed) == {"id", "call_id", "preview", "byte_length", "compression", "created_at"}
+    assert listed["preview"] == body.decode()[:200]
+    assert client.get("/call-transcripts/", params={"fields": "transcript"}).status_code == status.HTTP_400_BAD_REQUEST
+
+def test_reads_of_a_truncated_transcript(client, sample_account_data, monkeypatch):
+    """Test that reads and exports flag text cut at INLINE_CHARS and link to the full text"""
+    monkeypatch.setattr(transcript_storage, "CHUNK_BYTES", 512)
+    monkeypatch.setattr(transcript_storage, "INLINE_CHARS", 1000)
+    monkeypatch.setattr(transcript_storage, "DOWNLOAD_BLOCK_BYTES", 4096)
+    call_id = create_call(client, sample_account_data)
+    body = b"".join(transcript_lines(2000))
+    created = client.post("/call-transcripts/upload", params={"call_id": call_id}, content=body).json()
+    url = f"/call-transcripts/{created['id']}/content"
+    assert (created["truncated"], created["content_url"]) == (True, url)
+    assert created["stored_length"] > 512
+
+    by_id = client.get(f"/call-transcripts/{created['id']}").json()
+    by_call = client.get(f"/calls/{call_id}/transcript").json()
+    looked_up = client.get("/call-transcripts/", params={"ids": str(created["id"])}).json()["items"][0]
+    [exported] = [json.loads(line) for line in client.get("/export/call-transcripts").text.splitlines()]
+    for row in (by_id, by_call, looked_up, exported):
+        assert (row["transcript"], row["truncated"], row["content_url"]) == (body.decode()[:1000], True, url)
+    csv_export = client.get("/export/call-transcripts", params={"format": "csv", "fields": "transcript"}).text
+    assert len(csv_export) < 2000
+
+    # The full text comes from content_url, decompressed in bounded blocks
+    assert client.get(url, headers={"Accept-Encoding": "identity"}).content == body
+    blocks = list(transcript_storage.content_chunks(*transcript_storage.open_transcript_content(created["id"])))
+    assert b"".join(blocks) == body
+    assert len(blocks) > 1 and max(len(block) for block in blocks) <= 4096
+
+    short = client.post("/call-transcripts/upload", params={"call_id": call_id, "compression": "none"}, content=b"Hi").json()
+    assert (short["truncated"], short["content_url"]) == (False, None)
+
+def test_replace_content_and_codecs(client, sample_account_data):
+    """Test replacing content with each codec and switching back to inline text"""
+    call_id = create_call(client, sample_account_data)
+    transcript_id = client.post("/call-transcripts/", json={"call_id": call_id, "transcript": "Hello"}).json()["id"]
+    url = f"/call-transcripts/{transcript_id}/content"
+    body = b"".join(transcript_lines(300))
+
+    for compression in ("zstd", "none", "gzip"):
+        replaced = client.put(url, params={"compression": compression}, content=body).json()
+        assert (replaced["compression"], replaced["byte_length"]) == (compression, len(body))
+        assert client.get(f"/call-transcripts/{transcript_id}").json()["compression"] == compression
+        assert client.get(url).content == body
+
+    inline = client.put(f"/call-transcripts/{transcript_id}", json={"call_id": call_id, "transcript": "Short"}).json()
+    assert inline["compression"] is None
+    assert inline["checksum"] == hashlib.sha256(b"Short").hexdigest()
+    assert client.get(url).text == "Short"
+    assert client.put("/call-transcripts/999/content", content=body).status_code == status.HTTP_404_NOT_FOUND
+
+def test_rejected_uploads_store_nothing(client, sample_account_data, monkeypatch):
+    """Test invalid, oversized and orphan uploads roll back"""
+    call_id = create_call(client, sample_account_data)
+    url = "/call-transcripts/upload"
+    assert client.post(url, params={"call_id": call_id}, content=b"caf\xe9").status_code == status.HTTP_400_BAD_REQUEST
+    assert client.post(url, params={"call_id": call_id + 1}, content=b"Hi").status_code == status.HTTP_404_NOT_FOUND
+    monkeypatch.setattr(transcript_storage, "MAX_UPLOAD_BYTES", 1000)
+    response = client.post(url, params={"call_id": call_id}, content=iter(transcript_lines(50)))
+    assert response.status_code == status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    assert client.get("/call-transcripts/").json()["items"] == []
+
+def test_upload_is_spooled_before_the_transaction(client, sample_account_data, monkeypatch):
+    """Test that the body is read in full, spilling to disk, before a connection is taken to store it"""
+    monkeypatch.setattr(transcript_storage, "SPOOL_BYTES", 1024)
+    call_id = create_call(client, sample_account_data)
+    lines = transcript_lines(300)
+    events = []
+    transaction = db_manager.transaction
+
+    @contextmanager
+    def recorded_transaction():
+        events.append("transaction")
+        with transaction() as cur:
+            yield cur
+    monkeypatch.setattr(db_manager, "transaction", recorded_transaction)
+
+    def body():
+        for line in lines:
+            events.append("chunk")
+            yield line
+
+    stored = transcript_storage.store_transcript(body(), transcript_storage.Compression.none, call_id=call_id)
+    assert events == ["chunk"] * len(lines) + ["transaction"]
+    assert stored["stored_length"] == stored["byte_length"] == len(b"".join(lines))
+    assert client.get(f"/call-transcripts/{stored['id']}/content").content == b"".join(lines)
@@ -0,0 +1,235 @@
+import codecs
+import gzip
+import hashlib
+import io
+import itertools
+import os
+import tempfile
+import zlib
+from enum import Enum
+from typing import Any, AsyncIterable, Dict, Iterator, Optional, Tuple
+
+import anyio.from_thread
+import psycopg2.errors
+from fastapi import HTTPException
+
+from database import db_manager
+from entities import ENTITIES
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - zstandard is optional
+    zstandard = None
+
+# Codec for streamed transcripts when the upload doesn't name one
+DEFAULT_COMPRESSION = os.getenv("TRANSCRIPT_COMPRESSION", "gzip")
+# Size of the stored (compressed) chunks
+CHUNK_BYTES = int(os.getenv("TRANSCRIPT_CHUNK_BYTES", str(256 * 1024)))
+# Leading characters of a streamed transcript kept in the transcript column
+# for search and previews
+INLINE_CHARS = int(os.getenv("TRANSCRIPT_INLINE_CHARS", "100000"))
+# Compressed bytes of an upload buffered in memory before it spills to a
+# temporary file; the database is only written once the upload is complete
+SPOOL_BYTES = int(os.getenv("TRANSCRIPT_SPOOL_BYTES", str(4 * 1024 * 1024)))
+# Upper bound on the uncompressed size of one upload
+MAX_UPLOAD_BYTES = int(os.getenv("TRANSCRIPT_MAX_BYTES", str(512 * 1024 * 1024)))
+# Chunks fetched per round trip when streaming a transcript back
+DOWNLOAD_BATCH_CHUNKS = 4
+# Size of the blocks a download is sent in, after decompression
+DOWNLOAD_BLOCK_BYTES = 64 * 1024
+
+class Compression(str, Enum):
+    none = "none"
+    gzip = "gzip"
+    zstd = "zstd"
+
+class _Identity:
+    """Pass-through stand-in for a compressor object"""
+
+    def compress(self, data: bytes) -> bytes:
+        return data
+
+    def flush(self) -> bytes:
+        return b""
+
+class _ChunkReader(io.RawIOBase):
+    """Read-only file over an iterator of byte strings"""
+
+    def __init__(self, chunks: Iterator[bytes]):
+        self._chunks = chunks
+        self._buffer = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, target) -> int:
+        while not self._buffer:
+            self._buffer = next(self._chunks, None)
+            if self._buffer is None:
+                self._buffer = b""
+                return 0
+        size = min(len(target), len(self._buffer))
+        target[:size] = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return size
+
+def _zstandard():
+    if zstandard is None:
+        raise HTTPException(status_code=400, detail="zstd compression requires the zstandard package")
+    return zstandard
+
+def compressor(compression: Compression):
+    """Incremental compressor with ``compress(data)`` / ``flush()``"""
+    if compression == Compression.gzip:
+        return zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    if compression == Compression.zstd:
+        return _zstandard().ZstdCompressor().compressobj()
+    return _Identity()
+
+def decompressing_reader(compression: Compression, raw: io.RawIOBase):
+    """File-like reader of the uncompressed bytes of ``raw``"""
+    if compression == Compression.gzip:
+        return gzip.GzipFile(fileobj=raw, mode="rb")
+    if compression == Compression.zstd:
+        return _zstandard().ZstdDecompressor().stream_reader(raw)
+    return raw
+
+def iterate_from_thread(stream: AsyncIterable[bytes]) -> Iterator[bytes]:
+    """Consume an async byte stream (such as ``request.stream()``) from a worker thread"""
+    iterator = stream.__aiter__()
+
+    async def pull() -> Optional[bytes]:
+        try:
+            return await iterator.__anext__()
+        except StopAsyncIteration:
+            return None
+
+    while (chunk := anyio.from_thread.run(pull)) is not None:
+        if chunk:
+            yield chunk
+
+def store_transcript(
+    chunks: Iterator[bytes],
+    compression: Compression,
+    call_id: Optional[int] = None,
+    transcript_id: Optional[int] = None,
+) -> Optional[Dict[str, Any]]:
+    """Store a streamed transcript body, creating a transcript or replacing one's text.
+
+    The body is validated as UTF-8, hashed and compressed as it arrives,
+    into a spool that stays in memory up to ``SPOOL_BYTES`` and then moves
+    to a temporary file. Only once the client has sent everything is a
+    connection taken, and the spool written as ``CHUNK_BYTES`` rows in one
+    transaction, so a slow uploader never holds one and a failed or
+    oversized upload leaves no trace. Returns the stored row, or None if
+    ``transcript_id`` doesn't exist.
+    """
+    # Fail fast, before reading the body; the transaction checks again
+    if transcript_id is None:
+        found, _ = db_manager.execute_single("SELECT 1 FROM calls WHERE id = %s", (call_id,), primary=True)
+        if found is None:
+            raise HTTPException(status_code=404, detail="Call not found")
+    else:
+        found, _ = db_manager.execute_single("SELECT 1 FROM call_transcripts WHERE id = %s", (transcript_id,), primary=True)
+        if found is None:
+            return None
+
+    encoder = compressor(compression)
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    digest = hashlib.sha256()
+    byte_length = 0
+    leading, leading_chars = [], 0
+
+    with tempfile.SpooledTemporaryFile(max_size=SPOOL_BYTES) as spool:
+        try:
+            for chunk in chunks:
+                byte_length += len(chunk)
+                if byte_length > MAX_UPLOAD_BYTES:
+                    raise HTTPException(status_code=413, detail=f"Transcripts are limited to {MAX_UPLOAD_BYTES} bytes")
+                digest.update(chunk)
+                text = decoder.decode(chunk)
+                if leading_chars < INLINE_CHARS:
+                    leading.append(text[:INLINE_CHARS - leading_chars])
+                    leading_chars += len(leading[-1])
+                spool.write(encoder.compress(chunk))
+            decoder.decode(b"", final=True)
+        except UnicodeDecodeError:
+            raise HTTPException(status_code=400, detail="Transcript body must be UTF-8 text")
+        spool.write(encoder.flush())
+        stored_length = spool.tell()
+        spool.seek(0)
+
+        with db_manager.transaction() as cur:
+            if transcript_id is None:
+                try:
+                    cur.execute(
+                        "INSERT INTO call_transcripts (call_id, transcript, compression) VALUES (%s, '', %s) RETURNING id",
+                        (call_id, compression.value)
+                    )
+                except psycopg2.errors.ForeignKeyViolation:
+                    raise HTTPException(status_code=404, detail="Call not found")
+                transcript_id = cur.fetchone()[0]
+            else:
+                cur.execute(
+                    "UPDATE call_transcripts SET compression = %s WHERE id = %s RETURNING id",
+                    (compression.value, transcript_id)
+                )
+                if cur.rowcount == 0:
+                    return None
+                cur.execute("DELETE FROM call_transcript_chunks WHERE transcript_id = %s", (transcript_id,))
+
+            for seq, data in enumerate(iter(lambda: spool.read(CHUNK_BYTES), b"")):
+                cur.execute(
+                    "INSERT INTO call_transcript_chunks (transcript_id, seq, data) VALUES (%s, %s, %s)",
+                    (transcript_id, seq, data)
+                )
+
+            columns = ENTITIES["call-transcripts"].select_list
+            cur.execute(
+                f"UPDATE call_transcripts SET transcript = %s, byte_length = %s, stored_length = %s, checksum = %s "
+                f"WHERE id = %s RETURNING {columns}",
+                ("".join(leading), byte_length, stored_length, digest.hexdigest(), transcript_id)
+            )
+            return db_manager.row_to_dict(cur.fetchone(), cur)
+
+def open_transcript_content(transcript_id: int) -> Optional[Tuple[Dict[str, Any], Iterator[Dict[str, Any]]]]:
+    """Start reading a transcript body: (first row, remaining rows), or None if it doesn't exist.
+
+    Metadata and chunks come from a single statement, so they describe the
+    same version of the transcript even if it is replaced mid-download.
+    The remaining rows hold a pooled connection until exhausted or closed.
+    """
+    rows = db_manager.iter_query(
+        "SELECT t.compression, t.byte_length, t.stored_length, t.checksum, "
+        "CASE WHEN t.compression IS NULL THEN t.transcript END AS transcript, c.data "
+        "FROM call_transcripts t LEFT JOIN call_transcript_chunks c ON c.transcript_id = t.id "
+        "WHERE t.id = %s ORDER BY c.seq",
+        (transcript_id,),
+        batch_size=DOWNLOAD_BATCH_CHUNKS
+    )
+    first = next(rows, None)
+    if first is None:
+        return None
+    return first, rows
+
+def content_chunks(first: Dict[str, Any], rows: Iterator[Dict[str, Any]], decode: bool = True) -> Iterator[bytes]:
+    """Transcript body bytes from ``open_transcript_content`` rows.
+
+    Stored chunks are decompressed into ``DOWNLOAD_BLOCK_BYTES`` blocks, so
+    even highly compressible text never inflates a whole chunk at once.
+    With ``decode=False`` they are passed through still compressed, for
+    clients that accept the stored encoding.
+    """
+    try:
+        if first["transcript"] is not None:
+            yield first["transcript"].encode("utf-8")
+            return
+        chunks = (bytes(row["data"]) for row in itertools.chain([first], rows) if row["data"] is not None)
+        if not decode:
+            yield from chunks
+            return
+        reader = decompressing_reader(Compression(first["compression"]), _ChunkReader(chunks))
+        while block := reader.read(DOWNLOAD_BLOCK_BYTES):
+            yield block
+    finally:
+        rows.close()